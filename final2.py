@@ -1,12 +1,33 @@
 import streamlit as st
 import base64
-import requests
+import time
 from io import BytesIO
 from PIL import Image
+from kolam.assets.gallery_cache import GalleryCache
 
 # === PAGE CONFIG ===
 st.set_page_config(page_title="Kolam Suite", layout="wide")
 
+# === GALLERY IMAGE CACHE (shared by all sessions) ===
+@st.cache_resource
+def get_gallery_cache():
+    return GalleryCache()
+
+# === RANDOM KOLAM GALLERY (pages cached across sessions) ===
+GALLERY_PER_PAGE = 12
+GALLERY_THUMB_PX = 256
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def random_gallery_page(seed, n, motifs, symmetric, page, _stream):
+    # _stream (the session's KolamStream, not hashed) resumes where the last page stopped
+    from kolam.geometry.procedural import procedural_strokes
+    from kolam.render.raster import rasterize_strokes, png_bytes
+    thumbs = []
+    for inside, styles in _stream.page(page, GALLERY_PER_PAGE):
+        strokes, dots = procedural_strokes(inside, styles)
+        thumbs.append(png_bytes(rasterize_strokes(strokes, dots, size=GALLERY_THUMB_PX, line_width=4, dot_size=36)))
+    return thumbs
+
 # === LOAD LOGO ===
 def load_logo(path="logo.jpg"):
     try:
@@ -104,7 +125,32 @@ tab1, tab2, tab3, tab4 = st.tabs(
 # === TAB 1: Kolam Generator ===
 with tab1:
     st.subheader("Kolam Generator")
-    st.info("Embed your existing Kolam Generator app here.")
+    c1, c2, c3, c4 = st.columns(4)
+    seed = c1.number_input("Seed", min_value=0, value=2025, step=1, key="random_seed")
+    grid = c2.slider("Grid size", 3, 12, 6, key="random_grid")
+    motifs = c3.multiselect("Motifs", ["diamonds", "loops", "arcs", "lines"], ["diamonds", "loops", "arcs"], key="random_motifs")
+    symmetric = c4.checkbox("Mirror symmetry", True, key="random_symmetric")
+    # Changing any setting starts the gallery over
+    settings = (int(seed), grid, tuple(motifs), symmetric)
+    if st.session_state.get("random_settings") != settings:
+        from kolam.geometry.procedural import KolamStream
+        st.session_state.random_settings = settings
+        st.session_state.random_pages = 1
+        st.session_state.random_stream = KolamStream(int(seed), grid, motifs=tuple(motifs), symmetric=symmetric)
+    t0 = time.perf_counter()
+    pages = [random_gallery_page(*settings, page, st.session_state.random_stream)
+             for page in range(st.session_state.random_pages)]
+    thumbs = [t for page in pages for t in page]
+    cols = st.columns(4)
+    for i, png in enumerate(thumbs):
+        cols[i % 4].image(png, use_column_width=True)
+    st.caption(f"{len(thumbs)} kolams from seed {int(seed)} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    # A short page means the stream has run out of distinct patterns
+    if len(pages[-1]) < GALLERY_PER_PAGE:
+        st.info("No more kolams for these settings.")
+    elif st.button("Load more", key="random_more"):
+        st.session_state.random_pages += 1
+        st.rerun()
 
 # === TAB 2: Unsymmetrical Dots ===
 with tab2:
@@ -125,9 +171,12 @@ with tab4:
         "https://upload.wikimedia.org/wikipedia/commons/6/67/Kolam_design.jpg",
         "https://upload.wikimedia.org/wikipedia/commons/e/eb/Kolam_Rangoli.jpg",
     ]
+    images = get_gallery_cache().prefetch(urls)
     for i, url in enumerate(urls):
-        resp = requests.get(url)
-        img = Image.open(BytesIO(resp.content))
+        if images[url] is None:
+            cols[i].write("Image not available")
+            continue
+        img = Image.open(BytesIO(images[url]))
         cols[i].image(img, use_column_width=True, caption=f"Kolam {i+1}")
 
 # === FOOTER ===
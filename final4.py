@@ -1,20 +1,53 @@
-# kolam_app.py
+# final4.py
+# Kolam Konnect: the Streamlit app. Drawing, analysis and storage live in the kolam package.
+import os
+import uuid
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
 from io import BytesIO
-from PIL import Image
-import requests
 
-# Try to import OpenCV, but fail gracefully if missing
-try:
-    import cv2
-except Exception:
-    cv2 = None
+# Only stdlib-weight modules at import time. matplotlib, NumPy, OpenCV, Pillow and
+# requests are imported by the pages that use them, so Home and Learn More never
+# pay for them; `python kolam_importtime.py` fails if that regresses.
+from kolam.jobs import AnalysisQueue, QueueFull, DONE, TIMEOUT
+from kolam.metrics import new_timer, REGISTRY, DIAGNOSTICS_DEFAULT
+from kolam import profiling
+from kolam.assets.community import CommunityStore, PAGE_SIZE as COMMUNITY_PAGE_SIZE
+
+# Gallery index built with `python -m kolam.analyze.search <image_dir> <index_dir>`
+GALLERY_INDEX_DIR = os.environ.get("KOLAM_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gallery_index"))
 
 # ---------------- App config ----------------
 st.set_page_config(page_title="Kolam Konnect", layout="wide", initial_sidebar_state="expanded")
 
+# Opt-in profiling (KOLAM_PROFILE=1 or ?profile=1): every full rerun and every
+# fragment rerun writes a cProfile + collapsed-stack pair and shows its timings
+def profiling_wanted():
+    return profiling.wanted(st.query_params.get("profile"))
+
+def show_profile(summary):
+    if summary is None:
+        return
+    stages = " · ".join(f"{k} {v:.1f}" for k, v in summary["stages_ms"].items())
+    st.caption(f"⏱ {summary['label']}: {summary['total_ms']:.1f} ms ({stages} ms) → {os.path.dirname(summary['files'][0])}")
+
+rerun_profile = profiling.start("rerun", profiling_wanted(), outermost=True)
+
+# Tool panels are fragments: a widget inside one reruns only that panel, so the
+# config, CSS, sidebar and header below run on full reruns (navigation) only.
+# Streamlit versions without fragments rerun the whole script as before.
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+def fragment(fn):
+    def panel():
+        profile = profiling.start(fn.__name__, profiling_wanted())
+        try:
+            fn()
+        finally:
+            summary = profile.finish()
+        show_profile(summary)
+    panel.__name__ = panel.__qualname__ = fn.__name__
+    return _st_fragment(panel)
+
 # ---------------- Theme / CSS ----------------
 st.markdown(
     """
@@ -64,34 +97,29 @@ st.markdown(
 )
 
 # ---------------- Sidebar with logo & navigation ----------------
+PAGES = ["Home", "Basic Kolam", "Complex Kolam", "Analyzer", "Learn More", "Community"]
+
+def go_to(page):
+    # Button callback: runs before the rerun, while the "page" radio may still be changed
+    st.session_state.page = page
+
 with st.sidebar:
     st.write("")  # spacing
-    # Try local logo.jpg else fetch fallback
+    # Try local logo.jpg else fallback (the browser fetches the URL itself)
     try:
-        logo = Image.open("logo.jpg")
+        if os.path.exists("logo.jpg"):
+            st.image("logo.jpg", width=160, caption="Kolam Konnect")
+        else:
+            st.image("https://images.unsplash.com/photo-1549880338-65ddcdfd017b?w=160&q=80", width=160, caption="Kolam Konnect")
     except Exception:
-        logo = None
-    if logo:
-        st.image(logo, width=160, caption="Kolam Konnect")
-    else:
-        # fallback placeholder image
-        try:
-            resp = requests.get("https://images.unsplash.com/photo-1549880338-65ddcdfd017b?w=800&q=80", timeout=5)
-            logo = Image.open(BytesIO(resp.content))
-            st.image(logo, width=160, caption="Kolam Konnect")
-        except Exception:
-            st.markdown("## Kolam Konnect")
+        st.markdown("## Kolam Konnect")
 
     st.markdown("---")
-    # Page navigation via radio (keeps state)
+    # Page navigation via radio (keeps state). Keyed on "page" so the widget keeps one
+    # identity whichever page is open; buttons move it through go_to callbacks.
     if "page" not in st.session_state:
         st.session_state.page = "Home"
-    page = st.radio(
-        "Go to",
-        ["Home", "Basic Kolam", "Complex Kolam", "Analyzer", "Learn More", "Community"],
-        index=["Home", "Basic Kolam", "Complex Kolam", "Analyzer", "Learn More", "Community"].index(st.session_state.page),
-    )
-    st.session_state.page = page
+    st.radio("Go to", PAGES, key="page")
     st.markdown("---")
     st.caption("Tip: change design colors inside each tool.")
 
@@ -117,24 +145,231 @@ with header_cols[1]:
 with header_cols[2]:
     st.write("")  # right spacer
 
-# ---------------- Drawing helper functions ----------------
-def draw_diamond_ax(ax, x, y, s=1, color="#B22222", lw=2.0):
-    pts = [(x, y + s/2), (x + s/2, y), (x, y - s/2), (x - s/2, y), (x, y + s/2)]
-    xs, ys = zip(*pts)
-    ax.plot(xs, ys, color=color, lw=lw, solid_capstyle='round')
-
-def draw_arc_ax(ax, x, y, r=0.6, start=0, end=180, color="#B22222", lw=2.0):
-    theta = np.linspace(np.radians(start), np.radians(end), 120)
-    ax.plot(x + r*np.cos(theta), y + r*np.sin(theta), color=color, lw=lw, solid_capstyle='round')
+# ---------------- Gallery image cache ----------------
+@st.cache_resource
+def get_gallery_cache():
+    from kolam.assets.gallery_cache import GalleryCache
+    return GalleryCache()
+
+# ---------------- Thumbnails ----------------
+# Approximate CSS widths of the wide layout; derivatives are picked to fit these
+MAIN_COLUMN_PX = 1000
+
+@st.cache_resource
+def get_thumbnails():
+    from kolam.assets.thumbnails import ThumbnailStore
+    return ThumbnailStore()
+
+def show_thumbnail(target, data, column_px, caption=None, lossless=False):
+    # Send the smallest cached derivative that fills the column instead of the original
+    target.image(get_thumbnails().best(data, column_px, lossless=lossless), caption=caption, use_column_width=True)
+
+def show_figure(fig, column_px=MAIN_COLUMN_PX, publish_key=None, meta=None):
+    from kolam.render import figure_png
+    with profiling.stage("encode"):
+        png = figure_png(fig)
+        # Line art: lossless WebP keeps strokes crisp and is still far smaller than PNG
+        derivative = get_thumbnails().best(png, column_px, lossless=True)
+    st.image(derivative, use_column_width=True)
+    if publish_key is not None:
+        # Kept so the Publish button (a separate rerun) still has the render
+        st.session_state[f"render_{publish_key}"] = (png, meta or {})
+
+# ---------------- Community store ----------------
+@st.cache_resource
+def get_community_store():
+    return CommunityStore()
+
+def publish_controls(publish_key):
+    render = st.session_state.get(f"render_{publish_key}")
+    if render is None:
+        return
+    if st.button("🌐 Publish to Community", key=f"publish_{publish_key}"):
+        get_community_store().publish(render[0], "generated", **render[1])
+        st.success("Published! Find it on the Community page.")
+
+# ---------------- .kolam documents ----------------
+DOCUMENT_STYLE = ("line_color", "dot_color", "bg_color", "line_width", "show_dots", "dot_size")
+
+def show_kolam(strokes, dots, style, publish_key, generator):
+    # Draws generated geometry and keeps it as a .kolam document for the Save button
+    from kolam.render import strokes_figure
+    from kolam.document import KolamDocument
+    with profiling.stage("render"):
+        fig = strokes_figure(strokes, dots, **style)
+    show_figure(fig, publish_key=publish_key, meta={"kolam_type": generator["kolam_type"], "grid_size": generator["grid_size"],
+                                                    "line_color": style["line_color"], "bg_color": style["bg_color"]})
+    st.session_state[f"document_{publish_key}"] = KolamDocument.from_strokes(strokes, dots, generator, style).to_bytes()
+
+def save_controls(publish_key):
+    from kolam.document import EXTENSION, MIME
+    # .kolam bytes, or a function building them (deferred until the download is clicked)
+    data = st.session_state.get(f"document_{publish_key}")
+    if data is None:
+        return
+    st.download_button("💾 Save as .kolam", data=data, file_name=f"{publish_key}{EXTENSION}", mime=MIME, key=f"save_{publish_key}")
+
+def open_controls(page_key):
+    with st.expander("📂 Open a .kolam file"):
+        upload = st.file_uploader("Saved design", type=["kolam"], key=f"open_{page_key}")
+        if upload is None:
+            return
+        from kolam.document import load
+        from kolam.render import strokes_figure
+        try:
+            doc = load(upload.getvalue())
+        except ValueError as e:
+            st.error(f"Could not open {upload.name}: {e}")
+            return
+        # Geometry comes straight from the file: nothing is recomputed
+        with profiling.stage("render"):
+            fig = strokes_figure(doc.strokes(), doc.dots, **{k: v for k, v in doc.style.items() if k in DOCUMENT_STYLE})
+        show_figure(fig)
+        st.caption(", ".join(f"{k}: {v}" for k, v in doc.generator.items()) + f" · {len(doc)} strokes")
+
+PLOTTER_FORMATS = {"G-code": ("gcode", ".gcode", "text/x-gcode"), "HPGL": ("hpgl", ".hpgl", "application/vnd.hp-hpgl")}
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def plotter_file(document, fmt, width_mm):
+    from kolam.document import load
+    from kolam.render import plotter
+    paths, stats = plotter.plan_plot(load(document).strokes(), width_mm)
+    return getattr(plotter, PLOTTER_FORMATS[fmt][0])(paths), stats
+
+def plotter_controls(publish_key):
+    # Pen-plotter / CNC output of the saved design, strokes ordered for little pen-up travel
+    data = st.session_state.get(f"document_{publish_key}")
+    if data is None:
+        return
+    # A checkbox rather than an expander: nothing is planned until the export is asked for
+    if st.checkbox("🖊️ Export for a pen plotter", value=False, key=f"plot_{publish_key}_open"):
+        if callable(data):
+            data = data()
+        fmt = st.radio("Format:", list(PLOTTER_FORMATS), horizontal=True, key=f"plot_format_{publish_key}")
+        width = st.number_input("Drawing size (mm):", min_value=10, max_value=2000, value=200, step=10, key=f"plot_width_{publish_key}")
+        text, stats = plotter_file(data, fmt, float(width))
+        _, extension, mime = PLOTTER_FORMATS[fmt]
+        st.download_button(f"⬇️ Download {fmt}", data=text, file_name=f"{publish_key}{extension}", mime=mime, key=f"plot_{publish_key}")
+        st.caption(f"{stats['strokes']} strokes · pen down {stats['draw']:.0f} mm · pen up {stats['travel']:.0f} mm "
+                   f"(was {stats['travel_unordered']:.0f} mm in drawing order) · ordered in {stats['seconds'] * 1000:.0f} ms")
+
+# ---------------- Similar-kolam search ----------------
+@st.cache_resource
+def load_gallery_index():
+    # Memory-mapped, so this is instant even for large galleries
+    if not os.path.exists(os.path.join(GALLERY_INDEX_DIR, "ids.json")):
+        return None
+    from kolam.analyze.search import KolamIndex
+    return KolamIndex.load(GALLERY_INDEX_DIR)
+
+def show_similar(results):
+    if not results:
+        st.info("No similar kolams in the gallery yet.")
+        return
+    cols = st.columns(4)
+    for i, (item_id, score) in enumerate(results):
+        try:
+            with open(item_id, "rb") as f:
+                show_thumbnail(cols[i % 4], f.read(), MAIN_COLUMN_PX // 4, caption=f"similarity {score:.2f}")
+        except Exception:
+            cols[i % 4].write(os.path.basename(item_id))
+
+# ---------------- Background analysis ----------------
+@st.cache_resource
+def get_analysis_queue():
+    # One bounded pool shared by every session of this server process
+    return AnalysisQueue(
+        workers=int(os.environ.get("KOLAM_ANALYSIS_WORKERS", "2")),
+        max_pending=int(os.environ.get("KOLAM_ANALYSIS_QUEUE", "32")),
+        timeout=float(os.environ.get("KOLAM_ANALYSIS_TIMEOUT", "60")),
+    )
 
-def draw_loop_ax(ax, x, y, r=0.5, color="#B22222", lw=2.0):
-    theta = np.linspace(0, 2*np.pi, 240)
-    ax.plot(x + r*np.cos(theta), y + r*np.sin(theta), color=color, lw=lw, solid_capstyle='round')
+def run_analysis(data, with_vector=False, diagnostics=False, tiled=False, align=True):
+    # Runs on a worker thread: no Streamlit calls in here
+    from kolam.analyze.core import analyze_kolam, generate_principles
+    timer = new_timer(diagnostics)
+    # Peak traced allocation for the whole analysis (tracemalloc, diagnostics only)
+    with timer.memory():
+        if tiled:
+            # Full resolution, out of core: decode once to a memory-mapped file, then work tile by tile
+            from kolam.analyze.tiled import analyze_tiled, gray_memmap_from_bytes
+            with timer.stage("decode", nbytes=len(data)):
+                gray, path = gray_memmap_from_bytes(data)
+            try:
+                symmetry_score, line_density, complexity, edges = analyze_tiled(gray, timer=timer)
+            finally:
+                del gray
+                os.remove(path)
+            vector = kolam_type = alignment = None
+        else:
+            from kolam.analyze.decode import decode_gray
+            from kolam.analyze.align import align_kolam
+            from kolam.analyze.search import fingerprint
+            from kolam.analyze.classifier import load_classifier
+            gray = decode_gray(data, timer=timer)
+            with timer.stage("fingerprint"):
+                # From the decoded frame, before alignment: the gallery index is built
+                # from plain (reduced) decodes, and query and index must match
+                vector = fingerprint(gray)[1] if with_vector else None
+            alignment = None
+            if align:
+                # Deskew + centre on a downscaled probe, then a single warp/crop of the frame
+                gray, alignment = align_kolam(gray, timer=timer)
+            symmetry_score, line_density, complexity, edges = analyze_kolam(gray, timer=timer)
+            with timer.stage("classify"):
+                classifier = load_classifier()
+                kolam_type = classifier.classify(gray) if classifier is not None else None
+    return {
+        "symmetry_score": symmetry_score,
+        "line_density": line_density,
+        "complexity": complexity,
+        "edges": edges,
+        "principles": generate_principles(symmetry_score, line_density, complexity),
+        "vector": vector,
+        "kolam_type": kolam_type,
+        "alignment": alignment,
+        "gray": None if tiled else gray,   # handed to the tuning cache on first display
+        "timer": timer,
+        "reported": False,
+    }
 
-def draw_straight_ax(ax, n, spacing, color="#B22222", lw=2.0):
-    for i in range(n):
-        ax.plot([0, (n-1)*spacing], [i*spacing, i*spacing], color=color, lw=lw)
-        ax.plot([i*spacing, i*spacing], [0, (n-1)*spacing], color=color, lw=lw)
+def show_diagnostics(timer):
+    with st.expander("⏱ Diagnostics", expanded=True):
+        d = timer.as_dict()
+        st.write(f"Total: **{d['total_ms']:.1f} ms**")
+        if d["peak_bytes"] is not None:
+            st.write(f"Peak allocated memory: **{d['peak_bytes'] / (1024 * 1024):.1f} MB**")
+        st.table({"stage": list(d["stages_ms"]), "ms": list(d["stages_ms"].values())})
+        if d["bytes"]:
+            st.table({"stage": list(d["bytes"]), "bytes": list(d["bytes"].values())})
+        st.code(REGISTRY.prometheus_text(), language="text")
+
+def session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def show_vectorizer(gray, upload_key):
+    from kolam.analyze.vectorize import vectorize, strokes_to_svg
+    from kolam.render import get_pyplot, draw_strokes
+    st.subheader("✏️ Vectorize Into Strokes")
+    if st.button("Trace strokes", key="vectorize_run"):
+        st.session_state.vector_strokes = (upload_key, vectorize(gray))
+    traced = st.session_state.get("vector_strokes")
+    if traced is None or traced[0] != upload_key:
+        return
+    strokes, size = traced[1]
+    c1, c2, c3 = st.columns(3)
+    line_color = c1.color_picker("Line Color:", "#B22222", key="vector_line_color")
+    bg_color = c2.color_picker("Background Color:", "#FFFFFF", key="vector_bg")
+    line_width = c3.slider("Line Width:", 1.0, 6.0, 2.5, key="vector_line_width")
+    st.caption(f"{len(strokes)} strokes, {sum(len(s) for s in strokes)} vertices.")
+    fig, ax = get_pyplot().subplots(figsize=(7, 7 * size[1] / max(size[0], 1)))
+    fig.patch.set_facecolor(bg_color); ax.set_facecolor(bg_color); ax.axis("off")
+    draw_strokes(ax, strokes, color=line_color, lw=line_width, flip_height=size[1])
+    ax.set_aspect("equal"); show_figure(fig)
+    svg = strokes_to_svg(strokes, size, color=line_color, width=line_width, background=bg_color)
+    st.download_button("📥 Download Strokes as SVG", data=svg, file_name="kolam_strokes.svg", mime="image/svg+xml", key="download_svg")
 
 # ---------------- Pages ----------------
 def page_home():
@@ -154,18 +389,20 @@ def page_home():
     )
     c1, c2, c3 = st.columns([1, 1, 1])
     with c1:
-        if st.button("Start Drawing ↓", key="home_start"):
-            st.session_state.page = "Basic Kolam"
-            st.experimental_rerun()
+        st.button("Start Drawing ↓", key="home_start", on_click=go_to, args=("Basic Kolam",))
     with c2:
-        if st.button("Learn About Kolam", key="home_learn"):
-            st.session_state.page = "Learn More"
-            st.experimental_rerun()
+        st.button("Learn About Kolam", key="home_learn", on_click=go_to, args=("Learn More",))
     with c3:
         st.write("")
 
 def page_basic():
     st.header("🎨 Basic Kolam Generator")
+    basic_panel()
+    # Back to Home (outside the panel: navigation needs a full rerun)
+    st.button("⬅ Back to Home", key="basic_back", on_click=go_to, args=("Home",))
+
+@fragment
+def basic_panel():
     kolam_type = st.selectbox("Choose Kolam Type:", ["Straight Lines", "Connected Diamonds", "Loops/Arcs", "Mixed"], key="basic_type")
     size = st.slider("Grid Size (dots per side):", 4, 10, 6, key="basic_size")
     line_color = st.color_picker("Kolam Line Color:", "#B22222", key="basic_line_color")
@@ -174,218 +411,300 @@ def page_basic():
     line_width = st.slider("Line Width:", 1.0, 6.0, 2.5, key="basic_line_width")
     show_dots = st.checkbox("Show Dots", value=True, key="basic_show_dots")
 
+    style = {"line_color": line_color, "dot_color": dot_color, "bg_color": bg_color, "line_width": line_width, "show_dots": show_dots}
+
     def generate_kolam_basic(n):
-        fig, ax = plt.subplots(figsize=(7,7))
-        ax.set_facecolor(bg_color)
-        ax.axis("off")
-        spacing = 1
-        r = 0.5
-        if show_dots:
-            for i in range(n):
-                for j in range(n):
-                    ax.plot(i*spacing, j*spacing, 'o', color=dot_color, markersize=4)
-        if kolam_type == "Straight Lines":
-            draw_straight_ax(ax, n, spacing, color=line_color, lw=line_width)
-        elif kolam_type == "Connected Diamonds":
-            for i in range(n-1):
-                for j in range(n-1):
-                    draw_diamond_ax(ax, (i+0.5)*spacing, (j+0.5)*spacing, s=spacing, color=line_color, lw=line_width)
-        elif kolam_type == "Loops/Arcs":
-            for i in range(n):
-                for j in range(n):
-                    draw_loop_ax(ax, i*spacing, j*spacing, r=spacing/2.2, color=line_color, lw=line_width)
-        elif kolam_type == "Mixed":
-            for i in range(n-1):
-                for j in range(n-1):
-                    if (i+j) % 2 == 0:
-                        draw_diamond_ax(ax, (i+0.5)*spacing, (j+0.5)*spacing, s=spacing, color=line_color, lw=line_width)
-                    else:
-                        draw_loop_ax(ax, (i+0.5)*spacing, (j+0.5)*spacing, r=spacing/2.2, color=line_color, lw=line_width)
-        ax.set_aspect("equal")
-        st.pyplot(fig)
+        from kolam.geometry import kolam_strokes
+        with profiling.stage("render"):
+            strokes, dots = kolam_strokes(kolam_type, n)
+        show_kolam(strokes, dots, style, "basic", {"kolam_type": kolam_type, "grid_size": n})
 
     if st.button("🎨 Generate Basic Kolam", key="generate_basic"):
         generate_kolam_basic(size)
-
-    # Back to Home
-    if st.button("⬅ Back to Home", key="basic_back"):
-        st.session_state.page = "Home"
-        st.experimental_rerun()
+    publish_controls("basic")
+    save_controls("basic")
+    plotter_controls("basic")
+    open_controls("basic")
 
 def page_complex():
     st.header("🔷 Complex Kolam Generator")
-    option = st.selectbox("Choose pattern:", ["Unsymmetrical Dots (Dots → Diamonds)", "Diamond with Arcs"], key="complex_option")
+    complex_panel()
+    # Back to Home
+    st.button("⬅ Back to Home", key="complex_back", on_click=go_to, args=("Home",))
+
+def dot_editor(max_dots, spacing, style):
+    # Add / remove single dots; only the neighbourhood of the edited dot is recomputed and redrawn
+    import time
+    from kolam.document import KolamDocument
+    from kolam.geometry.editable import EditableLattice
+    from kolam.render import LatticeCanvas
+    # The edits survive style changes: only a new layout starts a fresh lattice
+    editor = st.session_state.get("dot_editor")
+    if editor is None or editor["settings"] != (max_dots, spacing):
+        editor = {"settings": (max_dots, spacing), "lattice": EditableLattice.rhombus(max_dots, spacing, margin=2),
+                  "style": None, "canvas": None, "ms": None}
+        st.session_state.dot_editor = editor
+    lattice = editor["lattice"]
+    if editor["style"] != style:
+        # Restyling redraws the whole picture once; edits after that stay local
+        editor["style"], editor["canvas"] = dict(style), LatticeCanvas(lattice, **style)
+    canvas = editor["canvas"]
+    x0, x1, y0, y1 = lattice.bounds
+    c1, c2 = st.columns(2)
+    row = c1.number_input("Row (from the top):", min_value=0, max_value=y1 - y0, value=1, step=1, key="edit_row")
+    col = c2.number_input("Column (from the left):", min_value=0, max_value=x1 - x0, value=(x1 - x0) // 2, step=1, key="edit_col")
+    if st.button("➕/➖ Toggle dot", key="edit_toggle"):
+        t0 = time.perf_counter()
+        lattice.toggle(x0 + int(col), y1 - int(row))
+        canvas.refresh()
+        editor["ms"] = (time.perf_counter() - t0) * 1000
+
+        def edited_document():
+            # Whole-kolam work, so only done when Save or the plotter export asks for it
+            strokes, dots = lattice.strokes()
+            return KolamDocument.from_strokes(strokes, dots, {"kolam_type": "Unsymmetrical Dots (edited)", "grid_size": max_dots,
+                                                              "spacing": spacing}, style).to_bytes()
+        st.session_state["document_unsym"] = edited_document
+    st.image(canvas.png(), use_column_width=True)
+    timing = f" · last edit {editor['ms']:.1f} ms" if editor["ms"] is not None else ""
+    st.caption(f"{lattice.dots} dots, {lattice.interior} diamonds, {lattice.links} links{timing}")
+
+@fragment
+def complex_panel():
+    option = st.selectbox("Choose pattern:", ["Unsymmetrical Dots (Dots → Diamonds)", "Diamond with Arcs", "Sikku (single loop)", "Custom Lattice"], key="complex_option")
     line_color = st.color_picker("Line Color:", "#B22222", key="complex_line_color")
     dot_color = st.color_picker("Dot Color:", "#000000", key="complex_dot_color")
     bg_color = st.color_picker("Background Color:", "#FFFFFF", key="complex_bg")
     line_width = st.slider("Line Width:", 1.0, 6.0, 2.5, key="complex_line_width")
     show_dots = st.checkbox("Show Dots", value=True, key="complex_show_dots")
+    style = {"line_color": line_color, "dot_color": dot_color, "bg_color": bg_color, "line_width": line_width, "show_dots": show_dots}
 
     if option == "Unsymmetrical Dots (Dots → Diamonds)":
         max_dots = st.slider("Max Dots in Middle Rows:", 3, 9, 5, key="unsym_max_dots")
         spacing = st.slider("Dot Spacing:", 0.5, 2.0, 1.0, key="unsym_spacing")
-        def generate_dot_positions(max_dots, spacing):
-            rows = max_dots + 1
-            dot_positions = []
-            half = rows // 2
-            for i in range(rows):
-                if i < half:
-                    count = 1 + 2 * i
-                else:
-                    count = 1 + 2 * (rows - i - 1)
-                offset = -(count - 1) / 2 * spacing
-                for j in range(count):
-                    dot_positions.append((offset + j * spacing, -i * spacing))
-            return dot_positions, rows
-
-        def find_border_indices(dot_positions):
-            borders = set()
-            row_dict = {}
-            for idx, (x, y) in enumerate(dot_positions):
-                row_dict.setdefault(y, []).append(idx)
-            for row in row_dict.values():
-                if len(row) > 1:
-                    borders.add(row[0]); borders.add(row[-1])
-                else:
-                    borders.add(row[0])
-            return borders
-
         def generate_unsymmetrical():
-            dot_positions, rows = generate_dot_positions(max_dots, spacing)
-            borders = find_border_indices(dot_positions)
-            fig, ax = plt.subplots(figsize=(7,7))
-            ax.set_facecolor(bg_color); ax.axis("off")
-            if show_dots:
-                xs, ys = zip(*dot_positions); ax.scatter(xs, ys, color=dot_color, s=40)
-            # Draw diamonds around non-border dots
-            for idx, (x, y) in enumerate(dot_positions):
-                if idx not in borders:
-                    draw_diamond_ax(ax, x, y, s=spacing, color=line_color, lw=line_width)
-            # Connect diagonal adjacent diamond corners to make continuous borders
-            for idx1, (x1, y1) in enumerate(dot_positions):
-                for idx2, (x2, y2) in enumerate(dot_positions):
-                    if idx1 < idx2 and abs(round(x1 - x2,5)) == round(spacing,5) and abs(round(y1 - y2,5)) == round(spacing,5):
-                        ax.plot([x1, x2], [y1, y2], color=line_color, lw=line_width)
-            ax.set_aspect("equal"); st.pyplot(fig)
+            from kolam.geometry import kolam_strokes
+            with profiling.stage("render"):
+                strokes, dots = kolam_strokes("Unsymmetrical Dots", max_dots + 1, spacing=spacing)
+            show_kolam(strokes, dots, dict(style, dot_size=40), "unsym", {"kolam_type": "Unsymmetrical Dots", "grid_size": max_dots, "spacing": spacing})
 
         if st.button("🎨 Generate Unsymmetrical Kolam", key="gen_unsym"):
             generate_unsymmetrical()
+        if st.checkbox("✏️ Edit dots", value=False, key="unsym_edit"):
+            dot_editor(max_dots, spacing, dict(style, dot_size=40))
+        publish_controls("unsym")
+        save_controls("unsym")
+        plotter_controls("unsym")
+
+    elif option == "Sikku (single loop)":
+        cols = st.slider("Dots across:", 2, 15, 7, key="sikku_n")
+        rows = st.slider("Dots down:", 2, 15, 7, key="sikku_m")
+        density = st.slider("Mirror density:", 0.0, 0.8, 0.3, key="sikku_density")
+        seed = st.number_input("Seed:", min_value=0, value=0, step=1, key="sikku_seed")
+        single = st.checkbox("Join into one loop", value=True, key="sikku_single")
+
+        def generate_sikku():
+            from kolam.geometry.sikku import MirrorGrid, join_loops, mirror_strokes
+            with profiling.stage("render"):
+                grid = MirrorGrid.random(cols, rows, density, int(seed))
+                if single:
+                    join_loops(grid)
+                strokes, dots = mirror_strokes(grid)
+            show_kolam(strokes, dots, style, "sikku", {"kolam_type": "Sikku", "grid_size": max(cols, rows), "dots_across": cols, "dots_down": rows,
+                                                       "mirror_density": density, "seed": int(seed), "single_loop": single})
+            st.caption(f"{len(strokes)} closed loop{'s' if len(strokes) != 1 else ''} around {cols * rows} dots")
+
+        if st.button("🎨 Generate Sikku Kolam", key="gen_sikku"):
+            generate_sikku()
+        publish_controls("sikku")
+        save_controls("sikku")
+        plotter_controls("sikku")
+
+    elif option == "Custom Lattice":
+        shape = st.selectbox("Lattice shape:", ["Square", "Rhombus", "Hexagon", "Triangle", "Silhouette (upload)"], key="lattice_shape")
+        size = st.slider("Dots per side / across:", 3, 40, 8, key="lattice_size")
+        upload = None
+        if shape == "Silhouette (upload)":
+            upload = st.file_uploader("Dark shape on a light background", type=["png", "jpg", "jpeg"], key="lattice_upload")
+            hexagonal = st.checkbox("Triangular lattice", value=False, key="lattice_hex")
+
+        def generate_lattice():
+            from kolam.geometry import lattice as lat
+            with profiling.stage("render"):
+                if shape == "Square":
+                    lattice = lat.square_lattice(size)
+                elif shape == "Rhombus":
+                    lattice = lat.rhombus_lattice(size)
+                elif shape == "Hexagon":
+                    lattice = lat.hex_lattice(size)
+                elif shape == "Triangle":
+                    lattice = lat.triangle_lattice(size)
+                else:
+                    import numpy as np
+                    from PIL import Image
+                    gray = np.array(Image.open(BytesIO(upload.getvalue())).convert("L"))
+                    kind = "hex" if hexagonal else "square"
+                    lattice = lat.mask_lattice(lat.silhouette_mask(gray, size, kind), kind)
+                if not len(lattice):
+                    st.warning("No dark shape found in the image.")
+                    return
+                strokes, dots = lat.lattice_strokes(lattice)
+            show_kolam(strokes, dots, style, "lattice", {"kolam_type": f"Lattice: {shape}", "grid_size": size})
+            st.caption(f"{len(lattice)} dots, {int(lattice.border().sum())} on the border")
+
+        if shape == "Silhouette (upload)" and upload is None:
+            st.info("Upload a silhouette image to place dots inside it.")
+        elif st.button("🎨 Generate Lattice Kolam", key="gen_lattice"):
+            generate_lattice()
+        publish_controls("lattice")
+        save_controls("lattice")
+        plotter_controls("lattice")
 
     else:  # Diamond with Arcs
         n = st.slider("Grid Size (dots per side):", 4, 10, 6, key="dia_n")
-        spacing = 1
         r = st.slider("Arc radius:", 0.2, 1.0, 0.45, key="dia_r")
         offset = st.slider("Arc offset (inward):", 0.0, 0.5, 0.01, key="dia_offset")
 
         def generate_diamond_arcs(n):
-            fig, ax = plt.subplots(figsize=(7,7))
-            ax.set_facecolor(bg_color); ax.axis("off")
-            # draw dots
-            if show_dots:
-                for i in range(n):
-                    for j in range(n):
-                        ax.plot(i*spacing, j*spacing, 'o', color=dot_color, markersize=4)
-            # diamonds
-            for i in range(n-1):
-                for j in range(n-1):
-                    draw_diamond_ax(ax, (i+0.5)*spacing, (j+0.5)*spacing, s=spacing, color=line_color, lw=line_width)
-            # top border arcs (inward: curve downward)
-            # number of arcs = n - 2, centered above each interior dot, skip corners
-            for i in range(1, n-1):
-                cx_top = (i-0.5)*spacing + r  # shift right by r for nicer connection
-                cy_top = (n-1) + offset
-                draw_arc_ax(ax, cx_top, cy_top, r=r, start=0, end=180, color=line_color, lw=line_width)
-                # bottom border (curve upward)
-                cx_bot = (i-0.5)*spacing + r
-                cy_bot = -offset
-                draw_arc_ax(ax, cx_bot, cy_bot, r=r, start=180, end=360, color=line_color, lw=line_width)
-            # left & right border arcs (facing inward)
-            for j in range(1, n-1):
-                cy = (j-0.5)*spacing + r
-                draw_arc_ax(ax, -offset, cy, r=r, start=90, end=270, color=line_color, lw=line_width)
-                draw_arc_ax(ax, (n-1)+offset, cy, r=r, start=270, end=450, color=line_color, lw=line_width)
-            ax.set_aspect("equal"); st.pyplot(fig)
+            from kolam.geometry import kolam_strokes
+            with profiling.stage("render"):
+                strokes, dots = kolam_strokes("Diamond with Arcs", n, r=r, offset=offset)
+            show_kolam(strokes, dots, style, "darcs", {"kolam_type": "Diamond with Arcs", "grid_size": n, "r": r, "offset": offset})
 
         if st.button("🎨 Generate Diamond+Arcs Kolam", key="gen_darcs"):
             generate_diamond_arcs(n)
-
-    # Back to Home
-    if st.button("⬅ Back to Home", key="complex_back"):
-        st.session_state.page = "Home"
-        st.experimental_rerun()
+        publish_controls("darcs")
+        save_controls("darcs")
+        plotter_controls("darcs")
+    open_controls("complex")
 
 def page_analyzer():
     st.header("📊 Kolam Design Principles Analyzer")
-    if cv2 is None:
+    # OpenCV and the analysis modules load on the first Analyzer visit, not at startup
+    try:
+        import cv2  # noqa: F401
+    except Exception:
         st.error("OpenCV (cv2) is not installed in this environment. Install opencv-python-headless to enable analyzer.")
         return
+    analyzer_panel()
+    st.button("⬅ Back to Home", key="analyzer_back", on_click=go_to, args=("Home",))
+
+@fragment
+def analyzer_panel():
+    from kolam.analyze.core import generate_principles
+    from kolam.analyze.tuning import GradientCache, BLUR_KERNELS, DEFAULTS as TUNING_DEFAULTS
 
     uploaded_file = st.file_uploader("Upload a Kolam image", type=["jpg", "jpeg", "png"], key="analyzer_upload")
     st.markdown("Drop a clear high-contrast image of a kolam for best results.")
-
-    def analyze_kolam(image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        h, w = gray.shape
-        if h < 64 or w < 64:
-            gray = cv2.resize(gray, (max(64,w), max(64,h)))
-            h, w = gray.shape
-        mid = w // 2
-        left = gray[:, :mid]
-        right = cv2.flip(gray[:, mid:], 1)
-        minw = min(left.shape[1], right.shape[1])
-        left = left[:, :minw]
-        right = right[:, :minw]
-        _, leftt = cv2.threshold(left, 128, 255, cv2.THRESH_BINARY)
-        _, rightt = cv2.threshold(right, 128, 255, cv2.THRESH_BINARY)
-        symmetry_score = float(np.sum(leftt == rightt) / leftt.size)
-        edges = cv2.Canny(gray, 50, 150)
-        line_density = float(np.sum(edges > 0) / edges.size)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        complexity = int(len(contours))
-        return symmetry_score, line_density, complexity, edges
-
-    def generate_principles(symmetry_score, line_density, complexity):
-        principles = []
-        if symmetry_score > 0.85:
-            principles.append("High bilateral symmetry: strong left-right balance.")
-        elif symmetry_score > 0.6:
-            principles.append("Moderate symmetry: elements of balance with stylization.")
-        else:
-            principles.append("Low symmetry / asymmetrical pattern.")
-        if line_density > 0.12:
-            principles.append("Dense linework indicating intricate patterning.")
-        else:
-            principles.append("Light linework indicating minimal or geometric style.")
-        if complexity > 30:
-            principles.append("High structural complexity with many contours.")
-        elif complexity > 12:
-            principles.append("Moderate complexity with clear motifs.")
-        else:
-            principles.append("Simple and elegant design.")
-        principles.append("Dots and continuous lines reflect continuity and rhythm.")
-        return "\n\n".join(principles)
+    tiled = st.checkbox("Full-resolution tiled mode (large scans)", value=False, key="analyzer_tiled")
+    align = st.checkbox("Auto-align (deskew and centre before scoring)", value=True, key="analyzer_align")
+    diagnostics = st.checkbox("Show diagnostics", value=DIAGNOSTICS_DEFAULT, key="analyzer_diagnostics")
 
     if uploaded_file is not None:
-        img = Image.open(uploaded_file).convert("RGB")
-        st.image(img, caption="Uploaded Kolam", use_column_width=True)
-        img_array = np.array(img)
-        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-        try:
-            symmetry_score, line_density, complexity, edges = analyze_kolam(img_array)
-            principles = generate_principles(symmetry_score, line_density, complexity)
+        queue = get_analysis_queue()
+        index = load_gallery_index()
+        jobs = st.session_state.setdefault("analysis_jobs", {})
+        upload_key = f"{uploaded_file.name}:{uploaded_file.size}:{diagnostics}:{tiled}:{align}"
+        if upload_key not in jobs:
+            # A profiled rerun also profiles the analysis on its worker thread
+            analysis = profiling.profiled("analysis", run_analysis) if profiling.active() else run_analysis
+            try:
+                jobs[upload_key] = queue.submit(session_id(), analysis, uploaded_file.getvalue(), with_vector=index is not None and len(index) > 0, diagnostics=diagnostics, tiled=tiled, align=align)
+            except QueueFull as e:
+                st.warning(str(e))
+        job_id = jobs.get(upload_key)
+        job = queue.get(job_id) if job_id else None
+
+        # Poll with a short wait per tick; each Streamlit call lets a new interaction interrupt us
+        status = st.empty()
+        with profiling.stage("analysis"):
+            while job is not None and not job.done:
+                ahead = queue.position(job.id)
+                status.info(f"⏳ Analyzing… ({ahead} ahead of you in the queue)" if ahead else "⏳ Analyzing…")
+                queue.wait(job.id, timeout=0.25)
+                job = queue.get(job.id)
+        status.empty()
+
+        if job is None and job_id:
+            jobs.pop(upload_key, None)
+            st.warning("This analysis has expired, please upload the image again.")
+        elif job is not None and job.status != DONE:
+            jobs.pop(upload_key, None)   # let a re-upload try again
+            prefix = "Analysis timed out" if job.status == TIMEOUT else "Analysis failed"
+            st.error(f"{prefix}: {job.error}")
+        elif job is not None and job.result.get("edges") is None and st.session_state.get("analysis_edges", (None,))[0] != upload_key:
+            # Its arrays were handed to this session and replaced by a later upload's: analyse again
+            jobs.pop(upload_key, None)
+            st.rerun()
+        elif job is not None:
+            result = job.result
+            if result.get("edges") is not None:
+                # Arrays move to this session on first display; the queue's retained copy keeps
+                # only the scores, so finished jobs do not pin frames in memory
+                st.session_state.analysis_edges = (upload_key, result["edges"])
+                result["edges"] = None
+            # The browser gets a display-sized derivative; we only keep the grayscale frame
+            if not tiled:   # huge scans are only shown through the downscaled edge preview
+                show_thumbnail(st, uploaded_file.getvalue(), MAIN_COLUMN_PX, caption="Uploaded Kolam")
+            timer = result["timer"]
+            symmetry_score, line_density, complexity, edges = result["symmetry_score"], result["line_density"], result["complexity"], st.session_state.analysis_edges[1]
+            principles = result["principles"]
+
+            # Canny tuning reuses this upload's cached gradients; only hysteresis + contours re-run
+            gray = result.pop("gray", None)
+            cache = None
+            if gray is not None:
+                st.session_state.canny_cache = (upload_key, GradientCache(gray))
+            if not tiled:
+                cache = st.session_state.get("canny_cache")
+            if cache is not None and cache[0] == upload_key:
+                with st.expander("🎛 Tune edge detection"):
+                    blur = st.select_slider("Blur kernel:", BLUR_KERNELS, value=TUNING_DEFAULTS["blur"], key="tune_blur")
+                    canny_low, canny_high = st.slider("Canny thresholds:", 0, 500, (TUNING_DEFAULTS["canny_low"], TUNING_DEFAULTS["canny_high"]), key="tune_canny")
+                    binary_threshold = st.slider("Binary threshold (symmetry):", 0, 255, TUNING_DEFAULTS["binary_threshold"], key="tune_binary")
+                tuned = {"blur": blur, "canny_low": canny_low, "canny_high": canny_high, "binary_threshold": binary_threshold}
+                if tuned != TUNING_DEFAULTS:
+                    with timer.stage("retune"):
+                        symmetry_score, line_density, complexity, edges = cache[1].analyze(timer=timer, **tuned)
+                    principles = generate_principles(symmetry_score, line_density, complexity)
+
+            alignment = result["alignment"]
+            if alignment is not None:
+                if alignment["status"] == "aligned":
+                    st.caption(f"Auto-aligned: rotated {alignment['angle']:+.1f}°, cropped to {alignment['size'][0]}×{alignment['size'][1]} px ({alignment['ms']:.0f} ms).")
+                else:
+                    st.caption(f"Auto-align skipped: {alignment['status']}.")
+            if result["kolam_type"] is not None:
+                label, confidence = result["kolam_type"]
+                st.success(f"Detected kolam type: **{label}** ({confidence:.0%} confidence)")
+                principles = f"Detected kolam type: {label}.\n\n" + principles
             st.subheader("📊 Kolam Design Principles")
             st.write(principles)
             st.subheader("Detected Edges")
-            st.image(edges, clamp=True, use_column_width=True)
+            with timer.stage("display_edges", nbytes=edges.nbytes):
+                st.image(edges, clamp=True, use_column_width=True)
             # Download
             output = BytesIO(); output.write(principles.encode('utf-8')); output.seek(0)
             st.download_button("📥 Download Principles as Text", data=output, file_name="kolam_principles.txt", mime="text/plain", key="download_princ")
-        except Exception as e:
-            st.error(f"Analysis failed: {e}")
-
-    if st.button("⬅ Back to Home", key="analyzer_back"):
-        st.session_state.page = "Home"
-        st.experimental_rerun()
+            if st.button("🌐 Publish to Community", key="publish_analyzed"):
+                # The display-sized derivative is plenty for the gallery and keeps the store small
+                get_community_store().publish(
+                    get_thumbnails().best(uploaded_file.getvalue(), MAIN_COLUMN_PX), "analyzed",
+                    kolam_type=result["kolam_type"][0] if result["kolam_type"] is not None else None,
+                    symmetry=float(symmetry_score), density=float(line_density), complexity=int(complexity),
+                    title=uploaded_file.name)
+                st.success("Published! Find it on the Community page.")
+            if cache is not None and cache[0] == upload_key:
+                show_vectorizer(cache[1].gray, upload_key)
+            if index is not None and len(index) and result["vector"] is not None:
+                st.subheader("🔎 Kolams Like This One")
+                show_similar(index.query(result["vector"], k=8))
+            if timer.enabled:
+                if not result["reported"]:
+                    # One log line / registry update per analysis, not per rerun
+                    timer.finish(file=uploaded_file.name, queued_ms=round((job.started - job.submitted) * 1000, 3))
+                    result["reported"] = True
+                show_diagnostics(timer)
 
 def page_learn_more():
     st.header("📘 Learn About Kolam")
@@ -409,9 +728,7 @@ def page_learn_more():
         5. Temporality and community — often an ephemeral, communal practice.
         """
     )
-    if st.button("⬅ Back to Home", key="learn_back"):
-        st.session_state.page = "Home"
-        st.experimental_rerun()
+    st.button("⬅ Back to Home", key="learn_back", on_click=go_to, args=("Home",))
 
 def page_community():
     st.header("🌐 Community Kolam Gallery")
@@ -422,15 +739,57 @@ def page_community():
         "https://upload.wikimedia.org/wikipedia/commons/9/91/Kolam_design.jpg",
         "https://upload.wikimedia.org/wikipedia/commons/d/d0/Tamil_Kolam.jpg"
     ]
+    # Fetched concurrently once, then served from the local disk cache on later reruns
+    images = get_gallery_cache().prefetch(urls)
     cols = st.columns(3)
     for i, url in enumerate(urls):
         try:
-            cols[i].image(url, use_column_width=True, caption=f"Community {i+1}")
+            show_thumbnail(cols[i], images[url], MAIN_COLUMN_PX // 3, caption=f"Community {i+1}")
         except Exception:
             cols[i].write("Image load failed.")
-    if st.button("⬅ Back to Home", key="community_back"):
-        st.session_state.page = "Home"
-        st.experimental_rerun()
+    show_published()
+    index = load_gallery_index()
+    if index is not None and len(index):
+        st.markdown("---")
+        st.subheader("🔎 Find Kolams Like This One")
+        choices = index.ids[:200]
+        picked = st.selectbox("Gallery kolam:", range(len(choices)), format_func=lambda i: os.path.basename(choices[i]), key="community_similar")
+        show_similar(index.query(index.vectors[picked], k=8, exclude=choices[picked]))
+    st.button("⬅ Back to Home", key="community_back", on_click=go_to, args=("Home",))
+
+@fragment
+def show_published():
+    store = get_community_store()
+    st.markdown("---")
+    st.subheader("🪔 Published by the Community")
+    f1, f2 = st.columns(2)
+    kolam_type = f1.selectbox("Kolam type:", ["All"] + store.types(), key="community_type")
+    source = f2.selectbox("Source:", ["All", "generated", "analyzed"], key="community_source")
+    filters = {"kolam_type": None if kolam_type == "All" else kolam_type, "source": None if source == "All" else source}
+    # Stack of keyset cursors: the last entry fetches the current page
+    if st.session_state.get("community_filters") != filters:
+        st.session_state.community_filters = filters
+        st.session_state.community_cursors = [None]
+    cursors = st.session_state.community_cursors
+    rows, next_cursor = store.page(COMMUNITY_PAGE_SIZE, after=cursors[-1], **filters)
+    if not rows:
+        st.info("Nothing published yet. Generate or analyze a kolam and hit Publish.")
+        return
+    cols = st.columns(4)
+    for i, row in enumerate(rows):
+        caption = row["kolam_type"] or row["title"] or row["source"]
+        if row["symmetry"] is not None:
+            caption += f" · symmetry {row['symmetry']:.2f}"
+        try:
+            show_thumbnail(cols[i % 4], store.read_blob(row), MAIN_COLUMN_PX // 4, caption=caption)
+        except OSError:
+            cols[i % 4].write("Image missing.")
+    p1, p2, p3 = st.columns([1, 2, 1])
+    if len(cursors) > 1:
+        p1.button("← Newer", key="community_prev", on_click=cursors.pop)
+    p2.caption(f"Page {len(cursors)}")
+    if next_cursor is not None:
+        p3.button("Older →", key="community_next", on_click=cursors.append, args=(next_cursor,))
 
 # ---------------- Router ----------------
 page_map = {
@@ -443,6 +802,10 @@ page_map = {
 }
 
 current = st.session_state.page if "page" in st.session_state else "Home"
-page_map.get(current, page_home)()
+try:
+    page_map.get(current, page_home)()
+finally:
+    rerun_summary = rerun_profile.finish()
+show_profile(rerun_summary)
 
 # ------------- End of app -------------
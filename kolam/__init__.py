@@ -0,0 +1,15 @@
+# kolam/__init__.py
+# Shared code behind every Kolam Konnect entry script:
+#   kolam.geometry  dot layouts and stroke geometry of the generator kolams
+#   kolam.render    matplotlib drawing of that geometry (lazy, Agg backend) and fast OpenCV/SVG output
+#   kolam.analyze   photo decoding, analysis, alignment, search, classification, vectorizing
+#   kolam.assets    gallery cache, thumbnails and the community store
+#   kolam.document  the versioned .kolam save format (memory-mapped geometry arrays)
+#   kolam.jobs / kolam.metrics   background analysis queue and stage timers
+#   kolam.profiling  opt-in per-rerun cProfile / collapsed-stack dumps (KOLAM_PROFILE=1, ?profile=1)
+#   kolam.service   headless HTTP /render and /analyze service (python -m kolam.service)
+# Nothing heavy is imported here, so `import kolam.jobs` stays cheap for the Home page.
+import os
+
+# Repository root: default home for on-disk stores next to the app scripts
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,10 @@
+# kolam/analyze
+# Photo analysis. Modules are imported individually (they pull in NumPy/OpenCV):
+#   core        analyze_kolam, generate_principles
+#   decode      bounded, downscaling upload decode
+#   align       deskew/centre before scoring
+#   tuning      cached gradients for interactive Canny tuning
+#   tiled       out-of-core analysis of huge scans
+#   search      perceptual fingerprints + similar-kolam index
+#   classifier  kolam type classifier (weights in classifier.npz)
+#   vectorize   photo -> stroke geometry
@@ -0,0 +1,110 @@
+# kolam/analyze/align.py
+# Deskew and centre a photographed kolam before symmetry scoring
+import time
+
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.metrics import NULL_TIMER
+
+PROBE_SIDE = 512        # all estimation happens on a copy this size
+BUDGET_MS = 150.0
+MAX_ROTATION = 30.0     # larger angles are treated as the kolam's own orientation (e.g. rhombus layouts)
+MARGIN = 0.03
+
+
+def _ink_mask(small):
+    t, mask = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    dark_ink = np.count_nonzero(mask) > mask.size // 2
+    if dark_ink:
+        mask = cv2.bitwise_not(mask)   # ink is the minority class
+    # Thin strokes survive downscaling poorly; thicken, then drop speckle so a
+    # stray mark does not stretch the bounding box
+    mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    keep = np.zeros(n, np.uint8)
+    keep[1:] = stats[1:, cv2.CC_STAT_AREA] >= max(4, mask.size // 2000)
+    return keep[labels] * 255, t, dark_ink
+
+
+def estimate_alignment(gray):
+    """Rotation (degrees), ink centroid and crop size in full-resolution pixels, or None."""
+    h, w = gray.shape
+    scale = min(1.0, PROBE_SIDE / float(max(h, w)))
+    small = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    mask, t, dark_ink = _ink_mask(small)
+    pts = cv2.findNonZero(mask)
+    if pts is None or len(pts) < 50:
+        return None
+    (cx, cy), (rw, rh), angle = cv2.minAreaRect(pts)
+    # OpenCV versions disagree on the reported range ([-90, 0) vs (0, 90]);
+    # fold to the smallest rotation that squares the rect up
+    while angle > 45:
+        angle -= 90
+        rw, rh = rh, rw
+    while angle <= -45:
+        angle += 90
+        rw, rh = rh, rw
+    if abs(angle) > MAX_ROTATION:
+        angle = 0.0
+        x, y, bw, bh = cv2.boundingRect(pts)
+        cx, cy, rw, rh = x + bw / 2.0, y + bh / 2.0, bw, bh
+    if rw < 8 or rh < 8:
+        return None
+    cx, cy, rw, rh = cx / scale, cy / scale, rw / scale, rh / scale
+
+    # The mirror split needs the axis to the pixel: centre on the full-resolution ink centroid
+    # (in row bands, so no full-size mask is allocated)
+    m00 = m10 = m01 = 0.0
+    mode = cv2.THRESH_BINARY_INV if dark_ink else cv2.THRESH_BINARY
+    for y in range(0, h, 256):
+        _, band = cv2.threshold(gray[y:y + 256], t, 255, mode)
+        m = cv2.moments(band, binaryImage=True)
+        m00 += m["m00"]
+        m10 += m["m10"]
+        m01 += m["m01"] + y * m["m00"]
+    if m00 > 0:
+        mx, my = m10 / m00, m01 / m00
+        # Grow the crop so the rect still fits around the shifted centre
+        rw += 2 * abs(mx - cx) + 2 * abs(my - cy)
+        rh += 2 * abs(mx - cx) + 2 * abs(my - cy)
+        cx, cy = mx, my
+    return angle, (cx, cy), (rw, rh)
+
+
+def align_kolam(gray, budget_ms=BUDGET_MS, timer=NULL_TIMER):
+    """Rotate and crop ``gray`` so the kolam is upright and centred.
+
+    Returns ``(image, info)``. If estimation fails or overruns ``budget_ms``
+    the original frame comes back untouched and ``info["status"]`` says why.
+    """
+    t0 = time.perf_counter()
+    info = {"status": "skipped", "angle": 0.0, "ms": 0.0}
+    with timer.stage("align"):
+        try:
+            est = estimate_alignment(gray)
+        except cv2.error:
+            est = None
+        elapsed = (time.perf_counter() - t0) * 1000
+        if est is None:
+            info["status"] = "no kolam outline found"
+        elif elapsed > budget_ms:
+            info["status"] = f"over budget ({elapsed:.0f} ms > {budget_ms:.0f} ms)"
+        else:
+            angle, (cx, cy), (rw, rh) = est
+            out_w = int(round(rw * (1 + 2 * MARGIN)))
+            out_h = int(round(rh * (1 + 2 * MARGIN)))
+            # One warp does rotation, centring and cropping together
+            M = cv2.getRotationMatrix2D((cx, cy), angle, 1.0)
+            M[0, 2] += out_w / 2.0 - cx
+            M[1, 2] += out_h / 2.0 - cy
+            border = int(np.median(np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]])))
+            gray = cv2.warpAffine(gray, M, (out_w, out_h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+            info.update(status="aligned", angle=float(angle), size=(out_w, out_h))
+    info["ms"] = (time.perf_counter() - t0) * 1000
+    return gray, info
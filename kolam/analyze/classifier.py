@@ -0,0 +1,177 @@
+# kolam/analyze/classifier.py
+# Kolam type classifier: softmax regression over fixed-length features,
+# trained on images rasterised from the app's own generator geometry.
+import functools
+import os
+import sys
+import time
+
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.geometry import KOLAM_TYPES, kolam_strokes
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "classifier.npz")
+FEATURE_SIDE = 128
+LAYOUT_SIDE = 12
+ORIENTATION_BINS = 12
+
+
+# ---------------- Synthetic training images ----------------
+# Same geometry as the generator pages (kolam.geometry), rasterised with OpenCV.
+def synth_kolam(kind, rng, side=256):
+    """One randomised grayscale rendering: grid size, stroke width, polarity, pose and noise vary."""
+    n = int(rng.integers(4, 11))
+    strokes, dots = kolam_strokes(kind, n)
+    allpts = np.vstack(strokes + [dots])
+    lo, hi = allpts.min(axis=0), allpts.max(axis=0)
+    scale = (side * rng.uniform(0.6, 0.9)) / max(hi - lo)
+    centre = side / 2 + rng.uniform(-0.08, 0.08, 2) * side
+    ang = np.radians(rng.uniform(-12, 12))
+    rot = np.array([[np.cos(ang), -np.sin(ang)], [np.sin(ang), np.cos(ang)]])
+
+    def to_px(p):
+        q = (p - (lo + hi) / 2) * scale
+        q[:, 1] = -q[:, 1]   # matplotlib y points up
+        return (q @ rot.T + centre) * 16   # 4 fractional bits for cv2 shift=4
+
+    bg, ink = (255, int(rng.integers(0, 90))) if rng.random() < 0.7 else (int(rng.integers(0, 60)), 255)
+    img = np.full((side, side), bg, np.uint8)
+    lw = max(1, int(round(rng.uniform(1.0, 5.0) * side / 512)))
+    cv2.polylines(img, [to_px(s).astype(np.int32) for s in strokes], False, ink, lw, cv2.LINE_AA, shift=4)
+    if rng.random() < 0.7:
+        for x, y in (to_px(dots) / 16).astype(int):
+            cv2.circle(img, (int(x), int(y)), max(1, lw), ink, -1, cv2.LINE_AA)
+    noise = rng.normal(0, rng.uniform(0, 12), img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
+
+
+# ---------------- Features ----------------
+def kolam_features(gray):
+    """Fixed-length feature vector for a uint8 grayscale image (any size, either polarity)."""
+    small = cv2.resize(gray, (FEATURE_SIDE, FEATURE_SIDE), interpolation=cv2.INTER_AREA)
+    _, mask = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if mask.mean() > 0.5:
+        mask = 1 - mask   # ink is the minority class
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        ys, xs = np.array([0, FEATURE_SIDE - 1]), np.array([0, FEATURE_SIDE - 1])
+    crop = mask[ys.min():ys.max() + 1, xs.min():xs.max() + 1].astype(np.float32)
+    crop = cv2.resize(crop, (FEATURE_SIDE, FEATURE_SIDE), interpolation=cv2.INTER_AREA)
+
+    layout = cv2.resize(crop, (LAYOUT_SIDE, LAYOUT_SIDE), interpolation=cv2.INTER_AREA).ravel()
+    gx = cv2.Sobel(crop, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(crop, cv2.CV_32F, 0, 1, ksize=3)
+    mag, ang = cv2.cartToPolar(gx, gy)
+    idx = ((ang % np.pi) / np.pi * ORIENTATION_BINS).astype(np.int32) % ORIENTATION_BINS
+    orient = np.bincount(idx.ravel(), weights=mag.ravel(), minlength=ORIENTATION_BINS)
+    orient = orient / max(orient.sum(), 1e-6)
+    binary = (crop > 0.5).astype(np.uint8)
+    n_comp = cv2.connectedComponents(binary, connectivity=8)[0] - 1
+    n_holes = cv2.connectedComponents(1 - binary, connectivity=4)[0] - 1
+    extra = [
+        crop.mean(),
+        float(np.mean(np.abs(crop - crop[:, ::-1]))),   # left-right asymmetry
+        float(np.mean(np.abs(crop - crop[::-1, :]))),   # top-bottom asymmetry
+        float(np.mean(np.abs(crop - crop.T))),          # diagonal asymmetry
+        np.log1p(n_comp),
+        np.log1p(n_holes),
+    ]
+    return np.concatenate([layout, orient, np.asarray(extra)]).astype(np.float32)
+
+def features_batch(grays):
+    return np.stack([kolam_features(g) for g in grays])
+
+
+# ---------------- Model ----------------
+class KolamClassifier:
+    def __init__(self, weights, bias, mean, std, labels):
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.std = std
+        self.labels = list(labels)
+
+    def predict_proba(self, features):
+        z = ((features - self.mean) / self.std) @ self.weights + self.bias
+        z -= z.max(axis=1, keepdims=True)
+        p = np.exp(z)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def classify_batch(self, grays):
+        """Classify many images at once; returns ``[(label, probability), ...]``."""
+        proba = self.predict_proba(features_batch(grays))
+        best = proba.argmax(axis=1)
+        return [(self.labels[i], float(proba[k, i])) for k, i in enumerate(best)]
+
+    def classify(self, gray):
+        return self.classify_batch([gray])[0]
+
+    def save(self, path=MODEL_PATH):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, mean=self.mean, std=self.std, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as z:
+            return cls(z["weights"], z["bias"], z["mean"], z["std"], [str(s) for s in z["labels"]])
+
+
+@functools.lru_cache(maxsize=1)
+def load_classifier(path=MODEL_PATH):
+    # None when the model file has not been trained/shipped yet
+    if not os.path.exists(path):
+        return None
+    return KolamClassifier.load(path)
+
+
+def train(per_class=400, seed=0, epochs=400, lr=0.5, l2=1e-3):
+    rng = np.random.default_rng(seed)
+    X, y = [], []
+    for label, kind in enumerate(KOLAM_TYPES):
+        for _ in range(per_class):
+            X.append(kolam_features(synth_kolam(kind, rng)))
+            y.append(label)
+    X, y = np.stack(X), np.asarray(y)
+    mean, std = X.mean(axis=0), X.std(axis=0) + 1e-6
+    Xs = (X - mean) / std
+    k = len(KOLAM_TYPES)
+    W = np.zeros((X.shape[1], k), np.float32)
+    b = np.zeros(k, np.float32)
+    Y = np.eye(k, dtype=np.float32)[y]
+    # Full-batch gradient descent on the softmax cross-entropy; tiny problem, converges quickly
+    for _ in range(epochs):
+        z = Xs @ W + b
+        z -= z.max(axis=1, keepdims=True)
+        p = np.exp(z); p /= p.sum(axis=1, keepdims=True)
+        g = (p - Y) / len(y)
+        W -= lr * (Xs.T @ g + l2 * W)
+        b -= lr * g.sum(axis=0)
+    return KolamClassifier(W.astype(np.float32), b.astype(np.float32), mean.astype(np.float32), std.astype(np.float32), KOLAM_TYPES)
+
+
+def evaluate(model, per_class=100, seed=1):
+    rng = np.random.default_rng(seed)
+    grays, truth = [], []
+    for kind in KOLAM_TYPES:
+        for _ in range(per_class):
+            grays.append(synth_kolam(kind, rng))
+            truth.append(kind)
+    t0 = time.perf_counter()
+    preds = model.classify_batch(grays)
+    dt = time.perf_counter() - t0
+    acc = float(np.mean([p == t for (p, _), t in zip(preds, truth)]))
+    return acc, len(grays) / dt
+
+
+if __name__ == "__main__":
+    # python -m kolam.analyze.classifier [per_class]   -> trains and writes classifier.npz
+    per_class = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    model = train(per_class)
+    model.save()
+    acc, rate = evaluate(model)
+    print(f"Saved {MODEL_PATH}: held-out accuracy {acc:.3f}, {rate:.0f} images/s")
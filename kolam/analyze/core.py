@@ -0,0 +1,71 @@
+# kolam/analyze/core.py
+# Shared analyzer pipeline: symmetry, line density and contour complexity
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.metrics import NULL_TIMER
+
+SYMMETRY_BAND_ROWS = 256
+BINARY_THRESHOLD = 128         # symmetry compares pixels > this (what cv2.THRESH_BINARY keeps)
+
+
+def analyze_kolam(image, timer=NULL_TIMER, binary_threshold=BINARY_THRESHOLD, canny_low=50, canny_high=150, edges=None):
+    # Uploads arrive already decoded to grayscale; accept BGR arrays too
+    with timer.stage("grayscale"):
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        if h < 64 or w < 64:
+            gray = cv2.resize(gray, (max(64,w), max(64,h)))
+            h, w = gray.shape
+    timer.add_bytes("grayscale", gray.nbytes)
+    with timer.stage("symmetry"):
+        # Compare the left half with a mirrored *view* of the right half, a band of rows
+        # at a time, so no thresholded or flipped half-frame copies are ever allocated.
+        # (a > t) is exactly what cv2.THRESH_BINARY keeps as 255.
+        mid = w // 2
+        minw = min(mid, w - mid)
+        left = gray[:, :minw]
+        right = gray[:, ::-1][:, :minw]
+        matches = 0
+        for y in range(0, h, SYMMETRY_BAND_ROWS):
+            lb = left[y:y + SYMMETRY_BAND_ROWS] > binary_threshold
+            rb = right[y:y + SYMMETRY_BAND_ROWS] > binary_threshold
+            matches += int(np.count_nonzero(lb == rb))
+        del left, right
+        symmetry_score = float(matches / float(h * minw))
+    with timer.stage("canny"):
+        # Callers with cached gradients (see kolam.analyze.tuning) hand us the edges directly
+        if edges is None:
+            edges = cv2.Canny(gray, canny_low, canny_high)
+        line_density = float(cv2.countNonZero(edges) / edges.size)
+    timer.add_bytes("canny", edges.nbytes)
+    with timer.stage("contours"):
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        complexity = int(len(contours))
+    return symmetry_score, line_density, complexity, edges
+
+def generate_principles(symmetry_score, line_density, complexity):
+    principles = []
+    if symmetry_score > 0.85:
+        principles.append("High bilateral symmetry: strong left-right balance.")
+    elif symmetry_score > 0.6:
+        principles.append("Moderate symmetry: elements of balance with stylization.")
+    else:
+        principles.append("Low symmetry / asymmetrical pattern.")
+    if line_density > 0.12:
+        principles.append("Dense linework indicating intricate patterning.")
+    else:
+        principles.append("Light linework indicating minimal or geometric style.")
+    if complexity > 30:
+        principles.append("High structural complexity with many contours.")
+    elif complexity > 12:
+        principles.append("Moderate complexity with clear motifs.")
+    else:
+        principles.append("Simple and elegant design.")
+    principles.append("Dots and continuous lines reflect continuity and rhythm.")
+    return "\n\n".join(principles)
@@ -0,0 +1,105 @@
+# kolam/analyze/decode.py
+# Upload ingestion for the analyzer: decode bytes straight to grayscale with OpenCV
+import os
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.metrics import NULL_TIMER
+
+# ---------------- Budgets ----------------
+# All overridable from the environment, e.g. KOLAM_MAX_ANALYSIS_MB=16 on a small worker
+MAX_ANALYSIS_PIXELS = int(os.environ.get("KOLAM_MAX_ANALYSIS_PIXELS", 4_000_000))      # above this we decode at 1/2, 1/4 or 1/8 scale
+MAX_UPLOAD_PIXELS = int(os.environ.get("KOLAM_MAX_UPLOAD_PIXELS", 120_000_000))        # decompression-bomb guard (declared size)
+MAX_UPLOAD_BYTES = int(os.environ.get("KOLAM_MAX_UPLOAD_MB", 40)) * 1024 * 1024        # raw upload size guard
+MAX_ANALYSIS_BYTES = int(os.environ.get("KOLAM_MAX_ANALYSIS_MB", 64)) * 1024 * 1024    # working-memory budget per analysis
+# Working set per analysed pixel: grayscale frame + edge map + Canny's int16 gradients and scratch
+BYTES_PER_PIXEL = 8
+
+_REDUCED_GRAY_FLAGS = {}
+if cv2 is not None:
+    _REDUCED_GRAY_FLAGS = {
+        1: cv2.IMREAD_GRAYSCALE,
+        2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+        8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    }
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload is too large, malformed or cannot be decoded."""
+
+
+def probe_size(data):
+    # PIL only parses the header here, no pixel data is decoded
+    try:
+        with Image.open(BytesIO(data)) as im:
+            return im.size
+    except Image.DecompressionBombError:
+        # Over PIL's process-wide limit: callers apply their own caps with a readable
+        # error, so read the header through the format plugin rather than lift that limit
+        return _plugin_size(data)
+    except Exception:
+        raise UploadRejected("Unrecognised image format.")
+
+
+def _plugin_size(data):
+    # Image.open's format lookup without its decompression-bomb check
+    Image.init()
+    prefix = data[:16]
+    for fmt in Image.ID:
+        factory, accept = Image.OPEN[fmt]
+        result = not accept or accept(prefix)
+        if not result or isinstance(result, str):
+            continue
+        try:
+            with factory(BytesIO(data), "") as im:
+                return im.size
+        except Exception:
+            continue
+    raise UploadRejected("Unrecognised image format.")
+
+
+def reduction_factor(w, h, max_pixels=MAX_ANALYSIS_PIXELS):
+    for factor in (1, 2, 4, 8):
+        if (w // factor) * (h // factor) <= max_pixels:
+            return factor
+    return 8
+
+
+def decode_gray(data, max_pixels=MAX_ANALYSIS_PIXELS, timer=NULL_TIMER):
+    """Decode uploaded image bytes into a single uint8 grayscale frame.
+
+    Images above ``max_pixels`` are decoded at reduced resolution (JPEG
+    scales inside libjpeg, so the full-size frame is never materialised).
+    """
+    if cv2 is None:
+        raise RuntimeError("OpenCV (cv2) is required to decode uploads.")
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise UploadRejected(f"Upload is {len(data) // (1024 * 1024)} MB; the limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+    w, h = probe_size(data)
+    if w * h > MAX_UPLOAD_PIXELS:
+        raise UploadRejected(f"Image is {w}x{h} px; the limit is {MAX_UPLOAD_PIXELS // 1_000_000} MP.")
+
+    # The memory budget can be tighter than the pixel budget
+    max_pixels = min(max_pixels, MAX_ANALYSIS_BYTES // BYTES_PER_PIXEL)
+    factor = reduction_factor(w, h, max_pixels)
+    with timer.stage("decode", nbytes=len(data)):
+        gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), _REDUCED_GRAY_FLAGS[factor])
+    if gray is None:
+        raise UploadRejected("Could not decode image.")
+
+    # Some codecs ignore the reduced flags; enforce the budget either way
+    gh, gw = gray.shape[:2]
+    if gh * gw > max_pixels:
+        with timer.stage("downscale"):
+            scale = (max_pixels / float(gh * gw)) ** 0.5
+            gray = cv2.resize(gray, (max(1, int(gw * scale)), max(1, int(gh * scale))), interpolation=cv2.INTER_AREA)
+    return gray
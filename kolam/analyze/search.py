@@ -0,0 +1,199 @@
+# kolam/analyze/search.py
+# "Find kolams like this one": perceptual hashes + feature vectors over a gallery
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.analyze.core import analyze_kolam
+
+ORIENTATION_BINS = 8
+VECTOR_DIM = 3 + ORIENTATION_BINS
+FINGERPRINT_SIDE = 256   # features are computed on a small copy, not the full upload
+
+
+# ---------------- Fingerprinting ----------------
+def phash(gray):
+    # Classic DCT perceptual hash: 32x32 -> low 8x8 frequencies -> 64 bits vs median
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def orientation_histogram(gray, bins=ORIENTATION_BINS):
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    mag, ang = cv2.cartToPolar(gx, gy)
+    # Edge direction is unsigned for drawings: fold onto [0, pi)
+    idx = ((ang % np.pi) / np.pi * bins).astype(np.int32) % bins
+    hist = np.bincount(idx.ravel(), weights=mag.ravel(), minlength=bins).astype(np.float32)
+    total = hist.sum()
+    return hist / total if total > 0 else hist
+
+
+def fingerprint(gray):
+    """Return ``(phash, vector)`` for a uint8 grayscale image."""
+    h, w = gray.shape
+    scale = FINGERPRINT_SIDE / float(max(h, w))
+    if scale < 1:
+        gray = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    symmetry_score, line_density, complexity, _ = analyze_kolam(gray)
+    vec = np.empty(VECTOR_DIM, dtype=np.float32)
+    vec[0] = symmetry_score
+    vec[1] = min(1.0, line_density * 4)
+    vec[2] = math.log1p(complexity) / math.log1p(1000)
+    vec[3:] = orientation_histogram(gray)
+    norm = float(np.linalg.norm(vec))
+    if norm > 0:
+        vec /= norm
+    return phash(gray), vec
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# ---------------- BK-tree over 64-bit hashes ----------------
+class BKTree:
+    def __init__(self):
+        # node i: (hash, row, {distance: child})
+        self.nodes = []
+
+    def add(self, h, row):
+        node = (h, row, {})
+        if not self.nodes:
+            self.nodes.append(node)
+            return
+        cur = self.nodes[0]
+        while True:
+            d = hamming(h, cur[0])
+            child = cur[2].get(d)
+            if child is None:
+                cur[2][d] = len(self.nodes)
+                self.nodes.append(node)
+                return
+            cur = self.nodes[child]
+
+    def search(self, h, radius):
+        if not self.nodes:
+            return []
+        found = []
+        stack = [0]
+        while stack:
+            hh, row, children = self.nodes[stack.pop()]
+            d = hamming(h, hh)
+            if d <= radius:
+                found.append((d, row))
+            for cd, child in children.items():
+                if d - radius <= cd <= d + radius:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+# ---------------- Index ----------------
+class KolamIndex:
+    """Gallery index: ids, a uint64 hash column and a contiguous (N, D) float32 matrix."""
+
+    def __init__(self, ids=None, hashes=None, vectors=None):
+        self.ids = list(ids or [])
+        self.hashes = hashes if hashes is not None else np.empty(0, dtype=np.uint64)
+        self.vectors = vectors if vectors is not None else np.empty((0, VECTOR_DIM), dtype=np.float32)
+        self._pending = []
+        self._tree = None
+
+    def __len__(self):
+        return len(self.ids) + len(self._pending)
+
+    def add(self, item_id, h, vec):
+        self._pending.append((item_id, h, vec))
+        self._tree = None
+
+    def _flush(self):
+        if not self._pending:
+            return
+        ids, hs, vecs = zip(*self._pending)
+        self.ids.extend(ids)
+        self.hashes = np.concatenate([self.hashes, np.asarray(hs, dtype=np.uint64)])
+        self.vectors = np.ascontiguousarray(np.vstack([self.vectors, np.asarray(vecs, dtype=np.float32)]))
+        self._pending = []
+
+    def add_image(self, item_id, gray):
+        h, vec = fingerprint(gray)
+        self.add(item_id, h, vec)
+        return h, vec
+
+    def query(self, vec, k=8, exclude=None):
+        """Top-k gallery entries by cosine similarity; returns ``[(id, score), ...]``."""
+        self._flush()
+        n = len(self.ids)
+        if n == 0:
+            return []
+        scores = self.vectors @ np.asarray(vec, dtype=np.float32)
+        take = min(n, k + (1 if exclude is not None else 0))
+        top = np.argpartition(-scores, take - 1)[:take]
+        top = top[np.argsort(-scores[top])]
+        out = [(self.ids[i], float(scores[i])) for i in top if self.ids[i] != exclude]
+        return out[:k]
+
+    def near_duplicates(self, h, radius=6):
+        """Gallery entries whose perceptual hash is within ``radius`` bits."""
+        self._flush()
+        if self._tree is None:
+            # Built lazily so loading a saved index stays instant
+            self._tree = BKTree()
+            for row, hh in enumerate(self.hashes.tolist()):
+                self._tree.add(int(hh), row)
+        return [(self.ids[row], d) for d, row in self._tree.search(int(h), radius)]
+
+    # ---------------- Persistence ----------------
+    def save(self, path):
+        self._flush()
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "hashes.npy"), self.hashes)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = "r" if mmap else None
+        hashes = np.load(os.path.join(path, "hashes.npy"), mmap_mode=mode)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mode)
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            ids = json.load(f)
+        return cls(ids, hashes, vectors)
+
+
+def build_index(image_dir, exts=(".jpg", ".jpeg", ".png")):
+    index = KolamIndex()
+    for root, _, files in os.walk(image_dir):
+        for name in sorted(files):
+            if not name.lower().endswith(exts):
+                continue
+            path = os.path.join(root, name)
+            # Unaligned, like the query side (the Analyzer fingerprints the frame before align_kolam)
+            gray = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+            if gray is None:
+                continue
+            index.add_image(path, gray)
+    return index
+
+
+if __name__ == "__main__":
+    # python -m kolam.analyze.search <image_dir> <index_dir>
+    if len(sys.argv) != 3:
+        print("usage: python -m kolam.analyze.search <image_dir> <index_dir>")
+        sys.exit(2)
+    idx = build_index(sys.argv[1])
+    idx.save(sys.argv[2])
+    print(f"Indexed {len(idx)} images into {sys.argv[2]}")
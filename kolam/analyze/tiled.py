@@ -0,0 +1,269 @@
+# kolam/analyze/tiled.py
+# Out-of-core analysis for very large scans: memory-mapped grayscale, processed in tiles
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.analyze.core import BINARY_THRESHOLD
+from kolam.analyze.decode import probe_size, UploadRejected, MAX_UPLOAD_BYTES
+from kolam.metrics import NULL_TIMER
+
+TILE = 2048
+HALO = 16                      # Canny needs a few pixels of context; 16 covers blur + hysteresis
+TILED_MAX_PIXELS = int(os.environ.get("KOLAM_TILED_MAX_PIXELS", 600_000_000))   # = peak decode bytes
+PREVIEW_SIDE = 1024
+
+
+# ---------------- Loading ----------------
+def gray_memmap_from_bytes(data, path=None, max_pixels=TILED_MAX_PIXELS, max_bytes=MAX_UPLOAD_BYTES):
+    """Decode image bytes once into an on-disk ``.npy`` grayscale array and reopen it memory-mapped.
+
+    Codecs decode whole frames, so the decode holds one full grayscale frame
+    (``w * h`` bytes); both caps are checked from the header before that
+    happens, which bounds the peak at ``max_pixels`` bytes. Everything after
+    works tile by tile. ``max_bytes=None`` skips the upload size check (local files).
+    """
+    if max_bytes is not None and len(data) > max_bytes:
+        raise UploadRejected(f"Upload is {len(data) // (1024 * 1024)} MB; the limit is {max_bytes // (1024 * 1024)} MB.")
+    w, h = probe_size(data)
+    if w * h > max_pixels:
+        raise UploadRejected(f"Image is {w}x{h} px; the tiled limit is {max_pixels // 1_000_000} MP.")
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise UploadRejected("Could not decode image.")
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".npy", prefix="kolam_tiled_")
+        os.close(fd)
+    # Written straight from the frame: no second full-size copy through a writable map
+    np.save(path, gray)
+    del gray
+    return np.load(path, mmap_mode="r"), path
+
+
+def open_gray_memmap(path, cache_dir=None):
+    # .npy scans open directly; anything else is converted once and cached next to it
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    cache_dir = cache_dir or os.path.dirname(os.path.abspath(path))
+    cached = os.path.join(cache_dir, os.path.basename(path) + ".gray.npy")
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return np.load(cached, mmap_mode="r")
+    with open(path, "rb") as f:
+        arr, _ = gray_memmap_from_bytes(f.read(), cached, max_bytes=None)
+    return arr
+
+
+# ---------------- Per-tile work ----------------
+def _tile_edges(gray, y0, y1, x0, x1, halo):
+    h, w = gray.shape
+    hy0, hy1 = max(0, y0 - halo), min(h, y1 + halo)
+    hx0, hx1 = max(0, x0 - halo), min(w, x1 + halo)
+    region = np.ascontiguousarray(gray[hy0:hy1, hx0:hx1])
+    edges = cv2.Canny(region, 50, 150)
+    # Drop the halo: only the core belongs to this tile
+    return edges[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+
+
+def _strips(labels):
+    return labels[0].copy(), labels[-1].copy(), labels[:, 0].copy(), labels[:, -1].copy()
+
+
+def _touching(on, fg, bg):
+    # (edge component, background region) pairs that meet inside the tile. Side-by-side
+    # contacts are enough: left of a component's leftmost pixel is the region around
+    # it, and left of a hole's leftmost pixel is the component around the hole
+    if on.shape[1] < 2:
+        return np.empty((0, 2), np.int64)
+    switches = cv2.findNonZero(cv2.compare(on[:, 1:], on[:, :-1], cv2.CMP_NE))
+    if switches is None:
+        return np.empty((0, 2), np.int64)
+    xs, ys = switches.reshape(-1, 2).T
+    base = int(bg.max()) + 1
+    codes = np.unique((fg[ys, xs] + fg[ys, xs + 1]).astype(np.int64) * base + (bg[ys, xs] + bg[ys, xs + 1]))
+    return np.stack([codes // base, codes % base], axis=1)
+
+
+def _edge_tile(gray, y0, y1, x0, x1, halo, preview_scale):
+    core = _tile_edges(gray, y0, y1, x0, x1, halo)
+    count = int(np.count_nonzero(core))
+    on = (core > 0).astype(np.uint8)
+    # Edge components are 8-connected, so the background between them is 4-connected
+    # (the pairing findContours uses); holes are background regions cut off from the border
+    n_fg, fg = cv2.connectedComponents(on, connectivity=8, ltype=cv2.CV_32S)
+    n_bg, bg = cv2.connectedComponents(1 - on, connectivity=4, ltype=cv2.CV_32S)
+    pw = max(1, int(round((x1 - x0) * preview_scale)))
+    ph = max(1, int(round((y1 - y0) * preview_scale)))
+    preview = cv2.resize(core, (pw, ph), interpolation=cv2.INTER_AREA)
+    # Only the seams and the component/region contacts are needed to stitch across tiles
+    return count, (n_fg - 1, n_bg - 1), (_strips(fg), _strips(bg)), _touching(on, fg, bg) - 1, preview
+
+
+def _symmetry_tile(gray, y0, y1, j0, j1, threshold):
+    w = gray.shape[1]
+    left = np.asarray(gray[y0:y1, j0:j1])
+    right = np.asarray(gray[y0:y1, w - j1:w - j0])[:, ::-1]
+    # The same test as analyze_kolam's symmetry bands
+    return int(np.count_nonzero((left > threshold) == (right > threshold)))
+
+
+# ---------------- Stitching ----------------
+def _components(n, pairs):
+    """Smallest member of each node's connected component (``pairs`` are the graph's edges)."""
+    label = np.arange(n, dtype=np.int64)
+    if not len(pairs):
+        return label
+    a, b = pairs[:, 0], pairs[:, 1]
+    while True:
+        # Hook both ends and their current roots onto the smaller label, then compress
+        m = np.minimum(label[a], label[b])
+        new = label.copy()
+        for idx in (a, b, label[a], label[b]):
+            np.minimum.at(new, idx, m)
+        while True:
+            jumped = new[new]
+            if np.array_equal(jumped, new):
+                break
+            new = jumped
+        if np.array_equal(new, label):
+            return label
+        label = new
+
+
+def _seam_pairs(a, b, shifts=(-1, 0, 1)):
+    # Across a seam pixel i touches i-1, i, i+1 on the other side (8-connectivity),
+    # or only i with shifts=(0,) (4-connectivity)
+    pairs = []
+    for shift in shifts:
+        if shift < 0:
+            aa, bb = a[-shift:], b[:shift]
+        elif shift > 0:
+            aa, bb = a[:-shift], b[shift:]
+        else:
+            aa, bb = a, b
+        m = (aa >= 0) & (bb >= 0)
+        if m.any():
+            pairs.append(np.unique(np.stack([aa[m], bb[m]], axis=1), axis=0))
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+
+def _count_components(results, row_bounds, col_bounds):
+    """Outermost edge components across all tiles, i.e. what ``RETR_EXTERNAL`` counts.
+
+    Components are stitched across seams, and so is the background; background
+    regions that never reach the image border are holes, and whatever lies in
+    a hole is merged into the component around it.
+    """
+    nrows, ncols = len(row_bounds), len(col_bounds)
+    keys = sorted(results)
+    # Give every tile-local label a global id; background ids follow all edge ids
+    n_fg = [results[k][1][0] for k in keys]
+    n_bg = [results[k][1][1] for k in keys]
+    total_fg, total_bg = sum(n_fg), sum(n_bg)
+    fg_off = dict(zip(keys, np.cumsum([0] + n_fg[:-1])))
+    bg_off = dict(zip(keys, total_fg + np.cumsum([0] + n_bg[:-1])))
+
+    def glob(key, kind, side):
+        strip = results[key][2][kind][side]
+        return np.where(strip > 0, strip.astype(np.int64) - 1 + (fg_off, bg_off)[kind][key], -1)
+
+    TOP, BOTTOM, LEFT, RIGHT = range(4)
+    fg_fg, bg_bg, fg_bg = [], [], []
+    for key in keys:
+        pairs = results[key][3]
+        fg_bg.append(np.stack([pairs[:, 0] + fg_off[key], pairs[:, 1] + bg_off[key]], axis=1))
+
+    def seam(upper, lower):
+        (fa, ba), (fb, bb) = upper, lower
+        fg_fg.append(_seam_pairs(fa, fb))
+        bg_bg.append(_seam_pairs(ba, bb, (0,)))
+        fg_bg.append(_seam_pairs(fa, bb, (0,)))
+        fg_bg.append(_seam_pairs(fb, ba, (0,)))
+
+    for r in range(nrows):
+        for c in range(ncols - 1):
+            seam([glob((r, c), k, RIGHT) for k in (0, 1)], [glob((r, c + 1), k, LEFT) for k in (0, 1)])
+        if r + 1 < nrows:
+            # Whole-width strips so diagonal contacts at tile corners are caught too
+            seam([np.concatenate([glob((r, c), k, BOTTOM) for c in range(ncols)]) for k in (0, 1)],
+                 [np.concatenate([glob((r + 1, c), k, TOP) for c in range(ncols)]) for k in (0, 1)])
+    fg_fg, bg_bg, fg_bg = (np.concatenate(p) if p else np.empty((0, 2), np.int64) for p in (fg_fg, bg_bg, fg_bg))
+
+    # Background reaching the image border is outside; everything else is a hole
+    region = _components(total_fg + total_bg, bg_bg)
+    border = [glob((0, c), 1, TOP) for c in range(ncols)] + [glob((nrows - 1, c), 1, BOTTOM) for c in range(ncols)] \
+        + [glob((r, 0), 1, LEFT) for r in range(nrows)] + [glob((r, ncols - 1), 1, RIGHT) for r in range(nrows)]
+    border = np.concatenate(border)
+    outside = np.zeros(total_fg + total_bg, bool)
+    outside[np.unique(region[border[border >= 0]])] = True
+    outside = outside[region]
+    hole_fg = fg_bg[~outside[fg_bg[:, 1]]]
+    hole_bg = bg_bg[~outside[bg_bg[:, 0]]]
+    label = _components(total_fg + total_bg, np.concatenate([fg_fg, hole_bg, hole_fg]))
+    return len(np.unique(label[:total_fg]))
+
+
+# ---------------- Driver ----------------
+def _bounds(n, tile):
+    return [(s, min(n, s + tile)) for s in range(0, n, tile)]
+
+
+def analyze_tiled(gray, tile=TILE, halo=HALO, workers=None, timer=NULL_TIMER, binary_threshold=BINARY_THRESHOLD):
+    """Tile-by-tile equivalent of ``analyze_kolam`` for a (memory-mapped) grayscale array.
+
+    Returns ``(symmetry_score, line_density, complexity, edges_preview)``.
+    Complexity counts the outermost edge components stitched across tiles
+    (nested outlines are not counted), like ``RETR_EXTERNAL`` on the whole image.
+    Peak memory is roughly ``workers`` tiles plus a small preview.
+    """
+    h, w = gray.shape
+    workers = workers or min(8, os.cpu_count() or 2)
+    row_bounds, col_bounds = _bounds(h, tile), _bounds(w, tile)
+    preview_scale = min(1.0, PREVIEW_SIDE / float(max(h, w)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        with timer.stage("tiled_canny"):
+            futures = {
+                (r, c): pool.submit(_edge_tile, gray, y0, y1, x0, x1, halo, preview_scale)
+                for r, (y0, y1) in enumerate(row_bounds)
+                for c, (x0, x1) in enumerate(col_bounds)
+            }
+            results = {key: f.result() for key, f in futures.items()}
+
+        with timer.stage("tiled_symmetry"):
+            # Pair each left-half tile with its mirror tile on the right
+            minw = w // 2
+            sym_futures = [
+                pool.submit(_symmetry_tile, gray, y0, y1, j0, j1, binary_threshold)
+                for (y0, y1) in row_bounds
+                for (j0, j1) in _bounds(minw, tile)
+            ]
+            matches = sum(f.result() for f in sym_futures)
+
+    with timer.stage("tiled_stitch"):
+        complexity = _count_components(results, row_bounds, col_bounds)
+        edge_pixels = sum(res[0] for res in results.values())
+        preview = np.vstack([np.hstack([results[(r, c)][4] for c in range(len(col_bounds))]) for r in range(len(row_bounds))])
+
+    symmetry_score = float(matches / float(h * minw)) if minw else 1.0
+    line_density = float(edge_pixels / float(h * w))
+    timer.add_bytes("tiled_canny", h * w)
+    return symmetry_score, line_density, int(complexity), preview
+
+
+if __name__ == "__main__":
+    # python -m kolam.analyze.tiled <scan image or .npy>
+    if len(sys.argv) != 2:
+        print("usage: python -m kolam.analyze.tiled <image>")
+        sys.exit(2)
+    arr = open_gray_memmap(sys.argv[1])
+    s, d, c, _ = analyze_tiled(arr)
+    print(f"{arr.shape[1]}x{arr.shape[0]}  symmetry={s:.3f}  density={d:.4f}  complexity={c}")
@@ -0,0 +1,51 @@
+# kolam/analyze/tuning.py
+# Interactive Canny tuning: cache the blurred frame and Sobel gradients per upload,
+# so moving a threshold slider only re-runs hysteresis and contour extraction.
+from collections import OrderedDict
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+from kolam.analyze.core import analyze_kolam
+from kolam.metrics import NULL_TIMER
+
+BLUR_KERNELS = [0, 3, 5, 7, 9]
+DEFAULTS = {"blur": 0, "canny_low": 50, "canny_high": 150, "binary_threshold": 128}
+
+
+class GradientCache:
+    """Blurred frame + int16 Sobel derivatives for one grayscale image, keyed by blur kernel."""
+
+    def __init__(self, gray, max_entries=2):
+        self.gray = gray
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def gradients(self, blur=0):
+        entry = self._entries.get(blur)
+        if entry is None:
+            img = cv2.GaussianBlur(self.gray, (blur, blur), 0) if blur else self.gray
+            # Same 3x3 aperture and replicated border as cv2.Canny uses internally, so blur=0
+            # matches the default analyzer pixel for pixel
+            dx = cv2.Sobel(img, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE)
+            dy = cv2.Sobel(img, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE)
+            entry = (img, dx, dy)
+            self._entries[blur] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(blur)
+        return entry
+
+    def edges(self, low, high, blur=0):
+        _, dx, dy = self.gradients(blur)
+        return cv2.Canny(dx, dy, low, high)
+
+    def analyze(self, canny_low=50, canny_high=150, blur=0, binary_threshold=128, timer=NULL_TIMER):
+        img, _, _ = self.gradients(blur)
+        with timer.stage("hysteresis"):
+            edges = self.edges(canny_low, canny_high, blur)
+        return analyze_kolam(img, timer=timer, binary_threshold=binary_threshold, edges=edges)
@@ -0,0 +1,175 @@
+# kolam/analyze/vectorize.py
+# Photo -> editable stroke geometry: ink mask, NumPy thinning, skeleton tracing, Douglas-Peucker
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+MAX_SIDE = 1600          # thinning runs at this resolution at most; geometry is scaled back
+SIMPLIFY_EPSILON = 1.2   # Douglas-Peucker tolerance in working pixels
+MIN_STROKE_PX = 6        # drop skeleton spurs/specks shorter than this
+
+# Neighbour bit order, clockwise from north: P2..P9 in Zhang-Suen notation
+_OFFSETS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+
+def _zhang_suen_luts():
+    # Precompute the delete decision for every 8-neighbourhood code, per sub-iteration
+    luts = np.zeros((2, 256), dtype=bool)
+    for code in range(256):
+        p = [(code >> k) & 1 for k in range(8)]   # p[0]=P2 ... p[7]=P9
+        b = sum(p)
+        a = sum(1 for k in range(8) if p[k] == 0 and p[(k + 1) % 8] == 1)
+        if not (2 <= b <= 6 and a == 1):
+            continue
+        P2, P4, P6, P8 = p[0], p[2], p[4], p[6]
+        luts[0, code] = P2 * P4 * P6 == 0 and P4 * P6 * P8 == 0
+        luts[1, code] = P2 * P4 * P8 == 0 and P2 * P6 * P8 == 0
+    return luts
+
+
+_LUTS = _zhang_suen_luts()
+
+
+def _neighbour_codes(img):
+    # img is a padded 0/1 uint8 array; returns the 8-bit code for every interior pixel
+    h, w = img.shape
+    code = np.zeros((h - 2, w - 2), dtype=np.uint8)
+    for bit, (dy, dx) in enumerate(_OFFSETS):
+        code |= img[1 + dy:h - 1 + dy, 1 + dx:w - 1 + dx] << bit
+    return code
+
+
+def thin(mask, max_iter=200):
+    """Zhang-Suen thinning of a 0/1 (or 0/255) mask, vectorised with per-neighbourhood lookup tables."""
+    img = np.pad((mask > 0).astype(np.uint8), 1)
+    # Work only inside the ink bounding box
+    ys, xs = np.nonzero(img)
+    if len(ys) == 0:
+        return np.zeros(mask.shape, dtype=np.uint8)
+    y0, y1, x0, x1 = max(ys.min() - 1, 0), ys.max() + 2, max(xs.min() - 1, 0), xs.max() + 2
+    sub = img[y0:y1, x0:x1].copy()
+    for _ in range(max_iter):
+        changed = False
+        for lut in _LUTS:
+            inner = sub[1:-1, 1:-1]
+            delete = lut[_neighbour_codes(sub)] & (inner == 1)
+            if delete.any():
+                inner[delete] = 0
+                changed = True
+        if not changed:
+            break
+    img[y0:y1, x0:x1] = sub
+    return img[1:-1, 1:-1]
+
+
+def ink_mask(gray):
+    _, mask = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if mask.mean() > 0.5:
+        mask = 1 - mask   # ink is the minority class
+    # Close pinholes in chalk/rice-flour strokes so the skeleton does not fork around them
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8))
+
+
+# ---------------- Skeleton tracing ----------------
+def trace_skeleton(skel):
+    """Split a one-pixel-wide skeleton into polylines of (x, y) pixel coordinates."""
+    h, w = skel.shape
+    padded = np.pad(skel.astype(np.uint8), 1)
+    W = w + 2
+    flat = padded.ravel()
+    on = np.flatnonzero(flat)
+    # A diagonal step only counts when neither orthogonal pixel bridges it;
+    # otherwise every staircase corner would look like a junction
+    orth = [dy * W + dx for dy, dx in _OFFSETS if dy == 0 or dx == 0]
+    diag = [(dy * W + dx, dy * W, dx) for dy, dx in _OFFSETS if dy and dx]
+
+    def nbrs(i):
+        out = [i + s for s in orth if flat[i + s]]
+        out += [i + s for s, sy, sx in diag if flat[i + s] and not flat[i + sy] and not flat[i + sx]]
+        return out
+
+    degree = np.zeros(flat.shape, dtype=np.uint8)
+    for s in orth:
+        degree[on] += flat[on + s]
+    for s, sy, sx in diag:
+        degree[on] += flat[on + s] & (1 - flat[on + sy]) & (1 - flat[on + sx])
+
+    visited = set()       # undirected pixel edges already walked, stored as (min, max)
+    paths = []
+
+    def walk(start, nxt):
+        path = [start, nxt]
+        visited.add((min(start, nxt), max(start, nxt)))
+        prev, cur = start, nxt
+        while degree[cur] == 2:
+            options = [n for n in nbrs(cur) if n != prev and (min(cur, n), max(cur, n)) not in visited]
+            if not options:
+                break
+            prev, cur = cur, options[0]
+            visited.add((min(prev, cur), max(prev, cur)))
+            path.append(cur)
+            if cur == start:
+                break
+        return path
+
+    nodes = on[degree[on] != 2]
+    for node in nodes.tolist():
+        for n in nbrs(node):
+            if (min(node, n), max(node, n)) not in visited:
+                paths.append(walk(node, n))
+    # Whatever is left is closed loops made only of degree-2 pixels (loops, circles)
+    for p in on[degree[on] == 2].tolist():
+        for n in nbrs(p):
+            if (min(p, n), max(p, n)) not in visited:
+                paths.append(walk(p, n))
+
+    out = []
+    for path in paths:
+        idx = np.asarray(path)
+        out.append(np.stack([idx % W - 1, idx // W - 1], axis=1).astype(np.float32))
+    return out
+
+
+def simplify(polylines, epsilon=SIMPLIFY_EPSILON, min_length=MIN_STROKE_PX):
+    out = []
+    for pl in polylines:
+        if len(pl) < 2:
+            continue
+        closed = len(pl) > 3 and np.array_equal(pl[0], pl[-1])
+        length = float(np.sum(np.hypot(*np.diff(pl, axis=0).T)))
+        if length < min_length:
+            continue
+        approx = cv2.approxPolyDP(pl.reshape(-1, 1, 2), epsilon, closed).reshape(-1, 2)
+        if closed:
+            approx = np.vstack([approx, approx[:1]])
+        out.append(approx)
+    return out
+
+
+def vectorize(gray, max_side=MAX_SIDE, epsilon=SIMPLIFY_EPSILON):
+    """Photo (uint8 grayscale) -> list of simplified polylines in the photo's pixel coordinates."""
+    h, w = gray.shape
+    scale = min(1.0, max_side / float(max(h, w)))
+    work = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    skel = thin(ink_mask(work))
+    strokes = simplify(trace_skeleton(skel), epsilon)
+    return [s / scale for s in strokes], (w, h)
+
+
+# ---------------- Output ----------------
+def strokes_to_svg(strokes, size, color="#B22222", width=2.0, background=None):
+    w, h = size
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" width="{w}" height="{h}">']
+    if background:
+        parts.append(f'<rect width="100%" height="100%" fill="{background}"/>')
+    parts.append(f'<g fill="none" stroke="{color}" stroke-width="{width}" stroke-linecap="round" stroke-linejoin="round">')
+    for s in strokes:
+        pts = " ".join(f"{x:.1f},{y:.1f}" for x, y in s)
+        parts.append(f'<polyline points="{pts}"/>')
+    parts.append("</g></svg>")
+    return "\n".join(parts)
+
@@ -0,0 +1,5 @@
+# kolam/assets
+# Images the app serves. Imported individually (gallery_cache needs requests):
+#   gallery_cache  on-disk HTTP cache for external gallery images
+#   thumbnails     multi-size WebP/JPEG derivatives
+#   community      published kolams: blob store + SQLite index
@@ -0,0 +1,196 @@
+# kolam/assets/community.py
+# Published kolams: content-addressed image blobs + SQLite metadata index with keyset pagination
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from kolam import APP_DIR
+
+STORE_DIR = os.environ.get("KOLAM_COMMUNITY_DIR", os.path.join(APP_DIR, "community_store"))
+PAGE_SIZE = 12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kolams (
+    id          INTEGER PRIMARY KEY,
+    sha256      TEXT NOT NULL UNIQUE,
+    ext         TEXT NOT NULL,
+    created     REAL NOT NULL,
+    source      TEXT NOT NULL,          -- 'generated' or 'analyzed'
+    kolam_type  TEXT,
+    grid_size   INTEGER,
+    line_color  TEXT,
+    bg_color    TEXT,
+    symmetry    REAL,
+    density     REAL,
+    complexity  INTEGER,
+    title       TEXT,
+    bytes       INTEGER NOT NULL
+);
+-- One index per supported filter, each ending in the (created, id) sort key,
+-- so every page is a single index range scan whatever the table size
+CREATE INDEX IF NOT EXISTS kolams_recent ON kolams (created DESC, id DESC);
+CREATE INDEX IF NOT EXISTS kolams_by_type ON kolams (kolam_type, created DESC, id DESC);
+CREATE INDEX IF NOT EXISTS kolams_by_source ON kolams (source, created DESC, id DESC);
+CREATE INDEX IF NOT EXISTS kolams_by_type_source ON kolams (kolam_type, source, created DESC, id DESC);
+"""
+
+COLUMNS = ("id", "sha256", "ext", "created", "source", "kolam_type", "grid_size", "line_color",
+           "bg_color", "symmetry", "density", "complexity", "title", "bytes")
+META_FIELDS = ("kolam_type", "grid_size", "line_color", "bg_color", "symmetry", "density", "complexity", "title")
+
+_MAGIC = ((b"\x89PNG", "png"), (b"\xff\xd8", "jpg"), (b"RIFF", "webp"), (b"GIF8", "gif"))
+
+
+def sniff_ext(data):
+    for magic, ext in _MAGIC:
+        if data.startswith(magic):
+            return ext
+    return "bin"
+
+
+class CommunityStore:
+    """Blobs live at ``blobs/ab/cd/<sha256>.<ext>``; metadata in ``index.sqlite3``.
+
+    Publishing the same image twice returns the existing row. Pages are
+    fetched with a ``(created, id)`` cursor rather than OFFSET, so page N
+    costs the same as page 1.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()   # one connection shared by Streamlit's script threads
+
+    # ---------------- Blobs ----------------
+    def blob_path(self, sha256, ext):
+        return os.path.join(self.root, "blobs", sha256[:2], sha256[2:4], f"{sha256}.{ext}")
+
+    def read_blob(self, row):
+        with open(self.blob_path(row["sha256"], row["ext"]), "rb") as f:
+            return f.read()
+
+    def _write_blob(self, data):
+        sha = hashlib.sha256(data).hexdigest()
+        ext = sniff_ext(data)
+        path = self.blob_path(sha, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return sha, ext
+
+    # ---------------- Index ----------------
+    def publish(self, data, source, created=None, **meta):
+        """Store ``data`` and index it; returns the row id (existing one for duplicates)."""
+        unknown = set(meta) - set(META_FIELDS)
+        if unknown:
+            raise TypeError(f"unknown metadata: {', '.join(sorted(unknown))}")
+        sha, ext = self._write_blob(data)
+        row = {f: meta.get(f) for f in META_FIELDS}
+        row.update(sha256=sha, ext=ext, source=source, bytes=len(data),
+                   created=time.time() if created is None else created)
+        names = list(row)
+        with self._lock, self.db:
+            cur = self.db.execute(
+                f"INSERT OR IGNORE INTO kolams ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                [row[n] for n in names])
+            if cur.rowcount:
+                return cur.lastrowid
+            return self.db.execute("SELECT id FROM kolams WHERE sha256 = ?", (sha,)).fetchone()[0]
+
+    def publish_many(self, items):
+        """Bulk insert of ``(data, source, meta)`` tuples in one transaction (imports, benchmarks)."""
+        rows = []
+        now = time.time()
+        for data, source, meta in items:
+            sha, ext = self._write_blob(data)
+            rows.append((sha, ext, meta.get("created", now), source, len(data)) + tuple(meta.get(f) for f in META_FIELDS))
+        names = ("sha256", "ext", "created", "source", "bytes") + META_FIELDS
+        with self._lock, self.db:
+            self.db.executemany(
+                f"INSERT OR IGNORE INTO kolams ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", rows)
+
+    def page(self, limit=PAGE_SIZE, after=None, kolam_type=None, source=None):
+        """Newest-first page of rows; returns ``(rows, cursor)`` where ``cursor`` feeds the next call (None at the end)."""
+        where, args = [], []
+        if kolam_type:
+            where.append("kolam_type = ?"); args.append(kolam_type)
+        if source:
+            where.append("source = ?"); args.append(source)
+        if after is not None:
+            where.append("(created, id) < (?, ?)"); args.extend(after)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM kolams"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created DESC, id DESC LIMIT ?"
+        args.append(limit + 1)   # one extra row tells us whether another page exists
+        with self._lock:
+            rows = self.db.execute(sql, args).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        cursor = (rows[-1]["created"], rows[-1]["id"]) if more else None
+        return rows, cursor
+
+    def get(self, kolam_id):
+        with self._lock:
+            return self.db.execute(f"SELECT {', '.join(COLUMNS)} FROM kolams WHERE id = ?", (kolam_id,)).fetchone()
+
+    def types(self):
+        # Skip-scan over the type index: one probe per distinct value, not a table scan
+        out = []
+        with self._lock:
+            row = self.db.execute("SELECT MIN(kolam_type) FROM kolams WHERE kolam_type IS NOT NULL").fetchone()
+            while row and row[0] is not None:
+                out.append(row[0])
+                row = self.db.execute("SELECT MIN(kolam_type) FROM kolams WHERE kolam_type > ?", (row[0],)).fetchone()
+        return out
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM kolams").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(root, n):
+    # Synthetic rows with tiny distinct blobs; measures listing/filtering, not image I/O
+    import random
+    store = CommunityStore(root)
+    types = ["Straight Lines", "Connected Diamonds", "Diamond with Arcs", "Loops/Arcs", "Mixed", "Unsymmetrical Dots"]
+    rng = random.Random(0)
+    t0 = time.perf_counter()
+    store.publish_many(
+        (f"kolam-{i}".encode(), rng.choice(("generated", "analyzed")),
+         {"kolam_type": rng.choice(types), "grid_size": rng.randint(4, 10), "created": 1.7e9 + i})
+        for i in range(n))
+    print(f"inserted {n} rows in {time.perf_counter() - t0:.1f} s ({len(store)} total)")
+    for label, kw in (("all", {}), ("type", {"kolam_type": "Mixed"}), ("type+source", {"kolam_type": "Mixed", "source": "analyzed"})):
+        cursor, pages, t0 = None, 0, time.perf_counter()
+        worst = 0.0
+        while pages < 200:
+            t1 = time.perf_counter()
+            rows, cursor = store.page(after=cursor, **kw)
+            worst = max(worst, time.perf_counter() - t1)
+            pages += 1
+            if cursor is None:
+                break
+        print(f"{label:12s} {pages} pages, avg {(time.perf_counter() - t0) / pages * 1000:.3f} ms, worst {worst * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m kolam.assets.community <store_dir> [rows]   (seeds synthetic rows and times pagination)")
+        sys.exit(1)
+    _bench(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
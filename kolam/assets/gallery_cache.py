@@ -0,0 +1,144 @@
+# kolam/assets/gallery_cache.py
+# Community gallery images: concurrent pooled fetches + on-disk cache with HTTP revalidation
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = os.environ.get("KOLAM_GALLERY_CACHE", os.path.join(tempfile.gettempdir(), "kolam_gallery_cache"))
+MAX_CACHE_BYTES = int(os.environ.get("KOLAM_GALLERY_CACHE_MB", 256)) * 1024 * 1024
+FRESH_SECONDS = 24 * 3600       # serve without revalidating for this long
+TIMEOUT = (3.05, 10)            # (connect, read) seconds
+WORKERS = 8
+USER_AGENT = "KolamKonnect/1.0 (gallery cache)"
+
+
+class GalleryCache:
+    """Fetch-through cache for gallery images.
+
+    Each URL is stored as ``<sha256>.bin`` plus a ``.json`` sidecar with the
+    ETag/Last-Modified validators. File mtime doubles as the LRU clock.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, fresh_seconds=FRESH_SECONDS, timeout=TIMEOUT, workers=WORKERS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.timeout = timeout
+        self.workers = workers
+        os.makedirs(cache_dir, exist_ok=True)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kolam-gallery")
+        self._evict_lock = threading.Lock()
+
+    # ---------------- Disk tier ----------------
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".bin", base + ".json"
+
+    def _read(self, url):
+        blob, meta = self._paths(url)
+        try:
+            with open(meta, encoding="utf-8") as f:
+                info = json.load(f)
+            with open(blob, "rb") as f:
+                return f.read(), info
+        except (OSError, ValueError):
+            return None, None
+
+    def _write(self, url, data, resp):
+        blob, meta = self._paths(url)
+        info = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "content_type": resp.headers.get("Content-Type"),
+            "size": len(data),
+            "fetched": time.time(),
+        }
+        # Write-then-rename so a concurrent reader never sees half a file
+        for path, payload, mode in ((blob, data, "wb"), (meta, json.dumps(info).encode("utf-8"), "wb")):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, mode) as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        return info
+
+    def _touch(self, url, info=None):
+        blob, meta = self._paths(url)
+        if info is not None:
+            with open(meta, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+        try:
+            os.utime(blob)
+        except OSError:
+            pass
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in ``max_bytes``."""
+        with self._evict_lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                for p in (path, path[:-4] + ".json"):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                total -= size
+
+    # ---------------- Network tier ----------------
+    def get(self, url):
+        """Image bytes for ``url`` (cached, revalidated or freshly fetched); ``None`` if unavailable."""
+        data, info = self._read(url)
+        if data is not None and time.time() - info.get("fetched", 0) < self.fresh_seconds:
+            self._touch(url)
+            return data
+        headers = {}
+        if info:
+            if info.get("etag"):
+                headers["If-None-Match"] = info["etag"]
+            if info.get("last_modified"):
+                headers["If-Modified-Since"] = info["last_modified"]
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            if resp.status_code == 304 and data is not None:
+                info["fetched"] = time.time()
+                self._touch(url, info)
+                return data
+            resp.raise_for_status()
+        except requests.RequestException:
+            return data   # serve stale rather than nothing
+        data = resp.content
+        self._write(url, data, resp)
+        self.evict()
+        return data
+
+    def prefetch(self, urls):
+        """Fetch many URLs concurrently; returns ``{url: bytes or None}`` in input order."""
+        futures = [(url, self._pool.submit(self.get, url)) for url in urls]
+        return {url: f.result() for url, f in futures}
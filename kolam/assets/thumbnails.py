@@ -0,0 +1,118 @@
+# kolam/assets/thumbnails.py
+# Multi-size image derivatives (WebP, progressive JPEG fallback) so the browser
+# gets roughly the pixels a column can show instead of the full original.
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, features
+
+WIDTHS = (256, 512, 1024)
+DEVICE_PIXEL_RATIO = 1.5     # a little headroom for HiDPI screens
+THUMB_DIR = os.environ.get("KOLAM_THUMB_DIR", os.path.join(tempfile.gettempdir(), "kolam_thumbnails"))
+WEBP = features.check("webp")
+QUALITY = 80
+
+
+def pick_width(column_px, dpr=DEVICE_PIXEL_RATIO, widths=WIDTHS):
+    """Smallest derivative width that still fills a column of ``column_px`` CSS pixels."""
+    need = column_px * dpr
+    for w in widths:
+        if w >= need:
+            return w
+    return widths[-1]
+
+
+def make_derivative(data, width, lossless=False):
+    """Encode ``data`` (any PIL-readable image) at most ``width`` px wide; returns ``(bytes, mime)``."""
+    im = Image.open(BytesIO(data))
+    if im.width > width:
+        # JPEG can decode straight at 1/2, 1/4, 1/8 scale, which skips most of the work
+        im.draft("RGB", (width, max(1, im.height * width // im.width)))
+    has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+    im = im.convert("RGBA" if has_alpha else "RGB")
+    if im.width > width:
+        im = im.resize((width, max(1, round(im.height * width / im.width))), Image.LANCZOS)
+    out = BytesIO()
+    if WEBP:
+        im.save(out, "WEBP", quality=QUALITY, lossless=lossless, method=4)
+        return out.getvalue(), "image/webp"
+    if has_alpha or lossless:
+        im.save(out, "PNG", optimize=True)
+        return out.getvalue(), "image/png"
+    im.save(out, "JPEG", quality=QUALITY, progressive=True, optimize=True)
+    return out.getvalue(), "image/jpeg"
+
+
+class ThumbnailStore:
+    """Disk-backed derivatives keyed by source content hash and width.
+
+    ``best()`` returns the right size immediately (encoding it if needed) and
+    queues the remaining widths on a background pool.
+    """
+
+    def __init__(self, cache_dir=THUMB_DIR, widths=WIDTHS, workers=2):
+        self.cache_dir = cache_dir
+        self.widths = widths
+        os.makedirs(cache_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kolam-thumbs")
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key, width, lossless):
+        ext = "webp" if WEBP else ("png" if lossless else "jpg")
+        return os.path.join(self.cache_dir, f"{key}_{width}{'_l' if lossless else ''}.{ext}")
+
+    def _ensure(self, data, key, width, lossless):
+        path = self._path(key, width, lossless)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        thumb, _ = make_derivative(data, width, lossless)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(thumb)
+        os.replace(tmp, path)
+        return thumb
+
+    def _ensure_once(self, data, key, width, lossless):
+        # Foreground and background requests for the same derivative share one encode
+        ident = (key, width, lossless)
+        with self._lock:
+            fut = self._inflight.get(ident)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(self._ensure, data, key, width, lossless)
+            self._inflight[ident] = fut
+        # Outside the lock: a future that already finished runs the callback right here
+        fut.add_done_callback(lambda _f: self._forget(ident))
+        return fut
+
+    def _forget(self, ident):
+        with self._lock:
+            self._inflight.pop(ident, None)
+
+    def schedule(self, data, lossless=False):
+        """Generate every width in the background (e.g. right after a gallery fetch or a render)."""
+        key = hashlib.sha256(data).hexdigest()[:32]
+        for w in self.widths:
+            if not os.path.exists(self._path(key, w, lossless)):
+                self._ensure_once(data, key, w, lossless)
+        return key
+
+    def best(self, data, column_px, lossless=False):
+        """Derivative bytes for a column ``column_px`` wide; falls back to the original on decode errors."""
+        key = hashlib.sha256(data).hexdigest()[:32]
+        width = pick_width(column_px, widths=self.widths)
+        try:
+            thumb = self._ensure_once(data, key, width, lossless).result()
+        except Exception:
+            return data
+        for w in self.widths:
+            if w != width and not os.path.exists(self._path(key, w, lossless)):
+                self._ensure_once(data, key, w, lossless)
+        # Never send more bytes than the original
+        return thumb if len(thumb) < len(data) else data
@@ -0,0 +1,245 @@
+# kolam/document.py
+# The .kolam document: a saved design that reopens without recomputing geometry.
+#
+# A .kolam file is a ZIP container (like NumPy's .npz) holding
+#   kolam.json     manifest: format name and version, generator parameters, style,
+#                  optional analyzer results, and the dtype/shape of every array
+#   points.npy     float32 (P, 2) vertices of all strokes, end to end
+#   offsets.npy    int64 (S + 1,) start of each stroke in points (last = P)
+#   dots.npy       float32 (D, 2) dot positions
+#   analysis/*.npy arrays among the analyzer results (e.g. the search fingerprint)
+# Arrays are stored uncompressed by default and aligned inside the file, so
+# ``load`` maps them straight from disk (or views them in an uploaded buffer)
+# without copying; ``compress=True`` trades that for smaller files.
+import io
+import json
+import os
+import struct
+import time
+import zipfile
+import zlib
+
+import numpy as np
+
+FORMAT = "kolam"
+VERSION = 1
+EXTENSION = ".kolam"
+MIME = "application/x-kolam"
+MANIFEST = "kolam.json"
+ALIGN = 64
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")        # zip local file header, 30 bytes
+# What zipfile / NumPy raise on truncated, corrupted or hand-edited files (zipfile
+# uses NotImplementedError / RuntimeError for versions and flag bits it cannot handle)
+_DAMAGED = (KeyError, TypeError, IndexError, EOFError, struct.error, zlib.error, zipfile.BadZipFile,
+            NotImplementedError, RuntimeError)
+
+
+class KolamDocument:
+    """Stroke geometry, dots and the settings that made them.
+
+    ``points`` / ``offsets`` / ``dots`` may be read-only memory maps or views
+    into the buffer the document was loaded from.
+    """
+
+    def __init__(self, points, offsets, dots, generator=None, style=None, analysis=None, version=VERSION):
+        self.points = points
+        self.offsets = offsets
+        self.dots = dots
+        self.generator = dict(generator or {})
+        self.style = dict(style or {})
+        self.analysis = analysis
+        self.version = version
+
+    @classmethod
+    def from_strokes(cls, strokes, dots, generator=None, style=None, analysis=None):
+        lengths = np.fromiter((len(s) for s in strokes), np.int64, len(strokes))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        points = np.concatenate(strokes).astype(np.float32) if len(strokes) else np.zeros((0, 2), np.float32)
+        return cls(points, offsets, np.asarray(dots, np.float32).reshape(-1, 2), generator, style, analysis)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def strokes(self):
+        """Polylines as views into ``points`` (no copies)."""
+        if not len(self):
+            return []
+        return np.split(self.points, self.offsets[1:-1])
+
+    # ---------------- Writing ----------------
+    def save(self, target, compress=False):
+        """Write to a path or binary file object."""
+        arrays = {"points.npy": self.points, "offsets.npy": self.offsets, "dots.npy": self.dots}
+        analysis, analysis_arrays = _split_analysis(self.analysis)
+        arrays.update(analysis_arrays)
+        manifest = {
+            "format": FORMAT,
+            "version": VERSION,
+            "created": time.time(),
+            "generator": self.generator,
+            "style": self.style,
+            "analysis": analysis,
+            "arrays": {name: {"dtype": np.asarray(a).dtype.str, "shape": list(np.shape(a))} for name, a in arrays.items()},
+        }
+        method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(MANIFEST, json.dumps(manifest, default=_json_default))
+            for name, a in arrays.items():
+                _write_array(zf, name, np.asarray(a), method)
+
+    def to_bytes(self, compress=False):
+        buf = io.BytesIO()
+        self.save(buf, compress)
+        return buf.getvalue()
+
+
+def _json_default(value):
+    # NumPy scalars in generator parameters / analyzer results
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _split_analysis(analysis):
+    if analysis is None:
+        return None, {}
+    plain, arrays = {}, {}
+    for key, value in analysis.items():
+        if isinstance(value, np.ndarray):
+            arrays[f"analysis/{key}.npy"] = value
+        else:
+            plain[key] = value
+    return plain, arrays
+
+
+def _write_array(zf, name, a, method):
+    header = io.BytesIO()
+    np.lib.format.write_array_header_2_0(header, np.lib.format.header_data_from_array_1_0(a))
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = method
+    if method == zipfile.ZIP_STORED:
+        # Pad the local header's extra field so the array data starts on an ALIGN boundary
+        start = zf.fp.tell() + _LOCAL_HEADER.size + len(name.encode()) + len(header.getvalue())
+        pad = (-(start + 4)) % ALIGN
+        info.extra = struct.pack("<HH", 0xCAFE, pad) + b"\0" * pad
+    with zf.open(info, "w", force_zip64=a.nbytes > 2 ** 31) as f:
+        f.write(header.getvalue())
+        f.write(np.ascontiguousarray(a).data)
+
+
+# ---------------- Reading ----------------
+def load(source, mmap=True):
+    """Open a .kolam from a path, bytes, or binary file object.
+
+    Stored arrays come back without copying: memory-mapped from a path (when
+    ``mmap``) or as views into ``bytes``. Raises ``ValueError`` for files that
+    are not .kolam documents or come from a newer format version.
+    """
+    path = source if isinstance(source, (str, os.PathLike)) else None
+    buffer = bytes(source) if isinstance(source, (bytes, bytearray, memoryview)) else None
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(buffer) if buffer is not None else source)
+    except zipfile.BadZipFile:
+        raise ValueError("not a .kolam file")
+    except _DAMAGED as e:
+        raise ValueError(f"damaged .kolam file ({type(e).__name__}: {e})")
+    try:
+        with zf:
+            try:
+                manifest = json.loads(zf.read(MANIFEST))
+            except KeyError:
+                raise ValueError("not a .kolam file (no manifest)")
+            except ValueError:
+                raise ValueError("damaged .kolam file (unreadable manifest)")
+            _check_manifest(manifest, zf.namelist())
+            arrays = {name: _read_array(zf, zf.getinfo(name), path if mmap else None, buffer) for name in manifest["arrays"]}
+    except _DAMAGED + (OSError,) as e:
+        # The container opened, so a failing read (e.g. a seek to a corrupt offset) is damage too
+        raise ValueError(f"damaged .kolam file ({type(e).__name__}: {e})")
+    points, offsets, dots = arrays["points.npy"], arrays["offsets.npy"], arrays["dots.npy"]
+    if points.ndim != 2 or points.shape[1] != 2 or dots.ndim != 2 or dots.shape[1] != 2 or offsets.ndim != 1 \
+            or not len(offsets) or offsets[0] != 0 or offsets[-1] != len(points) or (np.diff(offsets) < 0).any():
+        raise ValueError("damaged .kolam file (stroke arrays do not match)")
+    analysis = manifest.get("analysis")
+    if analysis is not None:
+        analysis = dict(analysis)
+        for name, a in arrays.items():
+            if name.startswith("analysis/"):
+                analysis[name[len("analysis/"):-len(".npy")]] = a
+    return KolamDocument(points, offsets, dots, manifest.get("generator"), manifest.get("style"), analysis, manifest["version"])
+
+
+def _check_manifest(manifest, members):
+    # Everything load() relies on, so a bad file fails with ValueError and not deeper down
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT:
+        raise ValueError("not a .kolam file")
+    version = manifest.get("version")
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError("damaged .kolam file (bad version)")
+    if version > VERSION:
+        raise ValueError(f".kolam version {version} is newer than this app supports ({VERSION})")
+    for key in ("generator", "style", "analysis"):
+        if not isinstance(manifest.get(key), (dict, type(None))):
+            raise ValueError(f"damaged .kolam file (bad {key})")
+    arrays = manifest.get("arrays")
+    if not isinstance(arrays, dict):
+        raise ValueError("damaged .kolam file (no array list)")
+    for name in ("points.npy", "offsets.npy", "dots.npy"):
+        if name not in arrays:
+            raise ValueError(f"damaged .kolam file (no {name})")
+    for name in arrays:
+        if name not in ("points.npy", "offsets.npy", "dots.npy") and not (name.startswith("analysis/") and name.endswith(".npy")):
+            raise ValueError(f"damaged .kolam file (unexpected member {name!r})")
+        if name not in members:
+            raise ValueError(f"damaged .kolam file ({name} is missing)")
+
+
+def _read_array(zf, info, path, buffer):
+    if info.compress_type != zipfile.ZIP_STORED or (path is None and buffer is None):
+        with zf.open(info) as f:
+            return np.lib.format.read_array(f)
+    # Stored member: find where its data starts and view it in place
+    if buffer is not None:
+        local = buffer[info.header_offset:info.header_offset + _LOCAL_HEADER.size]
+    else:
+        with open(path, "rb") as f:
+            f.seek(info.header_offset)
+            local = f.read(_LOCAL_HEADER.size)
+    fields = _LOCAL_HEADER.unpack(local)
+    data_start = info.header_offset + _LOCAL_HEADER.size + fields[-2] + fields[-1]
+    with zf.open(info) as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran, dtype = read_header(f)
+        offset = data_start + f.tell()
+    order = "F" if fortran else "C"
+    if buffer is not None:
+        count = int(np.prod(shape))
+        return np.frombuffer(buffer, dtype, count, offset).reshape(shape, order=order)
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype)
+    return np.memmap(path, dtype, "r", offset, shape, order)
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(count, path):
+    rng = np.random.default_rng(0)
+    starts = rng.random((count, 2)).astype(np.float32) * 1000
+    points = np.stack([starts, starts + 1], axis=1).reshape(-1, 2)
+    doc = KolamDocument(points, np.arange(0, 2 * count + 1, 2, dtype=np.int64), starts,
+                        {"kolam_type": "benchmark", "grid_size": count}, {"line_color": "#B22222"})
+    t0 = time.perf_counter()
+    doc.save(path)
+    saved = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    loaded = load(path)
+    opened = time.perf_counter() - t0
+    same = np.array_equal(loaded.points, doc.points) and np.array_equal(loaded.offsets, doc.offsets)
+    print(f"{count} strokes, {os.path.getsize(path) / 2 ** 20:.1f} MB: saved in {saved * 1000:.0f} ms, "
+          f"opened in {opened * 1000:.2f} ms ({type(loaded.points).__name__}), round trip ok: {same}")
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000, os.path.join(tempfile.gettempdir(), "bench.kolam"))
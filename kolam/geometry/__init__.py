@@ -0,0 +1,7 @@
+# kolam/geometry
+# Dot layouts and stroke polylines of the generator kolams, in dot units.
+# Rendering (kolam.render) and the classifier's training images both draw from here.
+# The larger generators (procedural, sikku, lattice, editable) are imported from their
+# own modules, so `import kolam.geometry` stays light and OpenCV-free.
+from kolam.geometry.dots import square_grid, generate_dot_positions, find_border_indices, diagonal_pairs
+from kolam.geometry.strokes import KOLAM_TYPES, diamond, arc, loop, border_arcs, unsymmetrical, kolam_strokes
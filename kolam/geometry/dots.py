@@ -0,0 +1,50 @@
+# kolam/geometry/dots.py
+# Dot layouts and neighbourhood queries on them
+import numpy as np
+
+
+def square_grid(n, spacing=1.0):
+    """``(n*n, 2)`` dot positions of an n x n grid, column-major like the generator loops."""
+    i, j = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    return np.stack([i.ravel(), j.ravel()], axis=1) * float(spacing)
+
+
+def generate_dot_positions(max_dots, spacing=1.0):
+    """Rhombus of dots for the unsymmetrical kolam: rows of 1, 3, 5, ... then back down.
+
+    Returns ``(positions, rows)`` with ``positions`` an ``(k, 2)`` array, row by row, left to right.
+    """
+    rows = max_dots + 1
+    half = rows // 2
+    counts = [1 + 2 * i if i < half else 1 + 2 * (rows - i - 1) for i in range(rows)]
+    row_of = np.repeat(np.arange(rows), counts)
+    starts = np.cumsum([0] + counts[:-1])
+    col = np.arange(len(row_of)) - np.repeat(starts, counts)
+    x = (col - (np.repeat(counts, counts) - 1) / 2.0) * spacing
+    return np.stack([x, -row_of * float(spacing)], axis=1), rows
+
+
+def find_border_indices(dot_positions):
+    """Indices of the first and last dot of every row (rows are runs of equal y)."""
+    y = np.asarray(dot_positions)[:, 1]
+    if len(y) == 0:
+        return set()
+    new_row = np.flatnonzero(np.diff(y) != 0) + 1
+    firsts = np.concatenate([[0], new_row])
+    lasts = np.concatenate([new_row - 1, [len(y) - 1]])
+    return set(firsts.tolist()) | set(lasts.tolist())
+
+
+def diagonal_pairs(dot_positions, spacing=1.0):
+    """``(m, 2)`` index pairs ``a < b`` of dots exactly one spacing apart on both axes."""
+    pts = np.asarray(dot_positions, dtype=float)
+    ij = np.round(pts / spacing)
+    if np.allclose(ij * spacing, pts):
+        # Dots on a spacing grid (every layout here): neighbour lookups instead of all pairs
+        from kolam.geometry.lattice import Lattice   # not at import: keeps `import kolam.geometry` small
+        pairs = Lattice(ij, "square").pairs(((1, 1), (-1, 1)))
+        pairs.sort(axis=1)
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    d = np.abs(pts[:, None, :] - pts[None, :, :])
+    close = np.isclose(d[..., 0], spacing) & np.isclose(d[..., 1], spacing)
+    return np.argwhere(np.triu(close, 1))
@@ -0,0 +1,162 @@
+# kolam/geometry/editable.py
+# Dot-by-dot editing of the unsymmetrical-dots kolam with local updates.
+#
+# The kolam on a square lattice is: a diamond around every interior dot (all four
+# neighbours present) and a diagonal link between dots one step apart on both axes.
+# Occupancy and a neighbour count per lattice site live in padded arrays, so adding
+# or removing a dot touches only its own site and its eight neighbours; the sites
+# whose drawing changed are collected for the renderer to redraw.
+import numpy as np
+
+from kolam.geometry.lattice import Lattice, rhombus_lattice
+from kolam.geometry.strokes import diamond
+
+_SIDE = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_DIAGONAL = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class EditableLattice:
+    """Square dot lattice that can be edited one dot at a time.
+
+    Sites are integer ``(x, y)`` (y up, like ``Lattice.ij``) inside ``bounds``:
+    the starting lattice's extent plus ``margin`` empty rows and columns to grow into.
+    """
+
+    def __init__(self, lattice, margin=1):
+        if lattice.kind != "square":
+            raise ValueError("only square lattices can be edited")
+        self.spacing = lattice.spacing
+        lo = lattice.ij.min(axis=0) - margin
+        hi = lattice.ij.max(axis=0) + margin
+        self.bounds = (int(lo[0]), int(hi[0]), int(lo[1]), int(hi[1]))    # x0, x1, y0, y1 inclusive
+        # One extra ring of always-empty sites so neighbour lookups never leave the arrays
+        self._origin = lo - 1
+        shape = tuple(hi - lo + 3)
+        self.occupied = np.zeros(shape, bool)
+        local = lattice.ij - self._origin
+        self.occupied[local[:, 0], local[:, 1]] = True
+        self.neighbours = np.zeros(shape, np.int8)
+        for dx, dy in _SIDE:
+            self.neighbours[1:-1, 1:-1] += self.occupied[1 + dx:shape[0] - 1 + dx, 1 + dy:shape[1] - 1 + dy]
+        diagonal = np.zeros(shape, np.int8)
+        for dx, dy in _DIAGONAL:
+            diagonal[1:-1, 1:-1] += self.occupied[1 + dx:shape[0] - 1 + dx, 1 + dy:shape[1] - 1 + dy]
+        self.dots = int(self.occupied.sum())
+        self.interior = int((self.occupied & (self.neighbours == 4)).sum())
+        self.links = int((diagonal * self.occupied).sum()) // 2
+        self.dirty = set()
+
+    @classmethod
+    def rhombus(cls, max_dots, spacing=1.0, margin=1):
+        return cls(rhombus_lattice(max_dots, spacing), margin)
+
+    def _local(self, x, y):
+        x0, x1, y0, y1 = self.bounds
+        if not (x0 <= x <= x1 and y0 <= y <= y1):
+            raise ValueError(f"({x}, {y}) is outside the editable area x {x0}..{x1}, y {y0}..{y1}")
+        return x - int(self._origin[0]), y - int(self._origin[1])
+
+    def has_dot(self, x, y):
+        i, j = self._local(x, y)
+        return bool(self.occupied[i, j])
+
+    def is_interior(self, x, y):
+        i, j = self._local(x, y)
+        return bool(self.occupied[i, j] and self.neighbours[i, j] == 4)
+
+    def set_dot(self, x, y, on=True):
+        """Add or remove one dot; returns whether anything changed. Constant time."""
+        i, j = self._local(x, y)
+        occ, nb = self.occupied, self.neighbours
+        if occ[i, j] == on:
+            return False
+        step = 1 if on else -1
+        # Interior count: this dot, and each side neighbour whose fourth neighbour this is
+        if nb[i, j] == 4:
+            self.interior += step
+        for dx, dy in _SIDE:
+            a, b = i + dx, j + dy
+            if occ[a, b] and nb[a, b] == (3 if on else 4):
+                self.interior += step
+            nb[a, b] += step
+        self.links += step * sum(int(occ[i + dx, j + dy]) for dx, dy in _DIAGONAL)
+        occ[i, j] = on
+        self.dots += step
+        # The dot's links and diamond changed, and so may the diamonds of its side neighbours
+        self.dirty.add((x, y))
+        self.dirty.update((x + dx, y + dy) for dx, dy in _SIDE)
+        return True
+
+    def toggle(self, x, y):
+        self.set_dot(x, y, not self.has_dot(x, y))
+        return self.has_dot(x, y)
+
+    def take_dirty(self):
+        """Sites whose drawing changed since the last call."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    # ---------------- Geometry ----------------
+    def site_strokes(self, x, y):
+        """Strokes owned by one site: its diamond and the links to its +x diagonal neighbours."""
+        i, j = x - int(self._origin[0]), y - int(self._origin[1])
+        if not self.occupied[i, j]:
+            return []
+        s = self.spacing
+        strokes = [diamond(x * s, y * s, s)] if self.neighbours[i, j] == 4 else []
+        for dy in (1, -1):
+            if self.occupied[i + 1, j + dy]:
+                strokes.append(np.array([(x * s, y * s), ((x + 1) * s, (y + dy) * s)]))
+        return strokes
+
+    def region(self, x0, x1, y0, y1):
+        """``(strokes, dots)`` of every site in the (clipped) box, for redrawing part of a picture."""
+        bx0, bx1, by0, by1 = self.bounds
+        strokes, dots = [], []
+        for x in range(max(x0, bx0 - 1), min(x1, bx1) + 1):
+            for y in range(max(y0, by0), min(y1, by1) + 1):
+                strokes += self.site_strokes(x, y)
+                if self.occupied[x - int(self._origin[0]), y - int(self._origin[1])]:
+                    dots.append((x * self.spacing, y * self.spacing))
+        return strokes, np.array(dots, float).reshape(-1, 2)
+
+    def lattice(self):
+        return Lattice(np.argwhere(self.occupied) + self._origin, "square", self.spacing)
+
+    def strokes(self):
+        """Whole-kolam ``(strokes, dots)`` like ``unsymmetrical`` (for saving or a full redraw).
+
+        Strokes come site by site in ``region``'s order, so a partial redraw blends
+        overlapping anti-aliased ink exactly as the full picture did.
+        """
+        lattice = self.lattice()
+        pts = lattice.positions()
+        inner = np.flatnonzero(~lattice.border())
+        up, down = lattice.pairs(((1, 1),)), lattice.pairs(((1, -1),))
+        strokes = [diamond(x, y, self.spacing) for x, y in pts[inner]] + list(pts[up]) + list(pts[down])
+        # Per site (ij order, as argwhere and region walk it): diamond, +y link, -y link
+        order = np.argsort(np.concatenate([inner * 3, up[:, 0] * 3 + 1, down[:, 0] * 3 + 2]), kind="stable")
+        return [strokes[k] for k in order], pts
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(max_dots, edits=200):
+    import time
+    from kolam.render.raster import LatticeCanvas
+    lattice = EditableLattice.rhombus(max_dots)
+    canvas = LatticeCanvas(lattice)
+    x0, x1, y0, y1 = lattice.bounds
+    rng = np.random.default_rng(0)
+    times = []
+    for x, y in zip(rng.integers(x0, x1 + 1, edits), rng.integers(y0, y1 + 1, edits)):
+        t0 = time.perf_counter()
+        lattice.toggle(int(x), int(y))
+        canvas.refresh()
+        times.append(time.perf_counter() - t0)
+    print(f"{lattice.dots} dots: {edits} edits, median {np.median(times) * 1000:.1f} ms, "
+          f"worst {max(times) * 1000:.1f} ms per edit (update + redraw)")
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 101)
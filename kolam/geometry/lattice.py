@@ -0,0 +1,182 @@
+# kolam/geometry/lattice.py
+# Dot lattices of any shape as integer coordinates, with border/interior
+# classification and neighbour pairs from array neighbourhood tests.
+#
+# Square lattices use plain (x, y) integer coordinates. Hexagonal / triangular
+# lattices use "doubled" coordinates: dots at (x, y) with x + y even and
+# neighbours at (+-2, 0) and (+-1, +-1), so every lattice stays an int array.
+# A dot is on the border when any of its lattice neighbours is missing.
+import numpy as np
+
+NEIGHBOURS = {
+    "square": ((1, 0), (-1, 0), (0, 1), (0, -1)),
+    "hex": ((2, 0), (-2, 0), (1, 1), (-1, 1), (1, -1), (-1, -1)),
+}
+# Lattice units per spacing along x and y
+_SCALE = {"square": (1.0, 1.0), "hex": (0.5, np.sqrt(3) / 2)}
+
+
+class Lattice:
+    """Dots at integer lattice coordinates ``ij`` (``(k, 2)`` int32, y up) of a ``kind`` lattice."""
+
+    def __init__(self, ij, kind="square", spacing=1.0):
+        if kind not in NEIGHBOURS:
+            raise ValueError(f"kind must be one of: {', '.join(NEIGHBOURS)}")
+        self.ij = np.asarray(ij, np.int32).reshape(-1, 2)
+        self.kind = kind
+        self.spacing = float(spacing)
+        self._grid = None
+
+    def __len__(self):
+        return len(self.ij)
+
+    def positions(self):
+        """``(k, 2)`` float dot positions in the same order as ``ij``."""
+        return self.ij * (np.array(_SCALE[self.kind]) * self.spacing)
+
+    def index_grid(self):
+        """``(origin, grid)``: dot index at ``ij - origin + 1`` (one cell of padding), -1 where empty."""
+        if self._grid is None:
+            origin = self.ij.min(axis=0) if len(self.ij) else np.zeros(2, np.int32)
+            shape = (self.ij.max(axis=0) - origin + 3) if len(self.ij) else (2, 2)
+            grid = np.full(tuple(shape), -1, np.int32)
+            local = self.ij - origin + 1
+            grid[local[:, 0], local[:, 1]] = np.arange(len(self.ij), dtype=np.int32)
+            self._grid = origin, grid
+        return self._grid
+
+    def neighbour(self, offset):
+        """Index of the dot at ``ij + offset`` for every dot, -1 where there is none."""
+        origin, grid = self.index_grid()
+        dx, dy = offset
+        local = self.ij - origin + 1
+        x, y = local[:, 0] + dx, local[:, 1] + dy
+        inside = (x >= 0) & (x < grid.shape[0]) & (y >= 0) & (y < grid.shape[1])
+        out = np.full(len(self.ij), -1, np.int32)
+        out[inside] = grid[x[inside], y[inside]]
+        return out
+
+    def border(self):
+        """``(k,)`` bool: dot has at least one missing lattice neighbour."""
+        origin, grid = self.index_grid()
+        present = grid >= 0
+        full = np.ones_like(present)
+        for dx, dy in NEIGHBOURS[self.kind]:
+            # Shift without wrapping: anything shifted in from outside the grid is missing
+            shifted = np.zeros_like(present)
+            sx = slice(max(dx, 0), present.shape[0] + min(dx, 0))
+            tx = slice(max(-dx, 0), present.shape[0] + min(-dx, 0))
+            sy = slice(max(dy, 0), present.shape[1] + min(dy, 0))
+            ty = slice(max(-dy, 0), present.shape[1] + min(-dy, 0))
+            shifted[tx, ty] = present[sx, sy]
+            full &= shifted
+        local = self.ij - origin + 1
+        return ~full[local[:, 0], local[:, 1]]
+
+    def pairs(self, offsets):
+        """``(p, 2)`` index pairs ``(a, b)`` with dot ``b`` at ``ij[a] + offset`` for any of ``offsets``."""
+        out = []
+        for offset in offsets:
+            b = self.neighbour(offset)
+            a = np.flatnonzero(b >= 0)
+            out.append(np.stack([a, b[a]], axis=1))
+        return np.concatenate(out) if out else np.zeros((0, 2), np.int64)
+
+    def edges(self):
+        """Each lattice edge once, as index pairs."""
+        return self.pairs(NEIGHBOURS[self.kind][::2])
+
+
+# ---------------- Builders ----------------
+def square_lattice(n, m=None, spacing=1.0):
+    """``n`` x ``m`` grid, column-major like ``square_grid``."""
+    m = n if m is None else m
+    i, j = np.meshgrid(np.arange(n), np.arange(m), indexing="ij")
+    return Lattice(np.stack([i.ravel(), j.ravel()], axis=1), "square", spacing)
+
+
+def rhombus_lattice(max_dots, spacing=1.0):
+    """Rows of 1, 3, 5, ... then back down (the unsymmetrical kolam), row by row from the top."""
+    rows = max_dots + 1
+    half = rows // 2
+    counts = np.array([1 + 2 * i if i < half else 1 + 2 * (rows - i - 1) for i in range(rows)])
+    row_of = np.repeat(np.arange(rows), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    x = np.arange(len(row_of)) - starts - np.repeat((counts - 1) // 2, counts)
+    return Lattice(np.stack([x, -row_of], axis=1), "square", spacing)
+
+
+def hex_lattice(n, spacing=1.0):
+    """Hexagon of dots with ``n`` per side on a triangular lattice, row by row from the top."""
+    r = np.arange(n - 1, -n, -1)
+    counts = 2 * n - 1 - np.abs(r)
+    y = np.repeat(r, counts)
+    c = np.arange(len(y)) - np.repeat(np.cumsum(counts) - counts, counts)
+    x = 2 * c - np.repeat(counts - 1, counts)
+    return Lattice(np.stack([x, y], axis=1), "hex", spacing)
+
+
+def triangle_lattice(n, spacing=1.0):
+    """Triangle of dots, rows of 1, 2, ..., ``n`` from the top, on a triangular lattice."""
+    counts = np.arange(1, n + 1)
+    row = np.repeat(np.arange(n), counts)
+    c = np.arange(len(row)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return Lattice(np.stack([2 * c - row, -row], axis=1), "hex", spacing)
+
+
+def mask_lattice(mask, kind="square", spacing=1.0):
+    """Dots where ``mask`` (image orientation: rows down) is true.
+
+    For ``kind="hex"`` odd rows sit half a spacing to the right, the usual
+    offset-row layout of a triangular lattice.
+    """
+    rows, cols = np.nonzero(np.asarray(mask, bool))
+    if kind == "hex":
+        return Lattice(np.stack([2 * cols + (rows & 1), -rows], axis=1), "hex", spacing)
+    return Lattice(np.stack([cols, -rows], axis=1), kind, spacing)
+
+
+def silhouette_mask(gray, dots_across, kind="square", threshold=128):
+    """Boolean dot mask of the dark shape in a grayscale image, ``dots_across`` dots wide."""
+    try:
+        import cv2   # only this needs OpenCV; the generator pages must not load it
+    except Exception:
+        raise ImportError("OpenCV (cv2) is needed to turn an image into a dot lattice")
+    h, w = gray.shape[:2]
+    rows = max(1, round(dots_across * h / w / (np.sqrt(3) / 2 if kind == "hex" else 1.0)))
+    small = cv2.resize(gray, (dots_across, rows), interpolation=cv2.INTER_AREA)
+    return small < threshold
+
+
+# ---------------- Stroke geometry ----------------
+def lattice_strokes(lattice, r=0.4):
+    """Loops around interior dots, border dots joined along lattice edges (dot units)."""
+    from kolam.geometry.strokes import loop   # strokes builds on this module
+    pts = lattice.positions()
+    border = lattice.border()
+    strokes = [loop(x, y, r * lattice.spacing) for x, y in pts[~border]]
+    edges = lattice.edges()
+    edges = edges[border[edges[:, 0]] & border[edges[:, 1]]]
+    strokes += list(pts[edges])
+    return strokes, pts
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(side):
+    import time
+    for name, build in (("square", lambda: square_lattice(side)),
+                        ("hex", lambda: hex_lattice(side // 2 + 1)),
+                        ("disc mask", lambda: mask_lattice(np.hypot(*np.ogrid[-side // 2:side // 2, -side // 2:side // 2]) < side * 0.6))):
+        t0 = time.perf_counter()
+        lattice = build()
+        built = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        border = lattice.border()
+        classified = time.perf_counter() - t0
+        print(f"{name}: {len(lattice)} dots built in {built * 1000:.0f} ms, "
+              f"{int(border.sum())} border dots classified in {classified * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,324 @@
+# kolam/geometry/procedural.py
+# Seeded random kolams built from the generator motifs (diamonds, loops, arcs, lines).
+#
+# A pattern is two small integer arrays:
+#   inside  (n, m) uint8    dots the line keeps on its inner side
+#   styles  (n+1, m+1) uint8 motif per cell of the dot lattice padded by one ring
+# The line crosses the midpoint of every lattice edge whose two dots differ (dots
+# outside the grid count as 0), so each cell sees 0, 2 or 4 crossings and the line
+# is closed by construction; the cell's style only decides how it joins them.
+# Candidates are made and checked in batches on these arrays; strokes are only
+# built for patterns that get drawn.
+import itertools
+
+import numpy as np
+
+# Try to import OpenCV, but fail gracefully if missing
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+MOTIFS = ("diamonds", "loops", "arcs", "lines")     # style index = position here
+DIAMONDS, LOOPS, ARCS, LINES = range(4)
+S, E, N, W = 1, 2, 4, 8                             # crossing bits of a cell ("mask")
+BATCH = 256
+PATIENCE = 128                                      # batches in a row with nothing new before a stream ends
+
+# ---------------- Cell tiles ----------------
+# Each cell is a 3x3 block (x across, y up) in a connectivity raster: ports at the
+# edge midpoints, the centre, and corners for lines turning around a corner dot.
+_PORT_PX = {S: (1, 0), E: (2, 1), N: (1, 2), W: (0, 1)}
+# Corner between two adjacent ports -> (corner pixel, direction from the cell centre)
+_CORNERS = {S | E: ((2, 0), (1, -1)), E | N: ((2, 2), (1, 1)), N | W: ((0, 2), (-1, 1)), W | S: ((0, 0), (-1, -1))}
+
+
+def _tile_pixels(mask, style):
+    px = np.zeros((3, 3), np.uint8)
+    if mask in _CORNERS:
+        for bit in (b for b in _PORT_PX if mask & b):
+            px[_PORT_PX[bit]] = 1
+        px[_CORNERS[mask][0]] = 1
+    elif mask in (S | N, E | W):
+        for bit in (b for b in _PORT_PX if mask & b):
+            px[_PORT_PX[bit]] = 1
+        px[1, 1] = 1
+    elif mask == 15:
+        if style == ARCS:
+            # Two separate turns; which pair is decided per cell (see _saddle_pair)
+            return None
+        px[[1, 2, 1, 0, 1], [0, 1, 2, 1, 1]] = 1
+    return px
+
+
+def _build_tiles():
+    # TILES[mask, style, pair] with pair selecting the arcs split of a crossing cell
+    tiles = np.zeros((16, 4, 2, 3, 3), np.uint8)
+    for mask in range(16):
+        for style in range(4):
+            px = _tile_pixels(mask, style)
+            if px is not None:
+                tiles[mask, style] = px
+    for pair, (a, b) in enumerate(((S | E, N | W), (E | N, W | S))):
+        for m in (a, b):
+            tiles[15, ARCS, pair] |= _tile_pixels(m, ARCS)
+    return tiles
+
+
+TILES = _build_tiles()
+
+
+# ---------------- Array checks ----------------
+def _padded(inside):
+    # (..., n, m) -> (..., n+2, m+2) with a ring of outside (0) dots
+    pad = [(0, 0)] * (inside.ndim - 2) + [(1, 1), (1, 1)]
+    return np.pad(inside.astype(np.uint8), pad)
+
+
+def cell_masks(inside):
+    """Crossing bits (S/E/N/W) of every cell of the padded lattice, batched over leading axes."""
+    p = _padded(inside)
+    sw, se = p[..., :-1, :-1], p[..., 1:, :-1]
+    nw, ne = p[..., :-1, 1:], p[..., 1:, 1:]
+    return ((sw ^ se) * S | (se ^ ne) * E | (nw ^ ne) * N | (sw ^ nw) * W).astype(np.uint8)
+
+
+def _saddle_pair(inside):
+    # Arcs in a crossing cell turn around its two outside dots, keeping the inside
+    # joined across it: pair 0 turns around SE+NW, pair 1 around NE+SW
+    return _padded(inside)[..., 1:, :-1].astype(np.uint8)
+
+
+def is_closed(masks):
+    """Every cell has an even number of crossings and neighbours agree on shared edges."""
+    bits = np.unpackbits(masks[..., None], axis=-1)[..., 4:]       # W N E S
+    even = (bits.sum(axis=-1) % 2 == 0).all(axis=(-2, -1))
+    x_agree = ((masks[..., :-1, :] & E) > 0) == ((masks[..., 1:, :] & W) > 0)
+    y_agree = ((masks[..., :, :-1] & N) > 0) == ((masks[..., :, 1:] & S) > 0)
+    return even & x_agree.all(axis=(-2, -1)) & y_agree.all(axis=(-2, -1))
+
+
+def covers_all_dots(inside):
+    """Every dot of the grid has the line passing at least one of its four edges."""
+    p = _padded(inside)
+    c = p[..., 1:-1, 1:-1]
+    touched = (c != p[..., :-2, 1:-1]) | (c != p[..., 2:, 1:-1]) | (c != p[..., 1:-1, :-2]) | (c != p[..., 1:-1, 2:])
+    return touched.all(axis=(-2, -1))
+
+
+def connectivity_raster(inside, styles, masks=None):
+    """``(3(n+1), 3(m+1))`` uint8 image whose 4-connected components are the separate line pieces."""
+    masks = cell_masks(inside) if masks is None else masks
+    blocks = TILES[masks, styles, _saddle_pair(inside)]             # (..., R, C, 3, 3)
+    lead = blocks.shape[:-4]
+    r, c = blocks.shape[-4:-2]
+    return np.moveaxis(blocks, -2, -3).reshape(lead + (3 * r, 3 * c))
+
+
+def count_pieces(raster):
+    if cv2 is None:
+        raise ImportError("OpenCV (cv2) is needed to check random kolam connectivity")
+    return cv2.connectedComponents(raster, connectivity=4)[0] - 1
+
+
+def validate(inside, styles, max_pieces=1):
+    """``(ok, reason)`` for one pattern: closed, every dot used, at most ``max_pieces`` separate lines."""
+    masks = cell_masks(inside)
+    if not masks.any():
+        return False, "empty"
+    if not is_closed(masks):
+        return False, "open line"
+    if not covers_all_dots(inside):
+        return False, "unused dots"
+    pieces = count_pieces(connectivity_raster(inside, styles, masks))
+    if pieces > max_pieces:
+        return False, f"{pieces} separate lines"
+    return True, "ok"
+
+
+# ---------------- Generation ----------------
+def _mirror_index(length):
+    half = (length + 1) // 2
+    i = np.arange(length)
+    return np.minimum(i, length - 1 - i), half
+
+
+def _candidates(rng, count, n, m, styles_allowed, symmetric):
+    # Checkerboard (every dot enclosed on its own) or empty base, XOR blocky noise:
+    # blocks keep each dot next to one that differs, so few candidates leave dots unused
+    if symmetric:
+        (xi, hn), (yi, hm) = _mirror_index(n), _mirror_index(m)
+        (cxi, hcn), (cyi, hcm) = _mirror_index(n + 1), _mirror_index(m + 1)
+    else:
+        hn, hm, hcn, hcm = n, m, n + 1, m + 1
+    block = int(rng.integers(1, 4))
+    low = rng.random((count, -(-hn // block), -(-hm // block))) < rng.uniform(0.15, 0.6)
+    noise = low.repeat(block, axis=1).repeat(block, axis=2)[:, :hn, :hm]
+    checker = (np.add.outer(np.arange(hn), np.arange(hm)) + rng.integers(0, 2)) % 2
+    inside = (noise ^ (checker[None] * (rng.random((count, 1, 1)) < 0.75))).astype(np.uint8)
+    styles = np.asarray(styles_allowed, np.uint8)[rng.integers(0, len(styles_allowed), (count, hcn, hcm))]
+    if symmetric:
+        inside = inside[:, xi][:, :, yi]
+        styles = styles[:, cxi][:, :, cyi]
+    return inside, styles
+
+
+def canonical_styles(masks, styles):
+    # Styles only matter where they change the drawing: blank cells and straight
+    # crossings look the same in every style, and "lines" turns a corner like a diamond
+    styles = np.where(masks == 0, 0, styles)
+    styles = np.where((masks == (S | N)) | (masks == (E | W)), 0, styles)
+    corner = (masks != 15) & (styles == LINES)
+    return np.where(corner, DIAMONDS, styles).astype(np.uint8)
+
+
+def random_kolams(seed, n, m=None, motifs=MOTIFS, symmetric=True, max_pieces=1, batch=BATCH,
+                  patience=PATIENCE, stats=None):
+    """Stream of distinct valid ``(inside, styles)`` patterns, reproducible from ``seed``.
+
+    ``motifs`` limits the cell styles to a subset of ``MOTIFS``. Small grids and
+    narrow motif sets only allow a handful of patterns (or none), so the stream
+    ends after ``patience`` batches in a row add nothing new. ``stats`` (a dict)
+    is updated with candidate/accepted counts.
+    """
+    m = n if m is None else m
+    styles_allowed = [MOTIFS.index(k) for k in motifs] or [DIAMONDS]
+    seen = set()
+    stats = {} if stats is None else stats
+    stats.setdefault("candidates", 0)
+    stats.setdefault("accepted", 0)
+    idle = 0
+    for k in itertools.count():
+        if idle >= patience:
+            return
+        idle += 1
+        rng = np.random.default_rng([seed, k])
+        inside, styles = _candidates(rng, batch, n, m, styles_allowed, symmetric)
+        masks = cell_masks(inside)
+        styles = canonical_styles(masks, styles)
+        ok = masks.any(axis=(1, 2)) & is_closed(masks) & covers_all_dots(inside)
+        stats["candidates"] += batch
+        idx = np.flatnonzero(ok)
+        if not len(idx):
+            continue
+        rasters = connectivity_raster(inside[idx], styles[idx], masks[idx])
+        for j, raster in zip(idx, rasters):
+            if count_pieces(raster) > max_pieces:
+                continue
+            key = inside[j].tobytes() + styles[j].tobytes()
+            if key in seen:
+                continue
+            seen.add(key)
+            idle = 0
+            stats["accepted"] += 1
+            yield inside[j], styles[j]
+
+
+class KolamStream:
+    """Resumable cursor over one ``random_kolams`` stream, read a page at a time.
+
+    Reading pages in order only generates each pattern once; going back to an
+    earlier page starts the stream over. A page shorter than ``per_page`` is the
+    last one (``exhausted`` is then True).
+    """
+
+    def __init__(self, seed, n, m=None, **kw):
+        self._args = (seed, n, m)
+        self._kw = kw
+        self._start()
+
+    def _start(self):
+        self._stream = random_kolams(*self._args, **self._kw)
+        self.position = 0
+        self.exhausted = False
+
+    def page(self, page, per_page):
+        start = page * per_page
+        if start < self.position:
+            self._start()
+        # Skip to the page (only pages this cursor has not read, e.g. served from a cache)
+        skipped = sum(1 for _ in itertools.islice(self._stream, start - self.position))
+        items = list(itertools.islice(self._stream, per_page))
+        self.position += skipped + len(items)
+        self.exhausted = self.position < start + per_page
+        return items
+
+
+def random_kolam_page(seed, page, per_page, n, m=None, **kw):
+    """Patterns ``page * per_page`` .. of the ``seed`` stream (one-off; use ``KolamStream`` to page on)."""
+    return KolamStream(seed, n, m, **kw).page(page, per_page)
+
+
+# ---------------- Stroke geometry ----------------
+def _arc(cx, cy, r, start, end, steps=12):
+    theta = np.radians(np.linspace(start, end, steps))
+    return np.stack([cx + r * np.cos(theta), cy + r * np.sin(theta)], axis=1)
+
+
+# Quarter-turn angles: around the corner dot, or around the cell centre (loops)
+_DOT_ARC = {(1, -1): (90, 180), (-1, -1): (0, 90), (1, 1): (180, 270), (-1, 1): (270, 360)}
+_CENTRE_ARC = {(1, -1): (270, 360), (-1, -1): (180, 270), (1, 1): (0, 90), (-1, 1): (90, 180)}
+
+
+def _turn(cx, cy, corner, style):
+    sx, sy = corner
+    p1 = (cx + sx * 0.5, cy)         # port on the vertical edge next to the corner
+    p2 = (cx, cy + sy * 0.5)         # port on the horizontal edge next to the corner
+    if style == ARCS:
+        return _arc(cx + sx * 0.5, cy + sy * 0.5, 0.5, *_DOT_ARC[corner])
+    if style == LOOPS:
+        return _arc(cx, cy, 0.5, *_CENTRE_ARC[corner])
+    return np.array([p2, p1])
+
+
+def procedural_strokes(inside, styles):
+    """Polylines (dot units, x along axis 0 like ``square_grid``) and dot positions of one pattern."""
+    from kolam.geometry.strokes import diamond, loop
+    inside = np.asarray(inside)
+    n, m = inside.shape
+    masks = cell_masks(inside)
+    pairs = _saddle_pair(inside)
+    strokes = []
+    for a, b in zip(*np.nonzero(masks)):
+        mask, style = int(masks[a, b]), int(styles[a, b])
+        cx, cy = a - 0.5, b - 0.5
+        if mask == S | N:
+            strokes.append(np.array([(cx, cy - 0.5), (cx, cy + 0.5)]))
+        elif mask == E | W:
+            strokes.append(np.array([(cx - 0.5, cy), (cx + 0.5, cy)]))
+        elif mask in _CORNERS:
+            strokes.append(_turn(cx, cy, _CORNERS[mask][1], style))
+        elif style == DIAMONDS:
+            strokes.append(diamond(cx, cy))
+        elif style == LOOPS:
+            strokes.append(loop(cx, cy, 0.5, steps=36))
+        elif style == LINES:
+            strokes += [np.array([(cx, cy - 0.5), (cx, cy + 0.5)]), np.array([(cx - 0.5, cy), (cx + 0.5, cy)])]
+        else:
+            for m_ in ((S | E, N | W), (E | N, W | S))[pairs[a, b]]:
+                strokes.append(_turn(cx, cy, _CORNERS[m_][1], ARCS))
+    i, j = np.meshgrid(np.arange(n), np.arange(m), indexing="ij")
+    return strokes, np.stack([i.ravel(), j.ravel()], axis=1).astype(float)
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(n, seconds):
+    import time
+    stats = {}
+    stream = random_kolams(0, n, stats=stats)
+    t0 = time.perf_counter()
+    count = 0
+    while time.perf_counter() - t0 < seconds:
+        next(stream)
+        count += 1
+    dt = time.perf_counter() - t0
+    print(f"{n}x{n}: {count / dt:.0f} valid distinct kolams/s "
+          f"({stats['accepted']}/{stats['candidates']} candidates accepted)")
+    first = [s.tobytes() + t.tobytes() for s, t in itertools.islice(random_kolams(7, n), 5)]
+    again = [s.tobytes() + t.tobytes() for s, t in itertools.islice(random_kolams(7, n), 5)]
+    print("reproducible from seed:", first == again)
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 8, float(sys.argv[2]) if len(sys.argv) > 2 else 3.0)
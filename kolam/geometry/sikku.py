@@ -0,0 +1,252 @@
+# kolam/geometry/sikku.py
+# Sikku (mirror-curve) kolams: a line weaving around every dot of an n x m grid.
+#
+# Each dot sits in a cell of its own and the line runs diagonally through the
+# midpoints of the cell sides, so every cell holds four segments forming a
+# diamond around its dot. Where two cells meet, the line either crosses over to
+# the neighbour or bounces off a two-sided mirror lying on the shared side; the
+# grid border is all mirrors. With no inner mirrors the line closes into
+# gcd(n, m) loops; with every inner side mirrored each dot keeps its own diamond.
+#
+# Mirrors on the sides between x-neighbours and between y-neighbours are kept as
+# two packed bitsets. Diamonds are walked anticlockwise on even cells (i + j) and
+# clockwise on odd ones, which orients every line consistently through crossings
+# and mirrors alike, so "the segment after this one" is a single permutation
+# built from a transition table and the lines are its cycles.
+import numpy as np
+
+# Segment corners within a cell; geometry in cell-centre units (dot at 0, 0)
+SW, SE, NE, NW = range(4)
+_SIDE_POINT = {"S": (0.0, -0.5), "E": (0.5, 0.0), "N": (0.0, 0.5), "W": (-0.5, 0.0)}
+# (start side, end side) of each corner's segment, even (anticlockwise) and odd cells
+_ENDS = (
+    {SW: "WS", SE: "SE", NE: "EN", NW: "NW"},
+    {SW: "SW", SE: "ES", NE: "NE", NW: "WN"},
+)
+_STEP = {"E": (1, 0), "W": (-1, 0), "N": (0, 1), "S": (0, -1)}
+
+
+def _build_tables():
+    """``END_SIDE[parity, corner]`` and ``NEXT[parity, corner, mirrored] = (di, dj, corner)``."""
+    sides = "SENW"
+    end_side = np.zeros((2, 4), np.int8)
+    nxt = np.zeros((2, 4, 2, 3), np.int8)
+    for parity in range(2):
+        for k in range(4):
+            start, end = _ENDS[parity][k]
+            end_side[parity, k] = sides.index(end)
+            direction = np.subtract(_SIDE_POINT[end], _SIDE_POINT[start])
+            # Mirror: carry on around the same diamond from this side
+            stay = next(c for c in range(4) if _ENDS[parity][c][0] == end)
+            nxt[parity, k, 1] = (0, 0, stay)
+            # Crossing: same heading in the neighbour across the side (opposite parity)
+            di, dj = _STEP[end]
+            entry = sides["SENW".index(end) ^ 2]
+            for c in range(4):
+                s2, e2 = _ENDS[1 - parity][c]
+                if s2 == entry and np.allclose(np.subtract(_SIDE_POINT[e2], _SIDE_POINT[s2]), direction):
+                    nxt[parity, k, 0] = (di, dj, c)
+    return end_side, nxt
+
+
+END_SIDE, NEXT = _build_tables()
+S_SIDE, E_SIDE, N_SIDE, W_SIDE = range(4)
+
+
+class MirrorGrid:
+    """Mirror placement on an ``n`` x ``m`` dot grid, stored as packed bitsets.
+
+    ``x_bits`` covers the ``(n-1) x m`` sides between dots ``(i, j)`` and
+    ``(i+1, j)``; ``y_bits`` the ``n x (m-1)`` sides between ``(i, j)`` and ``(i, j+1)``.
+    """
+
+    def __init__(self, n, m=None, x_mirrors=None, y_mirrors=None):
+        self.n, self.m = n, (n if m is None else m)
+        x = np.zeros((self.n - 1, self.m), bool) if x_mirrors is None else np.asarray(x_mirrors, bool)
+        y = np.zeros((self.n, self.m - 1), bool) if y_mirrors is None else np.asarray(y_mirrors, bool)
+        if x.shape != (self.n - 1, self.m) or y.shape != (self.n, self.m - 1):
+            raise ValueError(f"mirror arrays must be {(self.n - 1, self.m)} and {(self.n, self.m - 1)}")
+        self.x_bits = np.packbits(x, axis=None)
+        self.y_bits = np.packbits(y, axis=None)
+
+    @classmethod
+    def random(cls, n, m=None, density=0.3, seed=None):
+        m = n if m is None else m
+        rng = np.random.default_rng(seed)
+        return cls(n, m, rng.random((n - 1, m)) < density, rng.random((n, m - 1)) < density)
+
+    def x_mirrors(self):
+        return np.unpackbits(self.x_bits, count=(self.n - 1) * self.m).reshape(self.n - 1, self.m).astype(bool)
+
+    def y_mirrors(self):
+        return np.unpackbits(self.y_bits, count=self.n * (self.m - 1)).reshape(self.n, self.m - 1).astype(bool)
+
+    def _bit(self, axis, i, j):
+        bits, width = (self.x_bits, self.m) if axis == 0 else (self.y_bits, self.m - 1)
+        k = i * width + j
+        return bits, k >> 3, np.uint8(0x80 >> (k & 7))
+
+    def get(self, axis, i, j):
+        """Mirror between dot ``(i, j)`` and its +x (``axis`` 0) or +y (``axis`` 1) neighbour?"""
+        bits, byte, mask = self._bit(axis, i, j)
+        return bool(bits[byte] & mask)
+
+    def toggle(self, axis, i, j):
+        bits, byte, mask = self._bit(axis, i, j)
+        bits[byte] ^= mask
+
+    def mirrored_sides(self):
+        """``(n, m, 4)`` bool: is each cell's S/E/N/W side a mirror (grid border included)?"""
+        n, m = self.n, self.m
+        xp = np.ones((n + 1, m), bool)
+        xp[1:n] = self.x_mirrors()
+        yp = np.ones((n, m + 1), bool)
+        yp[:, 1:m] = self.y_mirrors()
+        return np.stack([yp[:, :-1], xp[1:], yp[:, 1:], xp[:-1]], axis=-1)
+
+
+# ---------------- Tracing ----------------
+def successor(grid):
+    """Flat permutation: the segment following each one, ids ``(i * m + j) * 4 + corner``."""
+    n, m = grid.n, grid.m
+    i, j = np.meshgrid(np.arange(n), np.arange(m), indexing="ij")
+    parity = ((i + j) & 1)[..., None]
+    corner = np.arange(4)[None, None, :]
+    side = END_SIDE[parity, corner]                                          # (n, m, 4)
+    mirrored = np.take_along_axis(grid.mirrored_sides(), side, axis=-1)
+    step = NEXT[parity, corner, mirrored.astype(np.int8)]                    # (n, m, 4, 3)
+    ni = i[..., None] + step[..., 0]
+    nj = j[..., None] + step[..., 1]
+    return ((ni * m + nj) * 4 + step[..., 2]).astype(np.int32).ravel()
+
+
+def loop_labels(nxt):
+    """Smallest segment id on each segment's loop (pointer jumping; stops once nothing changes)."""
+    label = np.arange(len(nxt), dtype=np.int32)
+    ptr = nxt.copy()
+    while True:
+        merged = np.minimum(label, label[ptr])
+        if np.array_equal(merged, label):
+            return label
+        label = merged
+        ptr = ptr[ptr]
+
+
+def trace(grid):
+    """``(successor, labels, loop count)`` of the lines of ``grid``."""
+    nxt = successor(grid)
+    labels = loop_labels(nxt)
+    return nxt, labels, int(np.count_nonzero(labels == np.arange(len(labels))))
+
+
+def count_loops(grid):
+    return trace(grid)[2]
+
+
+def join_loops(grid, labels=None):
+    """Toggle mirrors until the line is a single loop (the classic sikku).
+
+    Flipping the side two different lines pass through joins them into one, so
+    toggling one side per pair of lines along a spanning forest of the lines
+    leaves exactly one loop. Returns the number of sides toggled.
+    """
+    n, m = grid.n, grid.m
+    if labels is None:
+        labels = trace(grid)[1]
+    lab = labels.reshape(n, m, 4)
+    i, j = np.meshgrid(np.arange(n), np.arange(m), indexing="ij")
+    parity = (i + j) & 1
+    # The segment of each cell that ends on a given side (one per side per cell)
+    ends_on = np.argsort(END_SIDE, axis=1)                                  # [parity, side] -> corner
+    def line_on(side):
+        return np.take_along_axis(lab, ends_on[parity, side][..., None], axis=-1)[..., 0]
+    a = np.concatenate([line_on(E_SIDE)[:-1].ravel(), line_on(N_SIDE)[:, :-1].ravel()])
+    b = np.concatenate([line_on(W_SIDE)[1:].ravel(), line_on(S_SIDE)[:, 1:].ravel()])
+    n_x = (n - 1) * m
+    parent = {}
+    def find(x):
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:
+            parent[x], x = root, parent[x]
+        return root
+    toggled = 0
+    differ = a != b
+    for k, la, lb in zip(np.flatnonzero(differ).tolist(), a[differ].tolist(), b[differ].tolist()):
+        ra, rb = find(la), find(lb)
+        if ra != rb:
+            parent[ra] = rb
+            if k < n_x:
+                grid.toggle(0, *divmod(k, m))
+            else:
+                grid.toggle(1, *divmod(k - n_x, m - 1))
+            toggled += 1
+    return toggled
+
+
+def sikku(n, m=None, density=0.3, seed=None):
+    """Random single-loop mirror grid: random mirrors, then ``join_loops``."""
+    grid = MirrorGrid.random(n, m, density, seed)
+    join_loops(grid)
+    return grid
+
+
+# ---------------- Stroke geometry ----------------
+def _chaikin(points, rounds):
+    # Corner cutting on a closed polyline: straight runs stay straight, bounces round off
+    for _ in range(rounds):
+        nxt = np.roll(points, -1, axis=0)
+        points = np.stack([0.75 * points + 0.25 * nxt, 0.25 * points + 0.75 * nxt], axis=1).reshape(-1, 2)
+    return points
+
+
+def mirror_strokes(grid, smooth=3):
+    """Closed smoothed polylines (dot units, dot ``(i, j)`` at ``(i, j)``) and dot positions.
+
+    Loops are walked segment by segment, so this is for drawable grid sizes;
+    ``trace`` alone handles very large grids.
+    """
+    n, m = grid.n, grid.m
+    nxt, labels, _ = trace(grid)
+    corner_pt = np.array([_SIDE_POINT[_ENDS[0][k][1]] for k in range(4)]), np.array([_SIDE_POINT[_ENDS[1][k][1]] for k in range(4)])
+    ids = np.arange(len(nxt))
+    cell, corner = np.divmod(ids, 4)
+    ci, cj = np.divmod(cell, m)
+    parity = (ci + cj) & 1
+    ends = np.where(parity[:, None] == 0, corner_pt[0][corner], corner_pt[1][corner]) + np.stack([ci, cj], axis=1)
+    succ = nxt.tolist()
+    strokes = []
+    for start in np.flatnonzero(labels == ids).tolist():
+        order = [start]
+        k = succ[start]
+        while k != start:
+            order.append(k)
+            k = succ[k]
+        loop = _chaikin(ends[order], smooth)
+        strokes.append(np.vstack([loop, loop[:1]]))
+    i, j = np.meshgrid(np.arange(n), np.arange(m), indexing="ij")
+    return strokes, np.stack([i.ravel(), j.ravel()], axis=1).astype(float)
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(n):
+    import time
+    grid = MirrorGrid.random(n, density=0.3, seed=0)
+    t0 = time.perf_counter()
+    loops = count_loops(grid)
+    traced = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    toggled = join_loops(grid)
+    joined = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    single = count_loops(grid)
+    retraced = time.perf_counter() - t0
+    print(f"{n}x{n}: traced {4 * n * n} segments into {loops} loops in {traced * 1000:.0f} ms; "
+          f"joined by toggling {toggled} mirrors in {joined * 1000:.0f} ms; "
+          f"re-traced as {single} loop in {retraced * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
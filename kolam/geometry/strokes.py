@@ -0,0 +1,81 @@
+# kolam/geometry/strokes.py
+# Stroke polylines for each generator kolam type
+import numpy as np
+
+from kolam.geometry.dots import square_grid
+
+KOLAM_TYPES = [
+    "Straight Lines",
+    "Connected Diamonds",
+    "Diamond with Arcs",
+    "Loops/Arcs",
+    "Mixed",
+    "Unsymmetrical Dots",
+]
+
+
+def diamond(x, y, s=1):
+    return np.array([(x, y + s/2), (x + s/2, y), (x, y - s/2), (x - s/2, y), (x, y + s/2)])
+
+
+def arc(x, y, r, start, end, steps=40):
+    theta = np.linspace(np.radians(start), np.radians(end), steps)
+    return np.stack([x + r*np.cos(theta), y + r*np.sin(theta)], axis=1)
+
+
+def loop(x, y, r, steps=60):
+    return arc(x, y, r, 0, 360, steps)
+
+
+def border_arcs(n, r, offset, shifted):
+    # Diamond-with-Arcs shifts arc centres by r and faces them inward; Mixed uses the plain centres and flips the halves
+    out = []
+    for i in range(1, n-1):
+        if shifted:
+            out.append(arc((i-0.5) + r, (n-1) + offset, r, 0, 180))
+            out.append(arc((i-0.5) + r, -offset, r, 180, 360))
+            out.append(arc(-offset, (i-0.5) + r, r, 90, 270))
+            out.append(arc((n-1) + offset, (i-0.5) + r, r, 270, 450))
+        else:
+            out.append(arc(i-0.5, (n-1) + offset, r, 180, 360))
+            out.append(arc(i-0.5, -offset, r, 0, 180))
+            out.append(arc(-offset, i-0.5, r, 270, 450))
+            out.append(arc((n-1) + offset, i-0.5, r, 90, 270))
+    return out
+
+
+def unsymmetrical(max_dots, spacing=1.0):
+    """Diamonds around the inner dots of the rhombus layout, border dots joined diagonally."""
+    from kolam.geometry.lattice import rhombus_lattice   # here, so the package import does not load lattice
+    lattice = rhombus_lattice(max_dots, spacing)
+    pts = lattice.positions()
+    strokes = [diamond(x, y, spacing) for x, y in pts[~lattice.border()]]
+    strokes += list(pts[lattice.pairs(((1, 1), (1, -1)))])
+    return strokes, pts
+
+
+def kolam_strokes(kind, n, spacing=1.0, r=0.5, offset=0.01):
+    """Polylines (in dot units) and dot positions for one of ``KOLAM_TYPES``.
+
+    ``n`` is dots per side; for "Unsymmetrical Dots" it is the number of rows (max dots + 1).
+    ``r`` and ``offset`` shape the border arcs of "Diamond with Arcs" and "Mixed".
+    """
+    if kind == "Unsymmetrical Dots":
+        return unsymmetrical(n - 1, spacing)
+    grid = square_grid(n)
+    cells = [(i + 0.5, j + 0.5) for i in range(n-1) for j in range(n-1)]
+    if kind == "Straight Lines":
+        strokes = [np.array([(0, i), (n-1, i)]) for i in range(n)] + [np.array([(i, 0), (i, n-1)]) for i in range(n)]
+    elif kind == "Connected Diamonds":
+        strokes = [diamond(x, y) for x, y in cells]
+    elif kind == "Diamond with Arcs":
+        strokes = [diamond(x, y) for x, y in cells] + border_arcs(n, r, offset, shifted=True)
+    elif kind == "Loops/Arcs":
+        strokes = [loop(x, y, 1/2.2) for x, y in grid]
+    elif kind == "Mixed":
+        strokes = [diamond(i + 0.5, j + 0.5) if (i + j) % 2 == 0 else loop(i + 0.5, j + 0.5, 1/2.2)
+                   for i in range(n-1) for j in range(n-1)]
+        strokes += border_arcs(n, r, offset, shifted=False)
+    else:
+        raise ValueError(f"Unknown kolam type: {kind}")
+    return strokes, grid
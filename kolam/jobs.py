@@ -0,0 +1,159 @@
+# kolam/jobs.py
+# Background analysis job queue: bounded worker pool, per-session fair scheduling
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+QUEUED, RUNNING, DONE, FAILED, TIMEOUT = "queued", "running", "done", "failed", "timeout"
+FINISHED = (DONE, FAILED, TIMEOUT)
+
+
+class QueueFull(RuntimeError):
+    """Raised by ``submit`` when the queue (or the caller's share of it) is full."""
+
+
+class Job:
+    def __init__(self, session, fn, args, kwargs):
+        self.id = uuid.uuid4().hex
+        self.session = session
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.submitted
+
+
+class AnalysisQueue:
+    """Runs jobs on ``workers`` daemon threads.
+
+    Pending jobs are kept per session and dispatched round-robin, so one
+    user uploading ten images does not delay everyone else's single upload.
+    OpenCV releases the GIL in its heavy kernels, so threads scale well here.
+    """
+
+    def __init__(self, workers=2, max_pending=32, max_per_session=4, timeout=60.0, keep_finished=256):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_per_session = max_per_session
+        self.timeout = timeout
+        self.keep_finished = keep_finished
+        self._cond = threading.Condition()
+        self._sessions = OrderedDict()   # session -> deque of queued jobs, in round-robin order
+        self._jobs = OrderedDict()       # job id -> Job (bounded history)
+        self._pending = 0
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"kolam-analysis-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    # ---------------- Producer side ----------------
+    def submit(self, session, fn, *args, **kwargs):
+        with self._cond:
+            if self._pending >= self.max_pending:
+                raise QueueFull("The analyzer is busy, please try again in a moment.")
+            queue = self._sessions.get(session)
+            if queue is not None and len(queue) >= self.max_per_session:
+                raise QueueFull("You already have several analyses waiting.")
+            job = Job(session, fn, args, kwargs)
+            self._sessions.setdefault(session, deque()).append(job)
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._trim()
+            self._cond.notify()
+            return job.id
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.done and self.timeout and job.elapsed() > self.timeout:
+                # Threads cannot be killed; the late result is simply discarded
+                self._finish(job, TIMEOUT, error=f"Analysis took longer than {self.timeout:.0f}s.")
+            return job
+
+    def wait(self, job_id, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.done:
+                    return job
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job
+                self._cond.wait(remaining)
+
+    def position(self, job_id):
+        # Rough place in line: jobs queued ahead of this one across all sessions
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            queue = self._sessions.get(job.session, ())
+            ahead_in_session = list(queue).index(job) if job in queue else 0
+            return sum(min(len(q), ahead_in_session + 1) for q in self._sessions.values()) - 1
+
+    def stats(self):
+        with self._cond:
+            running = sum(1 for j in self._jobs.values() if j.status == RUNNING)
+            return {"pending": self._pending, "running": running, "sessions": len(self._sessions), "workers": self.workers}
+
+    # ---------------- Worker side ----------------
+    def _next_job(self):
+        # Round-robin: take from the first session, then move it to the back
+        while True:
+            while not self._sessions:
+                self._cond.wait()
+            session, queue = next(iter(self._sessions.items()))
+            job = queue.popleft()
+            if queue:
+                self._sessions.move_to_end(session)
+            else:
+                del self._sessions[session]
+            self._pending -= 1
+            if self.timeout and job.elapsed() > self.timeout:
+                self._finish(job, TIMEOUT, error="Job expired while waiting in the queue.")
+                continue
+            job.status = RUNNING
+            job.started = time.monotonic()
+            return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+            try:
+                result, status, error = job.fn(*job.args, **job.kwargs), DONE, None
+            except Exception as e:
+                result, status, error = None, FAILED, str(e)
+            with self._cond:
+                if not job.done:
+                    job.result = result
+                    self._finish(job, status, error)
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished = time.monotonic()
+        job.fn = job.args = job.kwargs = None   # drop references to upload bytes early
+        self._cond.notify_all()
+
+    def _trim(self):
+        # Forget the oldest finished jobs; queued/running ones are always kept
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.keep_finished:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
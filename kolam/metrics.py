@@ -0,0 +1,217 @@
+# kolam/metrics.py
+# Per-stage timers and byte counters for the analyzer pipeline
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+log = logging.getLogger("kolam.metrics")
+
+# Turn on for every analysis with KOLAM_DIAGNOSTICS=1 (the Analyzer page also has a toggle)
+DIAGNOSTICS_DEFAULT = os.environ.get("KOLAM_DIAGNOSTICS", "") not in ("", "0", "false", "False")
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullTimer:
+    """Drop-in timer that records nothing; ``stage()`` returns a shared no-op context."""
+
+    enabled = False
+
+    def stage(self, name, nbytes=None):
+        return _NULL_STAGE
+
+    def memory(self):
+        return _NULL_STAGE
+
+    def add_bytes(self, name, nbytes):
+        pass
+
+    def finish(self, **labels):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "nbytes", "t0")
+
+    def __init__(self, timer, name, nbytes):
+        self.timer = timer
+        self.name = name
+        self.nbytes = nbytes
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer._record(self.name, time.perf_counter() - self.t0, self.nbytes)
+        return False
+
+
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_owned = False         # tracing was started by PeakMemory (not by a profiler or the user)
+
+
+class PeakMemory:
+    """Peak Python-visible allocation (NumPy/OpenCV arrays included) inside the block.
+
+    tracemalloc is process-wide, so this is the process's peak while the block
+    ran, minus what was allocated when it began: an upper bound for the block
+    itself, and only exact when nothing else allocates concurrently. The peak
+    counter is reset only when no other measurement is running (resetting it
+    would lower theirs), and tracing is stopped only if these blocks started it.
+    """
+
+    def __init__(self, timer):
+        self.timer = timer
+        self.base = 0
+
+    def __enter__(self):
+        global _trace_users, _trace_owned
+        with _trace_lock:
+            if _trace_users == 0:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _trace_owned = True
+                if _trace_owned:
+                    tracemalloc.reset_peak()
+            _trace_users += 1
+            self.base = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc):
+        global _trace_users, _trace_owned
+        with _trace_lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.timer.peak_bytes = max(self.timer.peak_bytes or 0, peak - self.base)
+            _trace_users -= 1
+            if _trace_users == 0 and _trace_owned:
+                tracemalloc.stop()
+                _trace_owned = False
+        return False
+
+
+class StageTimer:
+    enabled = True
+
+    def __init__(self):
+        self.stages = OrderedDict()   # name -> seconds (accumulated if a stage repeats)
+        self.bytes = OrderedDict()    # name -> bytes
+        self.started = time.perf_counter()
+        self.total = None
+        self.peak_bytes = None
+
+    def stage(self, name, nbytes=None):
+        return _Stage(self, name, nbytes)
+
+    def memory(self):
+        return PeakMemory(self)
+
+    def add_bytes(self, name, nbytes):
+        self.bytes[name] = self.bytes.get(name, 0) + int(nbytes)
+
+    def _record(self, name, seconds, nbytes):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if nbytes is not None:
+            self.add_bytes(name, nbytes)
+
+    def finish(self, **labels):
+        """Close the measurement: fold into the process totals and emit one log line."""
+        self.total = time.perf_counter() - self.started
+        REGISTRY.observe(self)
+        log.info(self.log_line(**labels))
+
+    def as_dict(self):
+        return {
+            "total_ms": round((self.total if self.total is not None else time.perf_counter() - self.started) * 1000, 3),
+            "stages_ms": {k: round(v * 1000, 3) for k, v in self.stages.items()},
+            "bytes": dict(self.bytes),
+            "peak_bytes": self.peak_bytes,
+        }
+
+    def log_line(self, **labels):
+        record = {"event": "kolam_analysis"}
+        record.update(labels)
+        record.update(self.as_dict())
+        return json.dumps(record, separators=(",", ":"))
+
+
+def new_timer(enabled=None):
+    if enabled is None:
+        enabled = DIAGNOSTICS_DEFAULT
+    return StageTimer() if enabled else NULL_TIMER
+
+
+class MetricsRegistry:
+    """Process-wide totals, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.analyses = 0
+        self.seconds = {}
+        self.bytes = {}
+        self.total_seconds = 0.0
+        self.last_peak = 0
+        self.max_peak = 0
+
+    def observe(self, timer):
+        with self._lock:
+            self.analyses += 1
+            self.total_seconds += timer.total or 0.0
+            if timer.peak_bytes is not None:
+                self.last_peak = timer.peak_bytes
+                self.max_peak = max(self.max_peak, timer.peak_bytes)
+            for k, v in timer.stages.items():
+                self.seconds[k] = self.seconds.get(k, 0.0) + v
+            for k, v in timer.bytes.items():
+                self.bytes[k] = self.bytes.get(k, 0) + v
+
+    def prometheus_text(self):
+        with self._lock:
+            lines = [
+                "# HELP kolam_analyses_total Analyses completed with diagnostics enabled.",
+                "# TYPE kolam_analyses_total counter",
+                f"kolam_analyses_total {self.analyses}",
+                "# HELP kolam_analysis_seconds_total Wall time spent in whole analyses.",
+                "# TYPE kolam_analysis_seconds_total counter",
+                f"kolam_analysis_seconds_total {self.total_seconds:.6f}",
+                "# HELP kolam_stage_seconds_total Wall time spent per analyzer stage.",
+                "# TYPE kolam_stage_seconds_total counter",
+            ]
+            lines += [f'kolam_stage_seconds_total{{stage="{k}"}} {v:.6f}' for k, v in self.seconds.items()]
+            lines += [
+                "# HELP kolam_stage_bytes_total Bytes handled per analyzer stage.",
+                "# TYPE kolam_stage_bytes_total counter",
+            ]
+            lines += [f'kolam_stage_bytes_total{{stage="{k}"}} {v}' for k, v in self.bytes.items()]
+            lines += [
+                "# HELP kolam_analysis_peak_bytes Peak traced allocation of the most recent analysis.",
+                "# TYPE kolam_analysis_peak_bytes gauge",
+                f"kolam_analysis_peak_bytes {self.last_peak}",
+                "# HELP kolam_analysis_peak_bytes_max Largest peak traced allocation seen.",
+                "# TYPE kolam_analysis_peak_bytes_max gauge",
+                f"kolam_analysis_peak_bytes_max {self.max_peak}",
+            ]
+            return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,169 @@
+# kolam/profiling.py
+# Opt-in per-rerun profiling: cProfile output (.prof, for pstats/snakeviz) plus a
+# sampled collapsed-stack file (.collapsed, for flamegraph.pl/speedscope) per run.
+#
+# Turn on for every rerun with KOLAM_PROFILE=1, or per browser tab with ?profile=1.
+# Files go to KOLAM_PROFILE_DIR (default: <tmp>/kolam_profiles), newest MAX_FILES kept.
+# When off, ``stage()`` is one thread-local lookup returning a shared no-op context.
+import cProfile
+import glob
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from kolam.metrics import StageTimer, NULL_TIMER
+
+PROFILE_DEFAULT = os.environ.get("KOLAM_PROFILE", "") not in ("", "0", "false", "False")
+PROFILE_DIR = os.environ.get("KOLAM_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "kolam_profiles"))
+SAMPLE_INTERVAL = float(os.environ.get("KOLAM_PROFILE_INTERVAL_MS", 2)) / 1000.0
+MAX_FILES = 400             # .prof + .collapsed pairs count twice
+SUMMARY_STAGES = ("render", "encode", "analysis")
+
+_active = threading.local()
+_seq = itertools.count(1)
+
+
+def wanted(query_value=None):
+    """Profile this run? ``query_value`` is the ``profile`` query parameter, if any."""
+    return PROFILE_DEFAULT or str(query_value or "").lower() not in ("", "0", "false", "no")
+
+
+def active():
+    return getattr(_active, "profile", None) is not None
+
+
+def stage(name):
+    """Time a block into the current thread's profile summary (no-op when not profiling)."""
+    profile = getattr(_active, "profile", None)
+    return NULL_TIMER.stage(name) if profile is None else profile.timer.stage(name)
+
+
+class StackSampler(threading.Thread):
+    """Counts the call stacks of one thread every ``interval`` seconds."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="kolam-profile-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+
+class RunProfile:
+    """cProfile + stack sampling + stage timings for one run on the calling thread."""
+
+    enabled = True
+
+    def __init__(self, label, out_dir=PROFILE_DIR):
+        self.label = "".join(c if c.isalnum() else "_" for c in label)
+        self.out_dir = out_dir
+        self.timer = StageTimer()
+        self.sampler = StackSampler(threading.get_ident())
+        self.profiler = cProfile.Profile()
+        _active.profile = self
+        self.sampler.start()
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Another profiler owns the interpreter (3.12+ allows one at a time): samples only
+            self.profiler = None
+
+    def _stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.sampler.stop()
+        _active.profile = None
+
+    def discard(self):
+        self._stop()
+
+    def finish(self):
+        """Stop, write the files and return the timing summary shown on the page."""
+        self._stop()
+        self.timer.total = time.perf_counter() - self.timer.started
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{next(_seq):05d}_{self.label}")
+        files = []
+        if self.profiler is not None:
+            self.profiler.dump_stats(base + ".prof")
+            files.append(base + ".prof")
+        with open(base + ".collapsed", "w") as f:
+            f.write(self.sampler.collapsed())
+        files.append(base + ".collapsed")
+        prune(self.out_dir)
+        stages = self.timer.as_dict()["stages_ms"]
+        return {
+            "label": self.label,
+            "total_ms": round(self.timer.total * 1000, 1),
+            "stages_ms": {k: round(stages.get(k, 0.0), 1) for k in SUMMARY_STAGES},
+            "samples": sum(self.sampler.counts.values()),
+            "files": files,
+        }
+
+
+class NullProfile:
+    enabled = False
+
+    def finish(self):
+        return None
+
+
+NULL_PROFILE = NullProfile()
+
+
+def start(label, enabled=True, out_dir=PROFILE_DIR, outermost=False):
+    """Profile the run starting now on this thread (``finish()`` the result when it ends).
+
+    Nested runs (a fragment inside a full rerun) are covered by the outer profile.
+    ``outermost`` is for the top of a script run: a profile still open on this
+    thread was left by a run that never reached its ``finish()`` and is dropped.
+    """
+    leftover = getattr(_active, "profile", None)
+    if leftover is not None and outermost:
+        leftover.discard()
+        leftover = None
+    if not enabled or leftover is not None:
+        return NULL_PROFILE
+    return RunProfile(label, out_dir)
+
+
+def profiled(label, fn):
+    """Wrap ``fn`` so each call (e.g. on a worker thread) writes its own profile."""
+    def run(*args, **kwargs):
+        profile = start(label)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.finish()
+    return run
+
+
+def prune(out_dir, keep=MAX_FILES):
+    files = sorted(glob.glob(os.path.join(out_dir, "*.prof")) + glob.glob(os.path.join(out_dir, "*.collapsed")), key=os.path.getmtime)
+    for path in files[:-keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
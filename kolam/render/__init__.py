@@ -0,0 +1,7 @@
+# kolam/render
+# Drawing of kolam.geometry strokes: matplotlib figures for the pages (pyplot is
+# imported on first use, Agg backend), OpenCV/SVG output for high-throughput callers,
+# and travel-ordered G-code/HPGL for pen plotters.
+from kolam.render.figures import get_pyplot, draw_strokes, draw_dots, render_kolam, strokes_figure, figure_png
+from kolam.render.raster import rasterize_kolam, rasterize_strokes, LatticeCanvas, kolam_png, png_bytes, kolam_svg
+from kolam.render.plotter import plan_plot, gcode, hpgl
@@ -0,0 +1,65 @@
+# kolam/render/figures.py
+# Geometry -> matplotlib figure -> image bytes
+from io import BytesIO
+
+import numpy as np
+
+from kolam.geometry import kolam_strokes
+
+FIGSIZE = 7
+DPI = 150
+
+
+def get_pyplot():
+    # Headless backend: figures are only ever saved to bytes, never shown
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def draw_strokes(ax, strokes, color="#B22222", lw=2.0, flip_height=None):
+    """All polylines as one LineCollection (one artist instead of one ``ax.plot`` per stroke).
+
+    ``flip_height`` converts image coordinates (y down) to matplotlib's y-up axes.
+    """
+    from matplotlib.collections import LineCollection
+    if flip_height is not None:
+        strokes = [np.column_stack([s[:, 0], flip_height - s[:, 1]]) for s in strokes]
+    ax.add_collection(LineCollection(strokes, colors=color, linewidths=lw, capstyle="round", joinstyle="round"))
+    ax.autoscale_view()
+
+
+def draw_dots(ax, dots, color="#000000", size=16):
+    dots = np.asarray(dots)
+    ax.scatter(dots[:, 0], dots[:, 1], color=color, s=size, zorder=3)
+
+
+def render_kolam(kind, n, line_color="#B22222", dot_color="#000000", bg_color="#FFFFFF", line_width=2.5,
+                 show_dots=True, dot_size=16, figsize=FIGSIZE, **geometry):
+    """Figure for one generator kolam; ``geometry`` is passed to ``kolam_strokes`` (spacing, r, offset)."""
+    strokes, dots = kolam_strokes(kind, n, **geometry)
+    return strokes_figure(strokes, dots, line_color, dot_color, bg_color, line_width, show_dots, dot_size, figsize)
+
+
+def strokes_figure(strokes, dots, line_color="#B22222", dot_color="#000000", bg_color="#FFFFFF", line_width=2.5,
+                   show_dots=True, dot_size=16, figsize=FIGSIZE):
+    """Like ``render_kolam`` for any strokes and dots in dot units (sikku, random kolams)."""
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(figsize, figsize))
+    fig.patch.set_facecolor(bg_color)
+    ax.set_facecolor(bg_color)
+    ax.axis("off")
+    draw_strokes(ax, strokes, color=line_color, lw=line_width)
+    if show_dots:
+        draw_dots(ax, dots, color=dot_color, size=dot_size)
+    ax.set_aspect("equal")
+    return fig
+
+
+def figure_png(fig, dpi=DPI):
+    """PNG bytes of ``fig``; the figure is closed (pyplot keeps every open figure alive)."""
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", facecolor=fig.get_facecolor())
+    get_pyplot().close(fig)
+    return buf.getvalue()
@@ -0,0 +1,285 @@
+# kolam/render/plotter.py
+# Pen-plotter output: strokes ordered for little pen-up travel, written as G-code or HPGL.
+#
+# Ordering is a travelling-salesman tour over strokes where each stroke may be
+# drawn in either direction:
+#   1. greedy nearest neighbour: from the pen position, go to the closest free
+#      stroke end (a bucket grid over the stroke ends finds it without a scan)
+#   2. 2-opt: reversing a run of the tour (and each stroke in it) replaces two
+#      pen-up moves with two others; every short run is tried at once with
+#      array arithmetic, and the longest remaining moves are tried against the
+#      whole tour
+# Geometry is in dot units until ``plot_paths`` scales it to millimetres.
+import math
+import time
+
+import numpy as np
+
+WIDTH_MM = 200.0
+MARGIN = 0.05
+HPGL_UNITS_PER_MM = 40          # plotter units are 0.025 mm
+WINDOW = 32                     # longest run reversed by the short-range 2-opt passes
+LONG_MOVES = 200                # longest pen-up moves given a whole-tour 2-opt search
+
+
+# ---------------- Nearest-neighbour ordering ----------------
+class _EndGrid:
+    """Free stroke ends bucketed on a grid of about two ends per cell."""
+
+    def __init__(self, ends, alive):
+        idx = np.flatnonzero(alive)
+        pts = ends[idx]
+        self.lo = pts.min(axis=0)
+        span = float(max(pts.max(axis=0) - self.lo)) or 1.0
+        self.side = max(1, int(math.sqrt(len(idx) / 2)))
+        self.cell = span / self.side * (1 + 1e-9)
+        cx, cy = ((pts - self.lo) // self.cell).astype(int).T
+        self.buckets = {}
+        for e, key in zip(idx.tolist(), (cx * (self.side + 1) + cy).tolist()):
+            self.buckets.setdefault(key, []).append(e)
+        self.size = len(idx)
+
+    def remove(self, e, x, y):
+        cx, cy = int((x - self.lo[0]) // self.cell), int((y - self.lo[1]) // self.cell)
+        self.buckets[cx * (self.side + 1) + cy].remove(e)
+
+    def nearest(self, x, y, xs, ys, max_ring=6):
+        """Closest end to ``(x, y)``, or ``None`` when none lies within ``max_ring`` cells."""
+        cx, cy = int((x - self.lo[0]) // self.cell), int((y - self.lo[1]) // self.cell)
+        best, best_d = None, math.inf
+        for r in range(max_ring + 1):
+            for i in range(cx - r, cx + r + 1):
+                # Ring r: whole columns at the sides, top and bottom cells in between
+                js = range(cy - r, cy + r + 1) if abs(i - cx) == r else (cy - r, cy + r)
+                for j in js:
+                    if not (0 <= i <= self.side and 0 <= j <= self.side):
+                        continue
+                    for e in self.buckets.get(i * (self.side + 1) + j, ()):
+                        d = (xs[e] - x) ** 2 + (ys[e] - y) ** 2
+                        if d < best_d:
+                            best, best_d = e, d
+            # Anything outside ring r is at least r cells away
+            if best is not None and best_d <= (r * self.cell) ** 2:
+                return best
+        return best
+
+
+def nearest_neighbour_order(strokes, start=(0.0, 0.0)):
+    """``(order, flipped)``: greedy tour from ``start``, always to the closest free stroke end."""
+    n = len(strokes)
+    if n == 0:
+        return np.zeros(0, np.int64), np.zeros(0, bool)
+    ends = np.empty((2 * n, 2))                    # end 2k = start of stroke k, 2k + 1 = its end
+    ends[0::2] = [s[0] for s in strokes]
+    ends[1::2] = [s[-1] for s in strokes]
+    xs, ys = ends[:, 0].tolist(), ends[:, 1].tolist()
+    alive = np.ones(2 * n, bool)
+    grid = _EndGrid(ends, alive)
+    order, flipped = np.empty(n, np.int64), np.zeros(n, bool)
+    x, y = start
+    for step in range(n):
+        e = grid.nearest(x, y, xs, ys)
+        if e is None:
+            # Nothing close: scan what is left, and rebucket once most ends are gone
+            free = np.flatnonzero(alive)
+            e = int(free[np.argmin(((ends[free] - (x, y)) ** 2).sum(axis=1))])
+        k, other = e // 2, e ^ 1
+        for end in (e, other):
+            grid.remove(end, xs[end], ys[end])
+            alive[end] = False
+        order[step], flipped[step] = k, e & 1
+        x, y = xs[other], ys[other]
+        remaining = 2 * (n - step - 1)
+        if step % 1024 == 1023 and 0 < remaining < grid.size // 4:
+            grid = _EndGrid(ends, alive)
+    return order, flipped
+
+
+# ---------------- 2-opt refinement ----------------
+def _tour_ends(heads, tails, order, flipped):
+    # Pen-down and pen-up point of each stroke in tour order
+    first = np.where(flipped[:, None], tails[order], heads[order])
+    last = np.where(flipped[:, None], heads[order], tails[order])
+    return first, last
+
+
+def _dist(a, b):
+    return np.sqrt(((a - b) ** 2).sum(axis=-1))
+
+
+def _reverse(order, flipped, i, j):
+    order[i:j + 1] = order[i:j + 1][::-1].copy()
+    flipped[i:j + 1] = ~flipped[i:j + 1][::-1]
+
+
+def _window_pass(heads, tails, order, flipped, window):
+    # Every reversal of a run of up to ``window`` strokes, scored at once;
+    # the best non-overlapping improving ones are applied together
+    first, last = _tour_ends(heads, tails, order, flipped)
+    n = len(order)
+    travel = _dist(last[:-1], first[1:])          # move into position i + 1
+    moves = []
+    for length in range(min(window, n - 2)):
+        i = np.arange(1, n - 1 - length)
+        j = i + length
+        gain = travel[i - 1] + travel[j] - _dist(last[i - 1], last[j]) - _dist(first[i], first[j + 1])
+        good = np.flatnonzero(gain > 1e-9)
+        moves += zip(gain[good].tolist(), i[good].tolist(), j[good].tolist())
+    moves.sort(reverse=True)
+    used = np.zeros(n, bool)                      # pen-up moves already changed this pass
+    total = 0.0
+    for gain, i, j in moves:
+        if used[i - 1:j + 1].any():
+            continue
+        used[i - 1:j + 1] = True
+        _reverse(order, flipped, i, j)
+        total += gain
+    return total
+
+
+def _long_move_pass(heads, tails, order, flipped, count):
+    # The longest pen-up moves, each tried as either end of a reversal anywhere in the tour
+    n = len(order)
+    first, last = _tour_ends(heads, tails, order, flipped)
+    travel = _dist(last[:-1], first[1:])
+    total = 0.0
+    for edge in np.argsort(travel)[::-1][:count].tolist():
+        i = edge + 1                              # the move goes into position i
+        # As the left move of a reversal i..j, or the right move of a reversal k..i-1
+        left = travel[i - 1] + travel[i:] - _dist(last[i - 1], last[i:-1]) - _dist(first[i], first[i + 1:])
+        right = travel[:i - 1] + travel[i - 1] - _dist(last[:i - 1], last[i - 1]) - _dist(first[1:i], first[i])
+        j = int(np.argmax(left)) + i if len(left) else i
+        k = int(np.argmax(right)) + 1 if len(right) else i
+        gain = max(left[j - i] if len(left) else 0.0, right[k - 1] if len(right) else 0.0)
+        if gain <= 1e-9:
+            continue
+        a, b = (i, j) if len(left) and left[j - i] == gain else (k, i - 1)
+        _reverse(order, flipped, a, b)
+        # Reversing a run swaps and reverses its ends; moves inside it keep their lengths
+        first[a:b + 1], last[a:b + 1] = last[a:b + 1][::-1].copy(), first[a:b + 1][::-1].copy()
+        travel[a:b] = travel[a:b][::-1].copy()
+        travel[a - 1] = _dist(last[a - 1], first[a])
+        if b + 1 < n:
+            travel[b] = _dist(last[b], first[b + 1])
+        total += gain
+    return total
+
+
+def two_opt(strokes, order, flipped, start=(0.0, 0.0), window=WINDOW, long_moves=LONG_MOVES, max_passes=20):
+    """Improve a tour in place; returns the pen-up distance saved."""
+    if len(order) < 2:
+        return 0.0
+    # The start position as a zero-length stroke that stays first
+    heads = np.vstack([[start], [s[0] for s in strokes]])
+    tails = np.vstack([[start], [s[-1] for s in strokes]])
+    tour, flip = np.concatenate([[0], order + 1]), np.concatenate([[False], flipped])
+    saved = 0.0
+    for _ in range(max_passes):
+        gain = _window_pass(heads, tails, tour, flip, window)
+        saved += gain
+        # Stop once a pass saves under 0.1% of what is left
+        first, last = _tour_ends(heads, tails, tour, flip)
+        if gain <= 1e-3 * _dist(last[:-1], first[1:]).sum():
+            break
+    if long_moves:
+        saved += _long_move_pass(heads, tails, tour, flip, long_moves)
+        saved += _window_pass(heads, tails, tour, flip, window)
+    order[:], flipped[:] = tour[1:] - 1, flip[1:]
+    return saved
+
+
+# ---------------- Plans ----------------
+def travel_distance(strokes, order=None, flipped=None, start=(0.0, 0.0)):
+    """Pen-up distance from ``start`` through the strokes in ``order`` (default: as given)."""
+    if not len(strokes):
+        return 0.0
+    heads = np.array([s[0] for s in strokes], float)
+    tails = np.array([s[-1] for s in strokes], float)
+    order = np.arange(len(strokes)) if order is None else order
+    flipped = np.zeros(len(strokes), bool) if flipped is None else flipped
+    first, last = _tour_ends(heads, tails, order, flipped)
+    return float(_dist(np.vstack([[start], last[:-1]]), first).sum())
+
+
+def draw_distance(strokes):
+    return float(sum(_dist(s[1:], s[:-1]).sum() for s in strokes))
+
+
+def plot_paths(strokes, width_mm=WIDTH_MM, margin=MARGIN):
+    """Strokes scaled into a ``width_mm`` square (y up, origin at the lower-left corner)."""
+    strokes = [np.asarray(s, float) for s in strokes if len(s)]
+    if not strokes:
+        return []
+    pts = np.vstack(strokes)
+    lo, hi = pts.min(axis=0), pts.max(axis=0)
+    span = float(max(hi - lo)) or 1.0
+    scale = width_mm * (1 - 2 * margin) / span
+    offset = width_mm / 2.0 - (lo + hi) / 2.0 * scale
+    return [s * scale + offset for s in strokes]
+
+
+def plan_plot(strokes, width_mm=WIDTH_MM, margin=MARGIN, refine=True):
+    """``(paths, stats)``: millimetre polylines in drawing order and direction, plus distances.
+
+    ``stats`` has the stroke count, pen-down ``draw`` and pen-up ``travel`` (mm,
+    from the origin), ``travel_unordered`` for the strokes as given, and ``seconds``.
+    """
+    paths = plot_paths(strokes, width_mm, margin)
+    t0 = time.perf_counter()
+    order, flipped = nearest_neighbour_order(paths)
+    if refine:
+        two_opt(paths, order, flipped)
+    seconds = time.perf_counter() - t0
+    stats = {"strokes": len(paths), "draw": draw_distance(paths), "travel": travel_distance(paths, order, flipped),
+             "travel_unordered": travel_distance(paths), "seconds": seconds}
+    return [paths[k][::-1] if f else paths[k] for k, f in zip(order.tolist(), flipped.tolist())], stats
+
+
+# ---------------- Writers ----------------
+def gcode(paths, feed=3000, pen_up="G0 Z2", pen_down="G1 Z0 F500"):
+    """G-code for ordered millimetre paths; the pen commands default to a Z axis (CNC rigs)."""
+    lines = ["G21 ; mm", "G90 ; absolute", pen_up]
+    for p in paths:
+        lines.append(f"G0 X{p[0, 0]:.3f} Y{p[0, 1]:.3f}")
+        lines.append(pen_down)
+        moves = [f"G1 X{x:.3f} Y{y:.3f}" for x, y in p[1:].tolist()]
+        if moves:
+            moves[0] += f" F{feed}"
+        lines += moves
+        lines.append(pen_up)
+    lines += ["G0 X0 Y0", "M2"]
+    return "\n".join(lines) + "\n"
+
+
+def hpgl(paths, pen=1):
+    """HPGL for ordered millimetre paths (40 plotter units per mm)."""
+    parts = [f"IN;SP{pen};"]
+    for p in paths:
+        xy = np.round(p * HPGL_UNITS_PER_MM).astype(np.int64)
+        parts.append(f"PU{xy[0, 0]},{xy[0, 1]};PD{','.join(map(str, xy[1:].ravel().tolist()))};")
+    parts.append("PU0,0;SP0;")
+    return "\n".join(parts) + "\n"
+
+
+# ---------------- Benchmark CLI ----------------
+def _bench(count):
+    rng = np.random.default_rng(0)
+    # Short strokes scattered in random order, like a large generated kolam
+    starts = rng.random((count, 2)) * math.sqrt(count)
+    strokes = [np.array([a, a + d]) for a, d in zip(starts, rng.normal(0, 0.3, (count, 2)))]
+    t0 = time.perf_counter()
+    order, flipped = nearest_neighbour_order(strokes)
+    greedy = time.perf_counter() - t0
+    greedy_travel = travel_distance(strokes, order, flipped)
+    t0 = time.perf_counter()
+    two_opt(strokes, order, flipped)
+    refined = time.perf_counter() - t0
+    assert np.array_equal(np.sort(order), np.arange(count))
+    print(f"{count} strokes, draw {draw_distance(strokes):.0f}: travel {travel_distance(strokes):.0f} as given, "
+          f"{greedy_travel:.0f} nearest neighbour ({greedy:.2f} s), "
+          f"{travel_distance(strokes, order, flipped):.0f} after 2-opt (+{refined:.2f} s)")
+
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,193 @@
+# kolam/render/raster.py
+# Fast, matplotlib-free output of generator kolams: OpenCV rasterising and SVG text.
+# Used where throughput matters (the HTTP service); the Streamlit pages keep matplotlib.
+import numpy as np
+
+from kolam.geometry import kolam_strokes
+
+RASTER_SIDE = 512
+MARGIN = 0.05
+# Line widths and dot sizes are given in matplotlib units (points, points^2) so a
+# raster matches the on-page figure: a 7 in figure is 7 * 72 points across
+POINTS_ACROSS = 7 * 72
+# LatticeCanvas keeps sites at least MIN_PITCH px apart and ink within INK_PITCH of a
+# site pitch, so the neighbourhood a local redraw has to touch stays a few sites wide
+MIN_PITCH = 4
+INK_PITCH = 0.5
+
+
+def get_cv2():
+    # OpenCV is imported on first draw, so `import kolam.render` stays light for the pages
+    import cv2
+    return cv2
+
+
+def hex_to_bgr(color):
+    c = color.lstrip("#")
+    return int(c[4:6], 16), int(c[2:4], 16), int(c[0:2], 16)
+
+
+def _layout(strokes, dots, size, margin):
+    # Dot units -> pixel transform (y flipped: geometry is y-up like matplotlib)
+    pts = np.vstack(strokes + [dots])
+    lo, hi = pts.min(axis=0), pts.max(axis=0)
+    span = float(max(hi - lo)) or 1.0
+    scale = size * (1 - 2 * margin) / span
+    shift = size / 2.0 - (lo + hi) / 2.0 * np.array([scale, -scale])
+    return scale, shift
+
+
+def rasterize_kolam(kind, n, size=RASTER_SIDE, line_color="#B22222", dot_color="#000000", bg_color="#FFFFFF",
+                    line_width=2.5, show_dots=True, dot_size=16, margin=MARGIN, **geometry):
+    """``size`` x ``size`` BGR uint8 image of one generator kolam (anti-aliased, sub-pixel accurate)."""
+    strokes, dots = kolam_strokes(kind, n, **geometry)
+    return rasterize_strokes(strokes, dots, size, line_color, dot_color, bg_color, line_width, show_dots, dot_size, margin)
+
+
+def rasterize_strokes(strokes, dots, size=RASTER_SIDE, line_color="#B22222", dot_color="#000000", bg_color="#FFFFFF",
+                      line_width=2.5, show_dots=True, dot_size=16, margin=MARGIN):
+    """Like ``rasterize_kolam`` for any strokes and dots in dot units (e.g. ``procedural_strokes``)."""
+    scale, shift = _layout(strokes, dots, size, margin)
+    img = np.empty((size, size, 3), np.uint8)
+    img[:] = hex_to_bgr(bg_color)
+    _draw(img, strokes, dots, np.array([scale, -scale]), shift, size / POINTS_ACROSS, line_color, dot_color, line_width, show_dots, dot_size)
+    return img
+
+
+def _draw(img, strokes, dots, flip, shift, px_per_point, line_color, dot_color, line_width, show_dots, dot_size,
+          origin=(0, 0)):
+    # ``origin``: whole-pixel (col, row) of img's corner, when img is a tile of a larger picture
+    cv2 = get_cv2()
+    thickness = max(1, int(round(line_width * px_per_point)))
+    # 4 fractional bits (shift=4) keep curves smooth at small sizes
+    origin = np.array(origin) * 16
+    polys = [(np.round((s * flip + shift) * 16) - origin).astype(np.int32) for s in strokes]
+    cv2.polylines(img, polys, False, hex_to_bgr(line_color), thickness, cv2.LINE_AA, shift=4)
+    if show_dots:
+        radius = max(1, int(round(np.sqrt(dot_size) / 2 * px_per_point * 16)))
+        color = hex_to_bgr(dot_color)
+        for x, y in (np.round((dots * flip + shift) * 16) - origin).astype(np.int64):
+            cv2.circle(img, (int(x), int(y)), radius, color, -1, cv2.LINE_AA, shift=4)
+
+
+class LatticeCanvas:
+    """Raster of an ``EditableLattice`` kept up to date by redrawing only around edited dots.
+
+    The layout is fixed to the lattice's editable bounds. Lines and dots are
+    thinned to at most ``INK_PITCH`` of the site pitch, and lattices too large
+    to fit ``size`` at ``MIN_PITCH`` px per site get a larger canvas, so each
+    edit redraws a neighbourhood of a few sites however many dots there are.
+    """
+
+    def __init__(self, lattice, size=RASTER_SIDE, line_color="#B22222", dot_color="#000000", bg_color="#FFFFFF",
+                 line_width=2.5, show_dots=True, dot_size=40, margin=MARGIN):
+        self.lattice = lattice
+        x0, x1, y0, y1 = lattice.bounds
+        size = max(size, int(np.ceil(max(x1 - x0, y1 - y0, 1) * MIN_PITCH / (1 - 2 * margin))))
+        corners = np.array([(x0, y0), (x1, y1)], float) * lattice.spacing
+        scale, self.shift = _layout([], corners, size, margin)
+        self.flip = np.array([scale, -scale])
+        self.size = size
+        self.bg = hex_to_bgr(bg_color)
+        px_per_point = size / POINTS_ACROSS
+        # Ink reaches this far past a stroke or dot centre; on dense lattices it is
+        # thinned to fit the site pitch (it would only merge into a solid fill anyway)
+        ink = line_width * px_per_point + np.sqrt(dot_size) / 2 * px_per_point
+        fit = min(1.0, INK_PITCH * scale * lattice.spacing / ink) if ink else 1.0
+        line_width, dot_size = line_width * fit, dot_size * fit ** 2
+        self.style = (px_per_point, line_color, dot_color, line_width, show_dots, dot_size)
+        self.pad = int(np.ceil(ink * fit)) + 2
+        # Sites whose ink can enter a padded box: up to two pads past its unpadded edge
+        self.reach = int(np.ceil(2 * self.pad / (scale * lattice.spacing)))
+        self.img = np.empty((size, size, 3), np.uint8)
+        self.img[:] = self.bg
+        strokes, dots = lattice.strokes()
+        _draw(self.img, strokes, dots, self.flip, self.shift, *self.style)
+        lattice.take_dirty()
+
+    def _box(self, x0, x1, y0, y1):
+        # Dot-unit box -> clipped pixel box (rows, cols), padded for line width and dots
+        s = self.lattice.spacing
+        px = np.array([(x0, y0), (x1, y1)], float) * s * self.flip + self.shift
+        c0, r0 = np.floor(px.min(axis=0)).astype(int) - self.pad
+        c1, r1 = np.ceil(px.max(axis=0)).astype(int) + self.pad
+        return max(r0, 0), min(r1, self.size), max(c0, 0), min(c1, self.size)
+
+    def refresh(self):
+        """Redraw around every site edited since the last refresh; returns how many."""
+        dirty = self.lattice.take_dirty()
+        if not dirty:
+            return 0
+        xs, ys = np.array(list(dirty)).T
+        # One box around a single edit (a dot and its side neighbours), one per site otherwise
+        if np.ptp(xs) <= 2 and np.ptp(ys) <= 2:
+            boxes = [(xs.min(), xs.max(), ys.min(), ys.max())]
+        else:
+            boxes = [(x, x, y, y) for x, y in dirty]
+        for x0, x1, y0, y1 in boxes:
+            self._redraw(int(x0), int(x1), int(y0), int(y1))
+        return len(dirty)
+
+    def _redraw(self, x0, x1, y0, y1):
+        # Everything that changed lies within one spacing of the sites; anything
+        # that can reach into that box (plus ink padding) is owned by a site nearby
+        r0, r1, c0, c1 = self._box(x0 - 1, x1 + 1, y0 - 1, y1 + 1)
+        if r0 >= r1 or c0 >= c1:
+            return
+        # Redraw into a scratch image big enough to hold those strokes whole: OpenCV
+        # clips lines to the image it draws into, which shifts anti-aliased edges
+        k = 2 + self.reach
+        strokes, dots = self.lattice.region(x0 - k, x1 + k, y0 - k, y1 + k)
+        R0, R1, C0, C1 = self._box(x0 - k - 1, x1 + k + 1, y0 - k - 1, y1 + k + 1)
+        scratch = np.empty((R1 - R0, C1 - C0, 3), np.uint8)
+        scratch[:] = self.bg
+        _draw(scratch, strokes, dots, self.flip, self.shift, *self.style, origin=(C0, R0))
+        self.img[r0:r1, c0:c1] = scratch[r0 - R0:r1 - R0, c0 - C0:c1 - C0]
+
+    def site_at(self, px, py):
+        """Lattice site nearest to pixel ``(px, py)``."""
+        x, y = (np.array([px, py], float) - self.shift) / self.flip / self.lattice.spacing
+        return int(round(x)), int(round(y))
+
+    def png(self):
+        return png_bytes(self.img)
+
+
+def kolam_png(kind, n, compression=1, **kw):
+    """PNG bytes of ``rasterize_kolam``.
+
+    Flat backgrounds compress well without row filters, and skipping them
+    roughly halves encode time (it is most of the cost of a render).
+    """
+    return png_bytes(rasterize_kolam(kind, n, **kw), compression)
+
+
+def png_bytes(img, compression=1):
+    cv2 = get_cv2()
+    params = [cv2.IMWRITE_PNG_COMPRESSION, compression, cv2.IMWRITE_PNG_FILTER, cv2.IMWRITE_PNG_FILTER_NONE]
+    ok, buf = cv2.imencode(".png", img, params)
+    if not ok:
+        raise RuntimeError("PNG encoding failed")
+    return buf.tobytes()
+
+
+def kolam_svg(kind, n, size=RASTER_SIDE, line_color="#B22222", dot_color="#000000", bg_color="#FFFFFF",
+              line_width=2.5, show_dots=True, dot_size=16, margin=MARGIN, **geometry):
+    strokes, dots = kolam_strokes(kind, n, **geometry)
+    scale, shift = _layout(strokes, dots, size, margin)
+    flip = np.array([scale, -scale])
+    px_per_point = size / POINTS_ACROSS
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" width="{size}" height="{size}">',
+             f'<rect width="100%" height="100%" fill="{bg_color}"/>',
+             f'<g fill="none" stroke="{line_color}" stroke-width="{line_width * px_per_point:.2f}" stroke-linecap="round" stroke-linejoin="round">']
+    for s in strokes:
+        pts = " ".join(f"{x:.1f},{y:.1f}" for x, y in s * flip + shift)
+        parts.append(f'<polyline points="{pts}"/>')
+    parts.append("</g>")
+    if show_dots:
+        r = np.sqrt(dot_size) / 2 * px_per_point
+        parts.append(f'<g fill="{dot_color}">')
+        parts += [f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r:.2f}"/>' for x, y in dots * flip + shift]
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
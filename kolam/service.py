@@ -0,0 +1,330 @@
+# kolam/service.py
+# Headless HTTP service: /render (kolam parameters -> PNG/SVG) and /analyze (image bytes -> JSON scores).
+#
+#   python -m kolam.service [--host 127.0.0.1] [--port 8600] [--workers N] [--queue N]
+#
+# Requests are handled on threads that only parse and validate; rendering and
+# analysis run in a process pool. At most ``queue`` requests may be in flight
+# (running or waiting for a worker); beyond that the service answers 503 with
+# Retry-After instead of queueing without bound. Connections are HTTP/1.1 keep-alive.
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from kolam.geometry import KOLAM_TYPES
+from kolam.analyze.decode import MAX_UPLOAD_BYTES
+
+HOST = os.environ.get("KOLAM_SERVICE_HOST", "127.0.0.1")
+PORT = int(os.environ.get("KOLAM_SERVICE_PORT", 8600))
+WORKERS = int(os.environ.get("KOLAM_SERVICE_WORKERS", os.cpu_count() or 1))
+MAX_IN_FLIGHT = int(os.environ.get("KOLAM_SERVICE_QUEUE", 256))
+REQUEST_TIMEOUT = float(os.environ.get("KOLAM_SERVICE_TIMEOUT", 30))
+RENDER_CACHE_ITEMS = 1024      # renders are deterministic; hot parameter sets skip the pool entirely
+IDLE_TIMEOUT = 15              # seconds a keep-alive connection may sit idle
+
+_COLOR = re.compile(r"^#?[0-9A-Fa-f]{6}$")
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ---------------- Parameter parsing ----------------
+def _number(params, name, default, lo, hi, cast=float):
+    raw = params.get(name)
+    if raw is None:
+        return default
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be a number")
+    if not lo <= value <= hi:
+        raise BadRequest(f"{name} must be between {lo} and {hi}")
+    return value
+
+
+def _color(params, name, default):
+    raw = params.get(name, default)
+    if not _COLOR.match(raw):
+        raise BadRequest(f"{name} must be a #RRGGBB color")
+    return "#" + raw.lstrip("#").upper()
+
+
+def parse_render(params):
+    """Query/JSON parameters -> normalised, hashable render request."""
+    kind = params.get("type", "Connected Diamonds")
+    if kind not in KOLAM_TYPES:
+        raise BadRequest(f"type must be one of: {', '.join(KOLAM_TYPES)}")
+    fmt = params.get("format", "png")
+    if fmt not in ("png", "svg"):
+        raise BadRequest("format must be png or svg")
+    show_dots = str(params.get("show_dots", "1")).lower() not in ("0", "false", "no")
+    return (
+        ("kind", kind),
+        ("n", _number(params, "n", 6, 2, 60, int)),
+        ("format", fmt),
+        ("size", _number(params, "size", 512, 32, 4096, int)),
+        ("line_color", _color(params, "line_color", "#B22222")),
+        ("dot_color", _color(params, "dot_color", "#000000")),
+        ("bg_color", _color(params, "bg_color", "#FFFFFF")),
+        ("line_width", _number(params, "line_width", 2.5, 0.1, 40.0)),
+        ("show_dots", show_dots),
+        ("spacing", _number(params, "spacing", 1.0, 0.1, 10.0)),
+        ("r", _number(params, "r", 0.5, 0.05, 5.0)),
+        ("offset", _number(params, "offset", 0.01, 0.0, 5.0)),
+    )
+
+
+# ---------------- Worker-process tasks ----------------
+def _warm_worker():
+    # Pay the import and model-load cost once per process, not on the first request
+    from kolam.render.raster import get_cv2
+    get_cv2()
+    from kolam.analyze.classifier import load_classifier
+    load_classifier()
+
+
+def render_task(request):
+    from kolam.render.raster import kolam_png, kolam_svg
+    kw = dict(request)
+    kind, n, fmt = kw.pop("kind"), kw.pop("n"), kw.pop("format")
+    if kind == "Unsymmetrical Dots":
+        kw.pop("r"), kw.pop("offset")
+    else:
+        kw.pop("spacing")
+    if fmt == "svg":
+        return kolam_svg(kind, n, **kw).encode("utf-8"), "image/svg+xml"
+    return kolam_png(kind, n, **kw), "image/png"
+
+
+def analyze_task(data, align=True):
+    from kolam.analyze.decode import decode_gray, UploadRejected
+    from kolam.analyze.align import align_kolam
+    from kolam.analyze.core import analyze_kolam, generate_principles
+    from kolam.analyze.classifier import load_classifier
+    t0 = time.perf_counter()
+    try:
+        gray = decode_gray(data)
+    except UploadRejected as e:
+        return {"error": str(e)}
+    alignment = None
+    if align:
+        gray, alignment = align_kolam(gray)
+    symmetry_score, line_density, complexity, _ = analyze_kolam(gray)
+    classifier = load_classifier()
+    kolam_type = classifier.classify(gray) if classifier is not None else None
+    return {
+        "symmetry_score": symmetry_score,
+        "line_density": line_density,
+        "complexity": complexity,
+        "principles": generate_principles(symmetry_score, line_density, complexity),
+        "kolam_type": None if kolam_type is None else {"label": kolam_type[0], "confidence": float(kolam_type[1])},
+        "alignment": None if alignment is None else {"status": alignment["status"], "angle": alignment["angle"]},
+        "size": [int(gray.shape[1]), int(gray.shape[0])],
+        "ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+
+# ---------------- Server ----------------
+class RenderCache:
+    """Small thread-safe LRU of finished renders, keyed by the normalised request."""
+
+    def __init__(self, max_items=RENDER_CACHE_ITEMS):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+class KolamService(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128    # listen() backlog
+
+    def __init__(self, address, workers=WORKERS, max_in_flight=MAX_IN_FLIGHT, timeout=REQUEST_TIMEOUT):
+        super().__init__(address, KolamHandler)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.task_timeout = timeout
+        self.renders = RenderCache()
+        self.stats_lock = threading.Lock()
+        self.counts = {}
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+
+    def count(self, key):
+        with self.stats_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def run(self, fn, *args):
+        """Run ``fn`` in the pool; ``None`` if every slot is taken (caller answers 503)."""
+        if not self.slots.acquire(blocking=False):
+            return None
+        try:
+            future = self.pool.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        # The slot is freed when the task really ends, not when the caller gives up on it,
+        # so timed-out tasks still count and the pool never holds more than max_in_flight
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.task_timeout)
+        except FutureTimeout:
+            future.cancel()     # frees the slot now if the task never started
+            raise
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+class KolamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive by default
+    timeout = IDLE_TIMEOUT
+    server_version = "KolamService/1.0"
+
+    def log_message(self, fmt, *args):
+        pass   # per-request logging would dominate at hundreds of requests/s
+
+    # ---- responses ----
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.count(status)
+
+    def _json(self, status, obj, headers=None):
+        self._send(status, json.dumps(obj).encode("utf-8"), "application/json", headers)
+
+    def _busy(self):
+        self._json(503, {"error": "server busy, retry shortly"}, {"Retry-After": "1"})
+
+    def _read_body(self, limit):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            raise BadRequest("Content-Length required")
+        length = int(length)
+        if length > limit:
+            # Drain nothing: close the connection instead of reading a huge body
+            self.close_connection = True
+            return None
+        return self.rfile.read(length)
+
+    # ---- routes ----
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/render":
+            self._render({k: v[-1] for k, v in parse_qs(url.query).items()})
+        elif url.path == "/healthz":
+            self._json(200, {"ok": True})
+        elif url.path == "/stats":
+            srv = self.server
+            with srv.stats_lock:
+                counts = {str(k): v for k, v in srv.counts.items()}
+            self._json(200, {"workers": srv.workers, "max_in_flight": srv.max_in_flight, "responses": counts,
+                             "render_cache": {"hits": srv.renders.hits, "misses": srv.renders.misses}})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/render":
+                body = self._read_body(64 * 1024)
+                if body is None:
+                    return self._json(413, {"error": "request body too large"})
+                params = json.loads(body or b"{}")
+                if not isinstance(params, dict):
+                    raise BadRequest("JSON body must be an object")
+                self._render({k: str(v) for k, v in params.items()})
+            elif url.path == "/analyze":
+                body = self._read_body(MAX_UPLOAD_BYTES)
+                if body is None:
+                    return self._json(413, {"error": f"upload larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"})
+                self._analyze(body, query.get("align", "1") not in ("0", "false"))
+            else:
+                self._json(404, {"error": "not found"})
+        except (BadRequest, ValueError) as e:
+            self._json(400, {"error": str(e)})
+
+    def _render(self, params):
+        try:
+            request = parse_render(params)
+        except BadRequest as e:
+            return self._json(400, {"error": str(e)})
+        cached = self.server.renders.get(request)
+        if cached is None:
+            try:
+                cached = self.server.run(render_task, request)
+            except FutureTimeout:
+                return self._json(504, {"error": "render timed out"})
+            except Exception as e:
+                # Worker crash (e.g. BrokenProcessPool) or a bug: answer rather than drop the connection
+                return self._json(500, {"error": f"render failed: {type(e).__name__}"})
+            if cached is None:
+                return self._busy()
+            self.server.renders.put(request, cached)
+        body, content_type = cached
+        self._send(200, body, content_type, {"Cache-Control": "public, max-age=86400"})
+
+    def _analyze(self, data, align):
+        try:
+            result = self.server.run(analyze_task, data, align)
+        except FutureTimeout:
+            return self._json(504, {"error": "analysis timed out"})
+        except Exception as e:
+            return self._json(500, {"error": f"analysis failed: {type(e).__name__}"})
+        if result is None:
+            return self._busy()
+        self._json(422 if "error" in result else 200, result)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Kolam render/analysis HTTP service")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--queue", type=int, default=MAX_IN_FLIGHT, help="max requests in flight before 503")
+    args = ap.parse_args(argv)
+    server = KolamService((args.host, args.port), workers=args.workers, max_in_flight=args.queue)
+    print(f"kolam service on http://{args.host}:{server.server_address[1]} ({args.workers} workers, queue {args.queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
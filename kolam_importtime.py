@@ -0,0 +1,108 @@
+# kolam_importtime.py
+# Startup import budget for the app: runs the script bare under `python -X importtime`
+# (which renders the Home page) and fails if heavy modules load or the total grows.
+# The generator pages are then rendered (every Generate button clicked) under
+# Streamlit's AppTest and must not load the Analyzer-only modules either.
+#
+#   python kolam_importtime.py [script] [budget_ms]
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = "final4.py"
+BUDGET_MS = float(os.environ.get("KOLAM_IMPORT_BUDGET_MS", 700))
+RUNS = 3   # importtime is noisy; keep the fastest run
+
+# Must only load when a page that needs them is opened (prefix match on module names)
+LAZY_MODULES = (
+    "matplotlib", "cv2", "requests",
+    "kolam.geometry", "kolam.render", "kolam.analyze",
+    "kolam.assets.gallery_cache", "kolam.assets.thumbnails",
+)
+# Pages that draw kolams may load geometry, rendering and matplotlib, but not these
+GENERATOR_PAGES = ("Basic Kolam", "Complex Kolam")
+ANALYZER_ONLY = ("cv2", "kolam.analyze")
+
+_PAGE_PROBE = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state["page"] = sys.argv[2]
+at.run()
+for key in [b.key for b in at.button if b.key and b.key.startswith(("gen", "generate"))]:
+    at.button(key=key).click().run()
+sys.stdout.write(json.dumps({"errors": [str(e.value) for e in at.exception], "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr):
+    """``[(depth, self_us, cumulative_us, module)]`` from ``-X importtime`` output."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cum_us, name = line.split("|")
+        # Nesting is shown as two extra spaces of indent per level
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        out.append((depth, int(head.split(":")[1]), int(cum_us), name.strip()))
+    return out
+
+
+def measure(script=SCRIPT):
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", script], cwd=HERE, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} failed to run:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def page_modules(script, page):
+    """Module names loaded after rendering ``page`` and clicking its Generate buttons."""
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-c", _PAGE_PROBE, os.path.join(HERE, script), page], cwd=HERE, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} page {page!r} failed to run:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result["errors"]:
+        raise RuntimeError(f"{script} page {page!r} raised:\n" + "\n".join(result["errors"]))
+    return set(result["modules"])
+
+
+def main(argv):
+    script = argv[1] if len(argv) > 1 else SCRIPT
+    budget = float(argv[2]) if len(argv) > 2 else BUDGET_MS
+    best = None
+    for _ in range(RUNS):
+        rows = measure(script)
+        total = sum(cum for depth, _, cum, _ in rows if depth == 0) / 1000.0
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+    top = sorted((r for r in rows if r[0] == 0), key=lambda r: -r[2])[:10]
+    print(f"{script}: {total:.0f} ms of imports (budget {budget:.0f} ms)")
+    for _, _, cum, name in top:
+        print(f"  {cum / 1000.0:8.1f} ms  {name}")
+    names = {name for _, _, _, name in rows}
+    loaded = sorted(m for m in LAZY_MODULES if any(n == m or n.startswith(m + ".") for n in names))
+    failed = False
+    if loaded:
+        print("FAIL: loaded at startup but should be lazy: " + ", ".join(loaded))
+        failed = True
+    if total > budget:
+        print(f"FAIL: import time {total:.0f} ms exceeds budget {budget:.0f} ms")
+        failed = True
+    if script == SCRIPT:
+        for page in GENERATOR_PAGES:
+            names = page_modules(script, page)
+            loaded = sorted(m for m in ANALYZER_ONLY if any(n == m or n.startswith(m + ".") for n in names))
+            print(f"{page} page: " + (f"FAIL: loads {', '.join(loaded)}" if loaded else "no Analyzer-only modules"))
+            failed = failed or bool(loaded)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,118 @@
+# kolam_loadgen.py
+# Load generator for the HTTP service (python -m kolam.service).
+# Each client thread holds one keep-alive connection and sends requests back to back.
+#
+#   python kolam_loadgen.py [--url http://127.0.0.1:8600] [--clients 32] [--seconds 10]
+#                           [--distinct 200] [--analyze image.jpg]
+#
+# --distinct caps how many different render parameter sets are used; the service
+# caches finished renders, so use a large value to measure cold rendering.
+import argparse
+import http.client
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+TYPES = ["Straight Lines", "Connected Diamonds", "Diamond with Arcs", "Loops/Arcs", "Mixed", "Unsymmetrical Dots"]
+COLORS = ["#B22222", "#000000", "#FFFFFF", "#1E90FF", "#FFD700", "#228B22"]
+
+
+def render_paths(count, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        params = {
+            "type": rng.choice(TYPES),
+            "n": rng.randint(4, 10),
+            "size": rng.choice([256, 512]),
+            "line_color": rng.choice(COLORS),
+            "line_width": round(rng.uniform(1.0, 5.0), 1),
+            "show_dots": rng.choice([0, 1]),
+        }
+        paths.append("/render?" + urlencode(params))
+    return paths
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100.0 * len(sorted_values)))]
+
+
+def client(host, port, deadline, next_request, latencies, statuses, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    local_lat, local_status = [], Counter()
+    while time.perf_counter() < deadline:
+        method, path, body, headers = next_request()
+        t0 = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+            if resp.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=60)
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+        local_lat.append((time.perf_counter() - t0) * 1000)
+        local_status[status] += 1
+    conn.close()
+    with lock:
+        latencies.extend(local_lat)
+        statuses.update(local_status)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load generator for the kolam HTTP service")
+    ap.add_argument("--url", default="http://127.0.0.1:8600")
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--distinct", type=int, default=200, help="number of distinct render parameter sets")
+    ap.add_argument("--analyze", metavar="IMAGE", help="POST this image to /analyze instead of rendering")
+    args = ap.parse_args(argv)
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    if args.analyze:
+        with open(args.analyze, "rb") as f:
+            data = f.read()
+        headers = {"Content-Type": "application/octet-stream"}
+        next_request = lambda: ("POST", "/analyze", data, headers)  # noqa: E731
+    else:
+        paths = render_paths(args.distinct)
+        rng_lock = threading.Lock()
+        rng = random.Random(1)
+
+        def next_request():
+            with rng_lock:
+                path = rng.choice(paths)
+            return "GET", path, None, {}
+
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    threads = [threading.Thread(target=client, args=(host, port, deadline, next_request, latencies, statuses, lock))
+               for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    print(f"{sum(statuses.values())} requests in {elapsed:.1f} s with {args.clients} clients")
+    print(f"throughput: {ok / elapsed:.1f} ok/s")
+    print(f"latency ms: p50 {percentile(latencies, 50):.1f}  p95 {percentile(latencies, 95):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}  max {latencies[-1] if latencies else 0:.1f}")
+    print("responses: " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+# kolam_loadtest.py
+# Multi-session load test of the Streamlit app. Each simulated user is an AppTest
+# session on its own thread, all inside this process (sharing st.cache_resource,
+# the analysis queue, the stores and the compiled script like sessions of one server).
+# Every rerun is timed; RSS of the process is sampled throughout.
+#
+#   python kolam_loadtest.py [--sessions 50] [--rounds 2] [--think 0] [--out results.json]
+#                            [--compare previous.json] [script]
+#
+# Journeys and their inputs are fixed (seeded), so results from two commits can be
+# compared with --compare; the JSON records the commit and machine it ran on.
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = "final4.py"
+RUN_TIMEOUT = 180        # seconds one rerun may take before AppTest gives up
+RSS_SAMPLE_S = 0.2
+
+
+# ---------------- Journeys ----------------
+# A journey is a list of (step name, action); the action changes widgets on the
+# AppTest and returns it, and the harness times the .run() that follows.
+def _goto(page):
+    return lambda at, rng: at.radio(key="page").set_value(page)
+
+
+def _click(key):
+    return lambda at, rng: at.button(key=key).click()
+
+
+def _pick(key, options):
+    return lambda at, rng: at.selectbox(key=key).set_value(rng.choice(options))
+
+
+def _slide(key, lo, hi):
+    return lambda at, rng: at.slider(key=key).set_value(rng.randint(lo, hi))
+
+
+def _upload(at, rng):
+    return at.file_uploader(key="analyzer_upload").upload("kolam.png", sample_image(rng.randrange(4)), "image/png")
+
+
+JOURNEYS = {
+    "generator": [
+        ("home", _goto("Home")),
+        ("basic/open", _goto("Basic Kolam")),
+        ("basic/type", _pick("basic_type", ["Straight Lines", "Connected Diamonds", "Loops/Arcs", "Mixed"])),
+        ("basic/size", _slide("basic_size", 4, 10)),
+        ("basic/generate", _click("generate_basic")),
+        ("complex/open", _goto("Complex Kolam")),
+        ("complex/generate", _click("gen_unsym")),
+        ("complex/back", _click("complex_back")),
+    ],
+    "analyzer": [
+        ("home", _goto("Home")),
+        ("analyzer/open", _goto("Analyzer")),
+        ("analyzer/upload", _upload),
+        ("community/open", _goto("Community")),
+        ("learn/open", _goto("Learn More")),
+    ],
+}
+
+_samples = {}
+_samples_lock = threading.Lock()
+
+
+def sample_image(i):
+    """Deterministic PNG kolam used for uploads (rendered once per variant)."""
+    with _samples_lock:
+        if i not in _samples:
+            from kolam.render.raster import kolam_png
+            kinds = ["Connected Diamonds", "Loops/Arcs", "Mixed", "Straight Lines"]
+            _samples[i] = kolam_png(kinds[i], 5 + i, size=768)
+        return _samples[i]
+
+
+# ---------------- Measurement ----------------
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource   # peak only, but better than nothing off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.samples = []
+        self.stop = threading.Event()
+
+    def run(self):
+        while not self.stop.is_set():
+            self.samples.append(rss_mb())
+            self.stop.wait(RSS_SAMPLE_S)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100.0 * len(sorted_values)))]
+
+
+def summarize(latencies_ms):
+    s = sorted(latencies_ms)
+    return {"n": len(s), "p50": percentile(s, 50), "p95": percentile(s, 95), "p99": percentile(s, 99),
+            "max": s[-1] if s else 0.0, "mean": sum(s) / len(s) if s else 0.0}
+
+
+def share_server_state():
+    """Make concurrent AppTest sessions behave like sessions of one server.
+
+    AppTest is written for one session at a time: every run builds its own
+    ScriptCache (re-parsing the script, which a server does once; concurrent
+    parses can even fail on CPython 3.11) and installs a process-global mock
+    Runtime that it clears again when the run ends, pulling it out from under
+    other sessions. Here all runs share one ScriptCache and the first Runtime.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    runtime = []
+
+    def instance(cls):
+        if not runtime:
+            if cls._instance is None:
+                raise RuntimeError("Runtime hasn't been created!")
+            runtime.append(cls._instance)
+        return runtime[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: bool(runtime) or cls._instance is not None)
+    AppTest.from_string("import streamlit as st").run()   # captures the shared Runtime
+
+
+def session(index, script, rounds, think, results, errors, lock, start_gate):
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(index)
+    journey_names = sorted(JOURNEYS)
+    at = AppTest.from_file(os.path.join(HERE, script), default_timeout=RUN_TIMEOUT)
+    local, local_errors = [], []
+    start_gate.wait()
+    journeys = [[("connect", None)]]
+    journeys += [JOURNEYS[journey_names[(index + r) % len(journey_names)]] for r in range(rounds)]
+    for journey in journeys:
+        for step, action in journey:
+            try:
+                if action is not None:
+                    action(at, rng)
+                t0 = time.perf_counter()
+                at.run()
+                dt = (time.perf_counter() - t0) * 1000
+                if at.exception:
+                    local_errors.append(f"{step}: {at.exception[0].message}")
+                local.append((step, dt))
+            except Exception as e:   # a missing widget etc. ends this journey, not the test
+                local_errors.append(f"{step}: {type(e).__name__}: {e}")
+                break
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+    with lock:
+        results.extend(local)
+        errors.extend(local_errors)
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_load(script, sessions, rounds, think):
+    results, errors, lock = [], [], threading.Lock()
+    gate = threading.Barrier(sessions + 1)
+    sampler = RssSampler()
+    rss_start = rss_mb()
+    sampler.start()
+    threads = [threading.Thread(target=session, args=(i, script, rounds, think, results, errors, lock, gate), daemon=True)
+               for i in range(sessions)]
+    for t in threads:
+        t.start()
+    gate.wait()   # every session built before the clock starts
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    sampler.stop.set()
+    sampler.join()
+
+    steps = {}
+    for step, dt in results:
+        steps.setdefault(step, []).append(dt)
+    return {
+        "commit": git_rev(),
+        "script": script,
+        "machine": {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()},
+        "config": {"sessions": sessions, "rounds": rounds, "think_s": think},
+        "wall_s": wall,
+        "reruns": len(results),
+        "throughput_rps": len(results) / wall if wall else 0.0,
+        "latency_ms": summarize([dt for _, dt in results]),
+        "steps": {k: summarize(v) for k, v in sorted(steps.items())},
+        "rss_mb": {"start": rss_start, "peak": max(sampler.samples, default=rss_start), "end": rss_mb()},
+        "errors": errors,
+    }
+
+
+def report(res, baseline=None):
+    def delta(new, old):
+        if old in (None, 0):
+            return ""
+        return f" ({(new - old) / old * 100:+.0f}%)"
+
+    base = baseline or {}
+    lat, blat = res["latency_ms"], base.get("latency_ms", {})
+    print(f"{res['script']} @ {res['commit']}: {res['config']['sessions']} sessions x {res['config']['rounds']} rounds, "
+          f"{res['reruns']} reruns in {res['wall_s']:.1f} s")
+    print(f"throughput: {res['throughput_rps']:.1f} reruns/s{delta(res['throughput_rps'], base.get('throughput_rps'))}")
+    print("rerun latency ms: " + "  ".join(f"{q} {lat[q]:.0f}{delta(lat[q], blat.get(q))}" for q in ("p50", "p95", "p99", "max")))
+    rss, brss = res["rss_mb"], base.get("rss_mb", {})
+    print(f"RSS MB: start {rss['start']:.0f}  peak {rss['peak']:.0f}{delta(rss['peak'], brss.get('peak'))}  end {rss['end']:.0f}")
+    print(f"  {'step':<20}{'n':>5}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for step, s in res["steps"].items():
+        old = base.get("steps", {}).get(step, {}).get("p95")
+        print(f"  {step:<20}{s['n']:>5}{s['p50']:>9.0f}{s['p95']:>9.0f}{s['p99']:>9.0f}{delta(s['p95'], old)}")
+    if baseline:
+        print(f"(deltas vs {baseline.get('commit')}; p95 per step)")
+        if baseline.get("config") != res["config"] or baseline.get("machine") != res["machine"]:
+            print("warning: baseline ran with a different config or machine; deltas are not like for like")
+    if res["errors"]:
+        print(f"{len(res['errors'])} errors, first: {res['errors'][0]}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Concurrent-session load test of the Streamlit app")
+    ap.add_argument("script", nargs="?", default=SCRIPT)
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--rounds", type=int, default=2, help="journeys per session")
+    ap.add_argument("--think", type=float, default=0.0, help="mean think time between steps (s)")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="results JSON of an earlier run to diff against")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    os.chdir(HERE)   # the app resolves logo.jpg and its stores relative to the working directory
+
+    share_server_state()
+    from streamlit.logger import set_log_level
+    set_log_level("error")   # bare-mode and deprecation warnings, once per session and rerun
+    res = run_load(args.script, args.sessions, args.rounds, args.think)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(res, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(res, f, indent=2)
+    return 1 if res["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())